@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 from dotenv import load_dotenv
+import os
 import warnings
 
 # Suppress deprecation warnings from dj_rest_auth (will be fixed in future library updates)
@@ -57,6 +58,7 @@ INSTALLED_APPS = [
     'mptt',
     'users',
     'courses',
+    'core',
 ]
 
 SITE_ID = 1 
@@ -75,7 +77,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    "allauth.account.middleware.AccountMiddleware"
+    "allauth.account.middleware.AccountMiddleware",
+    'core.middleware.PrimaryPinMiddleware',
 ]
 
 
@@ -86,9 +89,46 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.TokenAuthentication'
     ],
-    'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # DRF's own light inspector at runtime; manage.py build_openapi switches to
+    # drf_spectacular.openapi.AutoSchema while it generates the schema artifact (core.openapi)
+    'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+# Prebuilt OpenAPI schema served at /api/schema/ (manage.py build_openapi)
+OPENAPI_SCHEMA_DIR = Path(os.getenv('OPENAPI_SCHEMA_DIR', BASE_DIR / 'openapi'))
+SPECTACULAR_SETTINGS = {
+    'TITLE': 'ConceptIQ API',
+    'VERSION': os.getenv('API_VERSION', '1.0.0'),
+    'SERVE_INCLUDE_SCHEMA': False,
 }
 
+# One cache shared by every worker when REDIS_URL is set (redis://host:6379/0); otherwise
+# Django's default per-process memory cache. core/cache.py layers an in-process LRU on top.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+            'KEY_PREFIX': os.getenv('CACHE_KEY_PREFIX', 'conceptiq'),
+        }
+    }
+
+# Cursor pagination for the large course tables (courses.pagination)
+API_PAGE_SIZE = int(os.getenv('API_PAGE_SIZE', '50'))
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', '200'))
+
+# Trending sort (courses.popularity); run recompute_popularity after changing it
+POPULARITY_HALF_LIFE_DAYS = float(os.getenv('POPULARITY_HALF_LIFE_DAYS', '7'))
+
 ROOT_URLCONF = 'Conceptiq.urls'
 
 TEMPLATES = [
@@ -134,15 +174,48 @@ WSGI_APPLICATION = 'Conceptiq.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'postgres',       # Database name you created on RDS
-        'USER': 'conceptiq',   # The username you set for RDS
-        'PASSWORD': 'Conceptiq459',  # The password you set for RDS
-        'HOST': 'conceptiq-database-1.cvcyy48a8a7e.ap-south-1.rds.amazonaws.com',  # RDS endpoint
-        'PORT': '5432',  # Default PostgreSQL port
+        'ENGINE': os.getenv('DB_ENGINE', 'django.db.backends.postgresql'),
+        'NAME': os.getenv('DB_NAME', 'postgres'),       # Database name you created on RDS
+        'USER': os.getenv('DB_USER', 'conceptiq'),   # The username you set for RDS
+        'PASSWORD': os.getenv('DB_PASSWORD', 'Conceptiq459'),  # The password you set for RDS
+        'HOST': os.getenv('DB_HOST', 'conceptiq-database-1.cvcyy48a8a7e.ap-south-1.rds.amazonaws.com'),  # RDS endpoint
+        'PORT': os.getenv('DB_PORT', '5432'),  # Default PostgreSQL port
+        'OPTIONS': {},
     }
 }
 
+if os.getenv('DB_SSLMODE'):
+    DATABASES['default']['OPTIONS']['sslmode'] = os.getenv('DB_SSLMODE')
+
+# Connection reuse. With DB_POOL on (default for Postgres) each worker keeps a psycopg pool of
+# warm connections; otherwise connections persist for DB_CONN_MAX_AGE seconds.
+# CONN_HEALTH_CHECKS pings a reused connection before handing it out (one extra round trip) so
+# connections dropped by RDS are replaced instead of failing the request.
+DATABASES['default']['CONN_HEALTH_CHECKS'] = os.getenv('DB_HEALTH_CHECKS', 'true').lower() == 'true'
+
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql' and os.getenv('DB_POOL', 'true').lower() == 'true':
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+        'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+        'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),        # wait for a free connection
+        'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', '300')),     # close connections idle this long
+        'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', '1800')),
+    }
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('DB_CONN_MAX_AGE', '60'))
+
+# Read replicas: DB_REPLICA_HOSTS="host1,host2" adds aliases replica_1, replica_2, ... that reuse
+# the primary's credentials. Read-only viewset actions are routed to them (core.dbrouter).
+DATABASE_REPLICAS = []
+for n, host in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    DATABASES[f'replica_{n}'] = {**DATABASES['default'], 'HOST': host.strip(), 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(f'replica_{n}')
+
+DATABASE_ROUTERS = ['core.dbrouter.PrimaryReplicaRouter']
+
+# After a write, that client's reads stay on the primary for this many seconds
+DATABASE_PRIMARY_STICKY_SECONDS = int(os.getenv('DB_PRIMARY_STICKY_SECONDS', '5'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -181,6 +254,13 @@ USE_TZ = True
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# Lesson media (courses.media): files referenced by content data, served behind the enrollment check.
+# LESSON_MEDIA_OFFLOAD: '' streams from Django (sendfile under gunicorn), 'x-accel-redirect' (nginx,
+# with an internal location at LESSON_MEDIA_ACCEL_PREFIX aliased to the root) or 'x-sendfile'.
+LESSON_MEDIA_ROOT = Path(os.getenv('LESSON_MEDIA_ROOT', BASE_DIR / 'media' / 'lessons'))
+LESSON_MEDIA_OFFLOAD = os.getenv('LESSON_MEDIA_OFFLOAD', '')
+LESSON_MEDIA_ACCEL_PREFIX = os.getenv('LESSON_MEDIA_ACCEL_PREFIX', '/protected/lessons/')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,19 @@
+from django.contrib import admin
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'priority', 'run_at', 'attempts', 'max_attempts', 'finished_at')
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'unique_key')
+    ordering = ('-id',)
+    actions = ['retry_jobs']
+
+    @admin.action(description="Retry selected jobs")
+    def retry_jobs(self, request, queryset):
+        from django.db.models import F
+        from django.utils import timezone
+        queryset.exclude(status=Job.RUNNING).update(
+            status=Job.QUEUED, run_at=timezone.now(), max_attempts=F('attempts') + 1, unique_key=None
+        )
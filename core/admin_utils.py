@@ -0,0 +1,104 @@
+"""
+Admin building blocks for tables too big to count or list in full.
+
+``EstimatedCountPaginator`` takes the row count from PostgreSQL's statistics (``reltuples``
+for a whole table, the planner's row estimate for a filtered changelist) once that estimate
+passes ``ADMIN_ESTIMATE_COUNTS_ABOVE``; smaller results are still counted exactly.
+
+``AutocompleteFilter`` is a related-field list filter that renders one select2 box backed by
+the admin's autocomplete view instead of a link for every row of the related table. The
+related model's admin needs ``search_fields``, as for ``autocomplete_fields``.
+
+``LargeTableAdmin`` puts both together and also applies ``list_select_related`` to
+``get_queryset``, so autocomplete results and change forms don't run a query per ``__str__``.
+"""
+import json
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import connections
+from django.forms import Media
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+ESTIMATE_COUNTS_ABOVE = getattr(settings, "ADMIN_ESTIMATE_COUNTS_ABOVE", 10000)
+
+
+def estimated_count(queryset):
+    """PostgreSQL's estimate of ``queryset.count()``, or None where there is none."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+            # -1 until the table has been vacuumed or analyzed
+            return int(row[0]) if row and row[0] >= 0 else None
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list) if hasattr(self.object_list, "query") else None
+        if estimate is None or estimate < ESTIMATE_COUNTS_ABOVE:
+            return super().count
+        return estimate
+
+
+class AutocompleteFilter(admin.RelatedFieldListFilter):
+    template = "admin/autocomplete_filter.html"
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.admin_site = model_admin.admin_site
+        super().__init__(field, request, params, model, model_admin, field_path)
+
+    def field_choices(self, field, request, model_admin):
+        return []
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        # the widget needs the changelist's query string, which is only available here
+        clear = changelist.get_query_string(remove=[self.lookup_kwarg, self.lookup_kwarg_isnull])
+        widget = AutocompleteSelect(self.field, self.admin_site, attrs={
+            "style": "width: 100%",
+            "data-query-string": changelist.get_query_string({self.lookup_kwarg: "__value__"}, [self.lookup_kwarg_isnull]),
+            "data-clear-query-string": clear,
+        })
+        form_field = self.field.formfield(widget=widget, required=False)
+        self.rendered_widget = form_field.widget.render(self.lookup_kwarg, self.lookup_val[-1] if self.lookup_val else None)
+        yield {
+            "selected": not self.lookup_val and not self.lookup_val_isnull,
+            "query_string": clear,
+            "display": _("All"),
+        }
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    # the "N total" link runs an unfiltered COUNT(*)
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if isinstance(self.list_select_related, (list, tuple)) and self.list_select_related:
+            queryset = queryset.select_related(*self.list_select_related)
+        return queryset
+
+    @property
+    def media(self):
+        media = super().media
+        if any(isinstance(spec, (list, tuple)) and issubclass(spec[1], AutocompleteFilter) for spec in self.list_filter):
+            # the select2 assets only depend on the active language, not on the field
+            media += AutocompleteSelect(None, self.admin_site).media + Media(js=["core/admin/autocomplete_filter.js"])
+        return media
@@ -0,0 +1,249 @@
+"""
+Two-tier cache for expensive read results shared by many requests.
+
+``TieredCache`` keeps recently used entries in a bounded in-process LRU (``local_size``
+entries, each for at most ``local_seconds``) in front of Django's cache, which every worker
+shares once ``REDIS_URL`` is set. Entries carry the time they stop being fresh, and the shared
+copy is kept ``stale_seconds`` longer than that:
+
+- fresh: returned as is;
+- stale: returned as is, while one worker — whoever wins ``cache.add`` on the key's lock —
+  recomputes it on a small background thread pool;
+- missing: one worker computes it under the same lock and the others poll the shared cache
+  for up to ``wait_seconds``, computing it themselves only if it never shows up.
+
+``invalidate`` drops a key; ``clear`` moves the whole cache to a new generation, which other
+workers pick up within ``local_seconds``. Counts of local/shared hits, misses, stale hits and
+refreshes are kept per process and added to shared counters every ``METRICS_FLUSH_SECONDS``;
+``stats()`` reports both.
+
+Values must be picklable, and callers must not modify them: the in-process tier hands out the
+same object to every request. ``@tiered.cached(key=...)`` wraps a function instead of calling
+``get_or_set`` directly.
+"""
+import contextvars
+import functools
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+LOCAL_SIZE = getattr(settings, "TIERED_CACHE_LOCAL_SIZE", 256)  # entries per cache and process
+LOCAL_SECONDS = getattr(settings, "TIERED_CACHE_LOCAL_SECONDS", 5)
+WAIT_SECONDS = getattr(settings, "TIERED_CACHE_WAIT_SECONDS", 5)
+LOCK_SECONDS = getattr(settings, "TIERED_CACHE_LOCK_SECONDS", 30)  # longest expected computation
+REFRESH_THREADS = getattr(settings, "TIERED_CACHE_REFRESH_THREADS", 2)
+METRICS_FLUSH_SECONDS = 10
+POLL_SECONDS = 0.05
+COUNTERS = ("hit_local", "hit_shared", "stale", "miss", "waited", "wait_timeout", "refreshed", "refresh_failed")
+
+# name -> TieredCache
+registry = {}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _refresh_pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=REFRESH_THREADS, thread_name_prefix="tiered-cache")
+        return _executor
+
+
+class TieredCache:
+    def __init__(self, name, timeout, stale_seconds=None, local_size=LOCAL_SIZE, local_seconds=LOCAL_SECONDS,
+                 wait_seconds=WAIT_SECONDS):
+        self.name = name
+        self.timeout = timeout
+        self.stale_seconds = timeout if stale_seconds is None else stale_seconds
+        self.local_size = local_size
+        self.local_seconds = local_seconds
+        self.wait_seconds = wait_seconds
+        self._local = OrderedDict()  # full key -> (value, fresh until, local copy expires)
+        self._lock = threading.Lock()
+        self._generation = (None, 0.0)  # (generation, when it was read)
+        self.counts = Counter()
+        self._flushed = Counter()
+        self._flushed_at = time.monotonic()
+        registry[name] = self
+
+    # keys
+
+    def _generation_key(self):
+        return f"tiered:{self.name}:generation"
+
+    def _current_generation(self):
+        generation, read_at = self._generation
+        if generation is None or time.monotonic() - read_at > self.local_seconds:
+            generation = cache.get(self._generation_key())
+            if generation is None:
+                cache.add(self._generation_key(), 1, None)
+                generation = cache.get(self._generation_key(), 1)
+            self._generation = (generation, time.monotonic())
+        return generation
+
+    def _full_key(self, key):
+        return f"tiered:{self.name}:{self._current_generation()}:{key}"
+
+    # the in-process tier
+
+    def _local_get(self, full_key):
+        with self._lock:
+            item = self._local.get(full_key)
+            if item is None:
+                return None
+            if item[2] < time.monotonic():
+                del self._local[full_key]
+                return None
+            self._local.move_to_end(full_key)
+            return item[:2]
+
+    def _local_set(self, full_key, entry):
+        with self._lock:
+            self._local[full_key] = (*entry, time.monotonic() + self.local_seconds)
+            self._local.move_to_end(full_key)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+    # reads
+
+    def get_or_set(self, key, compute):
+        """The cached value of ``key``, computing it with ``compute()`` when missing (see module docs)."""
+        full_key = self._full_key(key)
+        entry, tier = self._local_get(full_key), "local"
+        if entry is None:
+            entry, tier = cache.get(full_key), "shared"
+            if entry is not None:
+                self._local_set(full_key, entry)
+        if entry is None:
+            self._count("miss")
+            return self._compute_once(full_key, compute)
+
+        value, fresh_until = entry
+        if time.time() < fresh_until:
+            self._count(f"hit_{tier}")
+        else:
+            self._count("stale")
+            self._refresh_in_background(full_key, compute)
+        return value
+
+    def cached(self, key):
+        """Decorator: cache ``func(*args, **kwargs)`` under ``key(*args, **kwargs)``."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                return self.get_or_set(key(*args, **kwargs), lambda: func(*args, **kwargs))
+            wrapper.cache = self
+            return wrapper
+        return decorator
+
+    def _store(self, full_key, value):
+        entry = (value, time.time() + self.timeout)
+        cache.set(full_key, entry, self.timeout + self.stale_seconds)
+        self._local_set(full_key, entry)
+        return value
+
+    def _compute_once(self, full_key, compute):
+        lock = f"{full_key}:lock"
+        if cache.add(lock, 1, LOCK_SECONDS):
+            try:
+                return self._store(full_key, compute())
+            finally:
+                cache.delete(lock)
+
+        deadline = time.monotonic() + self.wait_seconds
+        while time.monotonic() < deadline:
+            time.sleep(POLL_SECONDS)
+            entry = cache.get(full_key)
+            if entry is not None:
+                self._count("waited")
+                self._local_set(full_key, entry)
+                return entry[0]
+        self._count("wait_timeout")
+        return self._store(full_key, compute())
+
+    def _refresh_in_background(self, full_key, compute):
+        lock = f"{full_key}:lock"
+        if not cache.add(lock, 1, LOCK_SECONDS):
+            return  # someone is already refreshing it
+        # the refresh sees the request's context, e.g. the replica routing of core.dbrouter
+        context = contextvars.copy_context()
+        _refresh_pool().submit(context.run, self._refresh, full_key, lock, compute)
+
+    def _refresh(self, full_key, lock, compute):
+        try:
+            self._store(full_key, compute())
+            self._count("refreshed")
+        except Exception:
+            self._count("refresh_failed")
+            logger.exception("Refreshing %s failed; serving the stale value until it expires", full_key)
+        finally:
+            cache.delete(lock)
+            connections.close_all()  # this thread's connections, back to the pool
+
+    # invalidation
+
+    def invalidate(self, key):
+        full_key = self._full_key(key)
+        cache.delete(full_key)
+        with self._lock:
+            self._local.pop(full_key, None)
+
+    def clear(self):
+        """Drop every entry, in every worker within ``local_seconds``."""
+        try:
+            generation = cache.incr(self._generation_key())
+        except ValueError:  # not set yet, or evicted
+            generation = int(time.time())
+            cache.set(self._generation_key(), generation, None)
+        self._generation = (generation, time.monotonic())
+        with self._lock:
+            self._local.clear()
+
+    # metrics
+
+    def _count(self, name):
+        self.counts[name] += 1
+        if time.monotonic() - self._flushed_at > METRICS_FLUSH_SECONDS:
+            self.flush_metrics()
+
+    def _metric_key(self, name):
+        return f"tiered:{self.name}:stats:{name}"
+
+    def flush_metrics(self):
+        self._flushed_at = time.monotonic()
+        for name, total in list(self.counts.items()):
+            delta = total - self._flushed[name]
+            if not delta:
+                continue
+            key = self._metric_key(name)
+            cache.add(key, 0, None)
+            try:
+                cache.incr(key, delta)
+            except ValueError:
+                cache.set(key, delta, None)
+            self._flushed[name] = total
+
+    def stats(self):
+        shared = cache.get_many([self._metric_key(name) for name in COUNTERS])
+        return {
+            "process": {name: self.counts[name] for name in COUNTERS},
+            "cluster": {name: shared.get(self._metric_key(name), 0) for name in COUNTERS},
+            "local_entries": len(self._local),
+        }
+
+
+def stats():
+    """``{cache name: stats}`` of every TieredCache in this process."""
+    for tiered in registry.values():
+        tiered.flush_metrics()
+    return {name: tiered.stats() for name, tiered in sorted(registry.items())}
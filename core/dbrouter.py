@@ -0,0 +1,80 @@
+"""
+Primary/replica routing.
+
+Writes always go to ``default``. Reads go to a replica only inside views that opt in with
+``ReplicaReadMixin`` (read-only actions), and never for a client that wrote recently: every
+successful write pins that client to the primary for ``DATABASE_PRIMARY_STICKY_SECONDS`` so it
+reads its own writes despite replication lag.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+_read_from_replica = ContextVar("read_from_replica", default=False)
+
+
+def replica_aliases():
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if replicas and _read_from_replica.get():
+            return random.choice(replicas)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replica_aliases():
+            return False
+        return None
+
+
+def _pin_key(request):
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"db:primary-pin:user:{user.pk}"
+    return f"db:primary-pin:ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def pin_to_primary(request):
+    cache.set(_pin_key(request), True, settings.DATABASE_PRIMARY_STICKY_SECONDS)
+
+
+def is_pinned_to_primary(request):
+    return bool(cache.get(_pin_key(request)))
+
+
+class ReplicaReadMixin:
+    """
+    Serve ``replica_actions`` of a viewset (or safe methods of a generic view) from a replica.
+    The switch happens after authentication so the sticky-primary check knows the user.
+    """
+    replica_actions = ("list", "retrieve")
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        action = getattr(self, "action", None)
+        eligible = action in self.replica_actions if action else request.method in SAFE_METHODS
+        if eligible and replica_aliases() and not is_pinned_to_primary(request):
+            self._replica_token = _read_from_replica.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "_replica_token", None)
+        if token is not None:
+            _read_from_replica.reset(token)
+            self._replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
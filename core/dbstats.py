@@ -0,0 +1,28 @@
+from django.db import connections
+
+
+def pool_stats(alias=None):
+    """
+    Connection pool counters per database alias (aliases without a pool are skipped).
+    ``in_use`` and ``waiting`` are gauges; ``wait_ms`` and ``requests`` are cumulative.
+    """
+    stats = {}
+    for name in [alias] if alias else connections:
+        pool = getattr(connections[name], "pool", None)
+        if pool is None:
+            continue
+        raw = pool.get_stats()
+        stats[name] = {
+            "size": raw.get("pool_size", 0),
+            "available": raw.get("pool_available", 0),
+            "in_use": raw.get("pool_size", 0) - raw.get("pool_available", 0),
+            "min_size": raw.get("pool_min", 0),
+            "max_size": raw.get("pool_max", 0),
+            "waiting": raw.get("requests_waiting", 0),
+            "requests": raw.get("requests_num", 0),
+            "queued": raw.get("requests_queued", 0),
+            "wait_ms": raw.get("requests_wait_ms", 0),
+            "errors": raw.get("requests_errors", 0) + raw.get("connections_errors", 0),
+            "connections_opened": raw.get("connections_num", 0),
+        }
+    return stats
@@ -0,0 +1,30 @@
+"""
+Request header helpers for views that serve stored, pre-compressed bodies.
+
+Django's ``GZipMiddleware`` matches ``gzip`` anywhere in ``Accept-Encoding``, so it also
+compresses for ``gzip;q=0``, an explicit refusal. ``accepts_gzip`` honours q-values.
+"""
+
+
+def _quality(params):
+    for param in params:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return float(value.strip())
+            except ValueError:
+                return 0.0  # malformed: don't risk a body the client can't read
+    return 1.0
+
+
+def accepts_gzip(request):
+    """Whether ``Accept-Encoding`` allows gzip: listed (or ``*``) with a non-zero q-value."""
+    wildcard = None
+    for item in request.headers.get("Accept-Encoding", "").split(","):
+        coding, *params = item.split(";")
+        coding = coding.strip().lower()
+        if coding in ("gzip", "x-gzip"):
+            return _quality(params) > 0
+        if coding == "*":
+            wildcard = _quality(params) > 0
+    return bool(wildcard)
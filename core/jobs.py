@@ -0,0 +1,219 @@
+"""
+Database-backed job queue.
+
+Jobs live in the ``core.Job`` table. Functions are registered with ``@job`` (usually in an
+app's ``tasks.py``, which is autodiscovered) and enqueued with ``enqueue()`` or
+``func.enqueue()``. ``manage.py run_workers`` executes them.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# name -> JobSpec
+registry = {}
+
+RETRY_BASE_SECONDS = 10
+# finished jobs are deleted after this long by the core.prune_jobs job
+DONE_RETENTION_DAYS = getattr(settings, "JOB_RETENTION_DAYS", 2)
+FAILED_RETENTION_DAYS = getattr(settings, "FAILED_JOB_RETENTION_DAYS", 30)
+PRUNE_CHUNK_SIZE = 5000
+
+
+class JobSpec:
+    def __init__(self, func, name, priority=0, max_attempts=3, every=None):
+        self.func = func
+        self.name = name
+        self.priority = priority
+        self.max_attempts = max_attempts
+        # periodic jobs are enqueued by the worker scheduler every `every` seconds
+        self.every = every
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, *args, **kwargs):
+        return enqueue(self.name, args=args, kwargs=kwargs)
+
+
+def job(name=None, *, priority=0, max_attempts=3, every=None):
+    """Register a function as a job. The decorated function stays directly callable."""
+    def decorator(func):
+        spec = JobSpec(
+            func,
+            name or f"{func.__module__}.{func.__name__}",
+            priority=priority,
+            max_attempts=max_attempts,
+            every=every.total_seconds() if isinstance(every, timedelta) else every,
+        )
+        registry[spec.name] = spec
+        return spec
+    return decorator
+
+
+def enqueue(task, args=(), kwargs=None, *, priority=None, run_at=None, delay=None,
+            unique_key=None, max_attempts=None):
+    """
+    Queue a job by name (or registered function).
+
+    ``delay`` (seconds) or ``run_at`` schedule it for later. When ``unique_key`` is given and a
+    queued job with that key already exists, that job is returned instead of a new one.
+    """
+    name = task.name if isinstance(task, JobSpec) else task
+    spec = registry.get(name)
+    if run_at is None:
+        run_at = timezone.now()
+        if delay:
+            run_at += timedelta(seconds=delay)
+
+    fields = dict(
+        name=name,
+        payload={"args": list(args), "kwargs": kwargs or {}},
+        priority=priority if priority is not None else (spec.priority if spec else 0),
+        max_attempts=max_attempts or (spec.max_attempts if spec else 3),
+        run_at=run_at,
+        unique_key=unique_key,
+    )
+    if unique_key is None:
+        return Job.objects.create(**fields)
+
+    existing = Job.objects.filter(unique_key=unique_key, status=Job.QUEUED).first()
+    if existing:
+        return existing
+    try:
+        with transaction.atomic():
+            return Job.objects.create(**fields)
+    except IntegrityError:
+        # lost the race against another enqueue of the same key
+        return Job.objects.filter(unique_key=unique_key, status=Job.QUEUED).first()
+
+
+def claim_jobs(worker_id, limit=1):
+    """Atomically mark up to ``limit`` ready jobs as running for this worker and return them."""
+    now = timezone.now()
+    db = router.db_for_write(Job)
+    ready = (
+        Job.objects.using(db)
+        .filter(status=Job.QUEUED, run_at__lte=now)
+        .order_by('-priority', 'run_at', 'id')
+    )
+    claim = dict(status=Job.RUNNING, locked_by=worker_id, locked_at=now, attempts=F('attempts') + 1)
+
+    if connections[db].features.has_select_for_update_skip_locked:
+        # Postgres: concurrent workers skip each other's locked rows instead of blocking
+        with transaction.atomic(using=db):
+            pks = list(ready.select_for_update(skip_locked=True).values_list('pk', flat=True)[:limit])
+            Job.objects.using(db).filter(pk__in=pks).update(**claim)
+    else:
+        # SQLite has no row locks: claim by compare-and-set on the status column
+        pks = []
+        for pk in ready.values_list('pk', flat=True)[:limit * 4]:
+            if Job.objects.using(db).filter(pk=pk, status=Job.QUEUED).update(**claim):
+                pks.append(pk)
+                if len(pks) == limit:
+                    break
+
+    return list(Job.objects.using(db).filter(pk__in=pks).order_by('-priority', 'run_at', 'id'))
+
+
+def run_job(job_obj):
+    spec = registry.get(job_obj.name)
+    try:
+        if spec is None:
+            raise LookupError(f"No job registered as '{job_obj.name}'")
+        spec.func(*job_obj.payload.get("args", []), **job_obj.payload.get("kwargs", {}))
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception("Job %s failed (attempt %s/%s)", job_obj, job_obj.attempts, job_obj.max_attempts)
+        if job_obj.attempts >= job_obj.max_attempts:
+            _finish(job_obj, Job.FAILED, last_error=error, finished_at=timezone.now())
+        else:
+            backoff = RETRY_BASE_SECONDS * 2 ** (job_obj.attempts - 1)
+            _finish(
+                job_obj, Job.QUEUED, last_error=error,
+                run_at=timezone.now() + timedelta(seconds=backoff),
+            )
+        return False
+
+    _finish(job_obj, Job.DONE, finished_at=timezone.now())
+    return True
+
+
+def _finish(job_obj, status, **fields):
+    fields.update(status=status, locked_by='', locked_at=None)
+    try:
+        Job.objects.filter(pk=job_obj.pk).update(**fields)
+    except IntegrityError:
+        # a retry collided with a newly queued job carrying the same unique_key
+        Job.objects.filter(pk=job_obj.pk).update(**dict(fields, unique_key=None))
+
+
+def heartbeat(worker_prefix):
+    """Mark the jobs held by this worker process (``locked_by`` starting with the prefix) alive."""
+    return Job.objects.filter(status=Job.RUNNING, locked_by__startswith=f"{worker_prefix}:").update(
+        locked_at=timezone.now()
+    )
+
+
+def requeue_stale(timeout):
+    """
+    Release jobs whose worker died mid-run: their ``heartbeat`` stopped ``timeout`` seconds ago.
+    Released jobs keep their ``unique_key``, unless a new job with that key was queued meanwhile,
+    in which case that one does the work and the stale one is marked failed.
+    """
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, locked_by='', locked_at=None,
+        last_error='Worker lost while running job', finished_at=timezone.now(),
+    )
+    requeued = 0
+    for pk in stale.values_list('pk', flat=True):
+        job_row = Job.objects.filter(pk=pk, status=Job.RUNNING, locked_at__lt=cutoff)
+        try:
+            with transaction.atomic():
+                requeued += job_row.update(status=Job.QUEUED, locked_by='', locked_at=None)
+        except IntegrityError:
+            failed += job_row.update(
+                status=Job.FAILED, locked_by='', locked_at=None,
+                last_error='Worker lost while running job; superseded by a queued job with the same key',
+                finished_at=timezone.now(),
+            )
+    return requeued + failed
+
+
+def prune_jobs(done_days=DONE_RETENTION_DAYS, failed_days=FAILED_RETENTION_DAYS, chunk_size=PRUNE_CHUNK_SIZE):
+    """Delete done and failed jobs that finished more than the retention ago, in chunks. Returns how many."""
+    now = timezone.now()
+    deleted = 0
+    for status, days in ((Job.DONE, done_days), (Job.FAILED, failed_days)):
+        finished = Job.objects.filter(status=status, finished_at__lt=now - timedelta(days=days))
+        while True:
+            ids = list(finished.values_list('pk', flat=True)[:chunk_size])
+            if not ids:
+                break
+            deleted += Job.objects.filter(pk__in=ids).delete()[0]
+    return deleted
+
+
+def enqueue_periodic(last_enqueued, now=None):
+    """
+    Enqueue every periodic job that is due. ``last_enqueued`` maps job name -> timestamp and is
+    kept by the caller; the queued-job unique key keeps several schedulers from piling up copies.
+    """
+    now = now or timezone.now()
+    for spec in registry.values():
+        if not spec.every:
+            continue
+        last = last_enqueued.get(spec.name)
+        if last is None or (now - last).total_seconds() >= spec.every:
+            enqueue(spec, unique_key=f"periodic:{spec.name}")
+            last_enqueued[spec.name] = now
@@ -0,0 +1,138 @@
+import socket
+import statistics
+import threading
+import time
+
+import psycopg
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from psycopg_pool import ConnectionPool
+
+
+class LatencyProxy:
+    """TCP proxy that delays every forwarded chunk by half the round trip time in each direction."""
+
+    def __init__(self, target, rtt_ms):
+        self.target = target
+        self.delay = rtt_ms / 2000
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(64)
+        self.port = self.server.getsockname()[1]
+        threading.Thread(target=self.accept, daemon=True).start()
+
+    def connect_upstream(self):
+        host, port = self.target
+        if host.startswith("/"):
+            upstream = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            upstream.connect(f"{host}/.s.PGSQL.{port}")
+        else:
+            upstream = socket.create_connection((host, int(port)))
+        return upstream
+
+    def accept(self):
+        while True:
+            client, _ = self.server.accept()
+            upstream = self.connect_upstream()
+            for src, dst in ((client, upstream), (upstream, client)):
+                threading.Thread(target=self.pipe, args=(src, dst), daemon=True).start()
+
+    def pipe(self, src, dst):
+        try:
+            while True:
+                chunk = src.recv(65536)
+                if not chunk:
+                    break
+                time.sleep(self.delay)
+                dst.sendall(chunk)
+        except OSError:
+            pass
+        finally:
+            for sock in (src, dst):
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-request database latency with a new connection per request versus the "
+        "psycopg connection pool, through a proxy that injects network latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--alias", default="default")
+        parser.add_argument("--requests", type=int, default=100, help="Simulated requests per mode.")
+        parser.add_argument("--queries", type=int, default=3, help="Queries per simulated request.")
+        parser.add_argument("--rtt-ms", type=float, default=20.0, help="Injected round trip latency.")
+
+    def handle(self, *args, **options):
+        db = settings.DATABASES[options["alias"]]
+        if db["ENGINE"] != "django.db.backends.postgresql":
+            self.stdout.write(self.style.ERROR("❌ This benchmark needs a PostgreSQL database alias."))
+            return
+
+        proxy = LatencyProxy((db["HOST"] or "localhost", db["PORT"] or 5432), options["rtt_ms"])
+        conninfo = psycopg.conninfo.make_conninfo(
+            host="127.0.0.1",
+            port=proxy.port,
+            dbname=db["NAME"],
+            user=db["USER"],
+            password=db["PASSWORD"],
+            sslmode=db.get("OPTIONS", {}).get("sslmode", "prefer"),
+        )
+        self.stdout.write(self.style.WARNING(
+            f"{options['requests']} requests x {options['queries']} queries, "
+            f"{options['rtt_ms']}ms injected RTT"
+        ))
+
+        def run_queries(conn):
+            with conn.cursor() as cursor:
+                for _ in range(options["queries"]):
+                    cursor.execute("SELECT 1")
+                    cursor.fetchone()
+
+        def new_connection():
+            with psycopg.connect(conninfo, autocommit=True) as conn:
+                run_queries(conn)
+
+        results = {"new connection per request": self.measure(new_connection, options["requests"])}
+
+        for label, check in (("pool", None), ("pool + health check", ConnectionPool.check_connection)):
+            pool = ConnectionPool(conninfo, min_size=1, max_size=4, check=check, kwargs={"autocommit": True})
+            pool.wait()
+
+            def pooled():
+                with pool.connection() as conn:
+                    run_queries(conn)
+
+            results[label] = self.measure(pooled, options["requests"])
+            stats = pool.get_stats()
+            pool.close()
+            self.stdout.write(
+                f"  {label} stats: size={stats.get('pool_size')} requests={stats.get('requests_num')} "
+                f"wait_ms={stats.get('requests_wait_ms', 0)}"
+            )
+
+        baseline = results["new connection per request"]["mean"]
+        for label, r in results.items():
+            self.stdout.write(
+                f"{label:<28} mean {r['mean']:8.2f}ms  p50 {r['p50']:8.2f}ms  p95 {r['p95']:8.2f}ms"
+                f"  ({baseline / r['mean']:.1f}x)"
+            )
+
+    def measure(self, func, n):
+        func()  # warm up
+        timings = []
+        for _ in range(n):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        return {
+            "mean": statistics.fmean(timings),
+            "p50": timings[len(timings) // 2],
+            "p95": timings[int(len(timings) * 0.95) - 1],
+        }
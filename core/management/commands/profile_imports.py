@@ -0,0 +1,86 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# what a worker imports, in order: the settings module, the WSGI app (django.setup(), every
+# app's models/admin/signals) and, on its first request, the URLconf with all the views
+STAGES = {
+    "settings": "import {settings}",
+    "wsgi": "import Conceptiq.wsgi",
+    "first request": "import Conceptiq.wsgi, {urlconf}",
+}
+# packages that should never be loaded by a web worker
+HEAVY = ("numpy", "scipy", "drf_spectacular", "drf_yasg", "coreapi", "jinja2")
+
+
+def profile(code):
+    """``python -X importtime`` of ``code`` in a fresh interpreter: [(module, self µs, cumulative µs)]."""
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+    run = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    if run.returncode:
+        raise CommandError(f"{code!r} failed:\n{run.stderr[-2000:]}")
+    modules = []
+    for line in run.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(own), int(cumulative)))
+    return modules
+
+
+class Command(BaseCommand):
+    help = (
+        "Import-time profile of Conceptiq.settings, the WSGI app and the URLconf, each measured in a fresh "
+        "interpreter with python -X importtime, so startup regressions show up."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=15, help="Slowest modules and packages to list per stage.")
+        parser.add_argument("--budget-ms", type=float, help="Fail when the first-request stage takes longer.")
+        parser.add_argument("--json", help="Also write the report to this file, e.g. to diff between builds.")
+
+    def handle(self, *args, **options):
+        report = {}
+        for stage, code in STAGES.items():
+            modules = profile(code.format(settings=settings.SETTINGS_MODULE, urlconf=settings.ROOT_URLCONF))
+            packages = defaultdict(int)
+            for name, own, _ in modules:
+                packages[name.split(".")[0]] += own
+            report[stage] = {
+                "total_ms": round(sum(own for _, own, _ in modules) / 1000, 1),
+                "modules": len(modules),
+                "packages": {
+                    name: round(us / 1000, 1)
+                    for name, us in sorted(packages.items(), key=lambda item: -item[1])[:options["top"]]
+                },
+                "slowest": [
+                    {"module": name, "self_ms": round(own / 1000, 1), "cumulative_ms": round(cumulative / 1000, 1)}
+                    for name, own, cumulative in sorted(modules, key=lambda module: -module[1])[:options["top"]]
+                ],
+                "heavy": sorted({name.split(".")[0] for name, _, _ in modules} & set(HEAVY)),
+            }
+            self.print_stage(stage, report[stage])
+
+        if options["json"]:
+            with open(options["json"], "w") as f:
+                json.dump(report, f, indent=2)
+        total = report["first request"]["total_ms"]
+        if options["budget_ms"] is not None and total > options["budget_ms"]:
+            raise CommandError(f"Startup imports take {total} ms, over the {options['budget_ms']} ms budget")
+        self.stdout.write(self.style.SUCCESS(f"✅ Startup imports: {total} ms until the first request is routed"))
+
+    def print_stage(self, stage, data):
+        self.stdout.write(self.style.WARNING(f"{stage}: {data['total_ms']} ms, {data['modules']} modules"))
+        self.stdout.write("  by package: " + ", ".join(f"{name} {ms}" for name, ms in data["packages"].items()))
+        for module in data["slowest"]:
+            self.stdout.write(f"  {module['self_ms']:>8} ms  {module['module']} (cumulative {module['cumulative_ms']} ms)")
+        if data["heavy"]:
+            self.stdout.write(self.style.ERROR(f"  not needed by web workers, but imported: {', '.join(data['heavy'])}"))
@@ -0,0 +1,78 @@
+import os
+import signal
+import socket
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from core.jobs import claim_jobs, enqueue_periodic, heartbeat, requeue_stale, run_job
+
+HEARTBEAT_SECONDS = 30
+
+
+class Command(BaseCommand):
+    help = "Run background job workers from the database job queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2, help="Number of concurrent worker threads.")
+        parser.add_argument("--poll", type=float, default=1.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument("--batch", type=int, default=1, help="Jobs claimed per poll by each worker.")
+        parser.add_argument(
+            "--stale-timeout", type=int, default=600,
+            help="Requeue running jobs whose worker process has sent no heartbeat for this many seconds.",
+        )
+        parser.add_argument("--once", action="store_true", help="Drain the ready jobs once and exit.")
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        signal.signal(signal.SIGINT, lambda *_: self.stop.set())
+        signal.signal(signal.SIGTERM, lambda *_: self.stop.set())
+
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        threads = [
+            threading.Thread(target=self.work, args=(f"{prefix}:{n}", options), daemon=True)
+            for n in range(options["workers"])
+        ]
+        self.stdout.write(self.style.WARNING(f"Starting {len(threads)} workers ({prefix})..."))
+        for thread in threads:
+            thread.start()
+
+        # the main thread keeps this process's running jobs alive, schedules periodic jobs and
+        # recovers jobs from dead workers
+        last_enqueued = {}
+        heartbeat_every = min(HEARTBEAT_SECONDS, options["stale_timeout"] / 3)
+        last_heartbeat = 0.0
+        while not self.stop.is_set() and any(t.is_alive() for t in threads):
+            close_old_connections()
+            if time.monotonic() - last_heartbeat >= heartbeat_every:
+                heartbeat(prefix)
+                last_heartbeat = time.monotonic()
+            enqueue_periodic(last_enqueued)
+            requeued = requeue_stale(options["stale_timeout"])
+            if requeued:
+                self.stdout.write(self.style.WARNING(f"Released {requeued} stale jobs"))
+            self.stop.wait(options["poll"])
+
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+        connection.close()
+        self.stdout.write(self.style.SUCCESS("Workers stopped."))
+
+    def work(self, worker_id, options):
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                jobs = claim_jobs(worker_id, limit=options["batch"])
+                for job_obj in jobs:
+                    ok = run_job(job_obj)
+                    status = self.style.SUCCESS("done") if ok else self.style.ERROR("error")
+                    self.stdout.write(f"[{worker_id}] {job_obj.name} #{job_obj.pk} {status}")
+                if not jobs:
+                    if options["once"]:
+                        return
+                    self.stop.wait(options["poll"])
+        finally:
+            connection.close()
@@ -0,0 +1,16 @@
+from rest_framework.permissions import SAFE_METHODS
+
+from .dbrouter import pin_to_primary, replica_aliases
+
+
+class PrimaryPinMiddleware:
+    """Pin a client to the primary database after any successful write request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400 and replica_aliases():
+            pin_to_primary(request)
+        return response
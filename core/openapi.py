@@ -0,0 +1,96 @@
+"""
+Prebuilt OpenAPI schema.
+
+Generating the schema introspects every view and serializer, and drf-spectacular alone adds
+tens of milliseconds to every worker boot when it is the runtime ``DEFAULT_SCHEMA_CLASS``
+(``@api_view`` binds the schema class at import time). So the schema is built once, by
+``manage.py build_openapi`` at deploy time, into ``OPENAPI_SCHEMA_DIR``:
+
+    schema-<version>.json       the schema; <version> is a hash of its content
+    schema-<version>.json.gz    the same, gzipped
+    current.json                {"version", "built_at", "paths"}
+
+``/api/schema/`` redirects to the current version, and ``/api/schema/<version>.json`` is
+served from disk as immutable, so clients and CDNs cache it until the next build changes the
+URL. The generator is only imported by ``build``.
+"""
+import gzip
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.utils import encoders
+
+SCHEMA_DIR = Path(getattr(settings, "OPENAPI_SCHEMA_DIR", settings.BASE_DIR / "openapi"))
+GENERATOR_SCHEMA_CLASS = "drf_spectacular.openapi.AutoSchema"
+KEEP_VERSIONS = 3  # older builds stay servable for clients that still have their URL
+
+
+def _write(path, data):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def build():
+    """Generate the schema and write it as the current version; returns the pointer dict."""
+    from django.test.utils import override_settings
+
+    if settings.ROOT_URLCONF in sys.modules:
+        # function views already bound the runtime schema class when they were decorated
+        raise RuntimeError("Build the schema in a fresh process, before the URLconf is imported")
+
+    rest_framework = {**settings.REST_FRAMEWORK, "DEFAULT_SCHEMA_CLASS": GENERATOR_SCHEMA_CLASS}
+    with override_settings(REST_FRAMEWORK=rest_framework):  # reloads DRF's api_settings
+        from drf_spectacular.generators import SchemaGenerator
+
+        schema = SchemaGenerator().get_schema(request=None, public=True)
+
+    body = json.dumps(schema, cls=encoders.JSONEncoder, sort_keys=True, separators=(",", ":")).encode()
+    version = hashlib.sha256(body).hexdigest()[:12]
+    SCHEMA_DIR.mkdir(parents=True, exist_ok=True)
+    _write(SCHEMA_DIR / f"schema-{version}.json", body)
+    _write(SCHEMA_DIR / f"schema-{version}.json.gz", gzip.compress(body, mtime=0))
+    current = {"version": version, "built_at": timezone.now().isoformat(), "paths": len(schema.get("paths", {}))}
+    _write(SCHEMA_DIR / "current.json", json.dumps(current).encode())
+    _prune(version)
+    return current
+
+
+def _prune(version):
+    builds = sorted(SCHEMA_DIR.glob("schema-*.json"), key=lambda path: path.stat().st_mtime, reverse=True)
+    for path in builds[KEEP_VERSIONS:]:
+        if version not in path.name:
+            path.unlink(missing_ok=True)
+            path.with_name(path.name + ".gz").unlink(missing_ok=True)
+
+
+def current_version():
+    try:
+        return json.loads((SCHEMA_DIR / "current.json").read_bytes())["version"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+# (version, gzipped) -> bytes; built files never change, so they are read once per process
+_loaded = {}
+
+
+def read_schema(version, gzipped=False):
+    """Bytes of a built version, or None."""
+    key = (version, gzipped)
+    if key not in _loaded:
+        if not version.isalnum():
+            return None
+        try:
+            body = (SCHEMA_DIR / f"schema-{version}.json{'.gz' if gzipped else ''}").read_bytes()
+        except OSError:
+            return None
+        if len(_loaded) >= 4 * KEEP_VERSIONS:
+            _loaded.clear()
+        _loaded[key] = body
+    return _loaded[key]
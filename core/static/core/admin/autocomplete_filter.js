@@ -0,0 +1,14 @@
+'use strict';
+{
+    const $ = django.jQuery;
+
+    // Apply an AutocompleteFilter as soon as a value is picked or cleared.
+    $(function() {
+        $('.autocomplete-filter select').on('change', function() {
+            const value = $(this).val();
+            window.location.search = value
+                ? this.dataset.queryString.replace('__value__', encodeURIComponent(value))
+                : this.dataset.clearQueryString;
+        });
+    });
+}
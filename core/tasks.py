@@ -0,0 +1,8 @@
+from datetime import timedelta
+
+from .jobs import job, prune_jobs as prune
+
+
+@job("core.prune_jobs", priority=-5, every=timedelta(hours=1))
+def prune_jobs():
+    prune()
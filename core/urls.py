@@ -0,0 +1,9 @@
+from django.urls import path
+from .views import cache_health, db_health, openapi_schema, openapi_schema_version
+
+urlpatterns = [
+    path('health/db/', db_health, name='db-health'),
+    path('health/cache/', cache_health, name='cache-health'),
+    path('schema/', openapi_schema, name='openapi-schema'),
+    path('schema/<str:version>.json', openapi_schema_version, name='openapi-schema-version'),
+]
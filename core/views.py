@@ -0,0 +1,72 @@
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.http import Http404, HttpResponse, HttpResponseRedirect, JsonResponse
+from django.urls import reverse
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_safe
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from .cache import stats as tiered_cache_stats
+from .dbstats import pool_stats
+from .http import accepts_gzip
+from .openapi import current_version, read_schema
+
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAdminUser])
+def db_health(request):
+    databases = {}
+    healthy = True
+    for alias in connections:
+        started = time.perf_counter()
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute("SELECT 1")
+            databases[alias] = {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+        except Exception as e:
+            healthy = False
+            databases[alias] = {"ok": False, "error": str(e)}
+
+    return Response({"databases": databases, "pools": pool_stats()}, status=200 if healthy else 503)
+
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAdminUser])
+def cache_health(request):
+    # hit/miss/stale counts of the tiered caches (core/cache.py), this worker and all of them
+    return Response({"backend": settings.CACHES["default"]["BACKEND"], "caches": tiered_cache_stats()})
+
+
+@require_safe
+def openapi_schema(request):
+    """Redirect to the current prebuilt schema (see core.openapi)."""
+    version = current_version()
+    if version is None:
+        return JsonResponse({"detail": "The schema has not been built; run manage.py build_openapi."}, status=404)
+    response = HttpResponseRedirect(reverse("openapi-schema-version", args=[version]))
+    response["Cache-Control"] = "public, max-age=60"
+    return response
+
+
+@require_safe
+def openapi_schema_version(request, version):
+    etag = f'"{version}"'
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponse(status=304)
+    else:
+        gzipped = accepts_gzip(request)
+        body = read_schema(version, gzipped)
+        if body is None:
+            raise Http404("No such schema version.")
+        response = HttpResponse(body, content_type="application/vnd.oai.openapi+json")
+        if gzipped:
+            response["Content-Encoding"] = "gzip"
+    # the URL changes with the content, so it can be cached for good
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    response["ETag"] = etag
+    response["Vary"] = "Accept-Encoding"
+    return response
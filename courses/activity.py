@@ -0,0 +1,151 @@
+"""
+Learner activity log.
+
+Recording a lesson open by writing the learner's CourseProgress row took a row lock and wrote a
+new row version (and its WAL) per click, because ``last_accessed`` is ``auto_now``; a whole
+class opening the same lesson in a live session queued on those locks. Clients now post
+``open`` and ``complete`` events instead. ``record`` appends them to ``ActivityEvent`` with one
+multi-row INSERT per request: no locks, no foreign key checks, one small partial index.
+
+``compact`` (the ``courses.compact_activity`` job, every ``ACTIVITY_COMPACT_SECONDS``) claims
+pending events with ``SKIP LOCKED``, folds them per (student, course, content) — the latest
+event into ``last_accessed``, the earliest completion into ``completed``/``completed_at`` —
+and applies the result with one bulk update and one bulk insert per batch. Folded events are
+stamped ``compacted_at``; ``prune`` deletes them after ``ACTIVITY_RETENTION_DAYS``.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import Profile
+from .entitlements import access_denied
+from .models import ActivityEvent, Content, CourseProgress
+
+logger = logging.getLogger(__name__)
+
+COMPACT_SECONDS = getattr(settings, "ACTIVITY_COMPACT_SECONDS", 5)
+COMPACT_BATCH_SIZE = getattr(settings, "ACTIVITY_COMPACT_BATCH_SIZE", 5000)
+RETENTION_DAYS = getattr(settings, "ACTIVITY_RETENTION_DAYS", 7)
+MAX_EVENTS = getattr(settings, "ACTIVITY_MAX_EVENTS", 500)  # per request
+PRUNE_CHUNK_SIZE = 5000
+
+KINDS = {"open": ActivityEvent.OPEN, "complete": ActivityEvent.COMPLETE}
+
+
+def record(user, events):
+    """
+    Append ``events`` (``[{"content": id, "type": "open" | "complete"}]``) for ``user``, stamped
+    now. Events for missing content or content the user may not open are rejected. Returns
+    ``(accepted, rejected)``.
+    """
+    profile = getattr(user, "profile", None)
+    if profile is None:
+        return 0, len(events)
+    contents = {
+        pk: (is_free, course_id)
+        for pk, is_free, course_id in Content.objects.filter(
+            pk__in={event["content"] for event in events}, chapter__course__deleted_at__isnull=True
+        ).values_list("pk", "chapter__is_free", "chapter__course_id")
+    }
+    allowed = {}
+    now = timezone.now()
+    rows = []
+    for event in events:
+        chapter = contents.get(event["content"])
+        if chapter is None:
+            continue
+        if chapter not in allowed:
+            allowed[chapter] = access_denied(user, *chapter) is None
+        if allowed[chapter]:
+            rows.append(ActivityEvent(
+                student_id=profile.pk, content_id=event["content"], kind=KINDS[event["type"]], at=now
+            ))
+    ActivityEvent.objects.bulk_create(rows)
+    return len(rows), len(events) - len(rows)
+
+
+def compact(batch_size=COMPACT_BATCH_SIZE):
+    """Fold every pending event into CourseProgress, a batch per transaction. Returns the totals."""
+    totals = {"events": 0, "updated": 0, "inserted": 0, "dropped": 0}
+    while True:
+        with transaction.atomic():
+            events = list(
+                ActivityEvent.objects.select_for_update(skip_locked=True).filter(compacted_at__isnull=True)
+                .order_by("id").values_list("id", "student_id", "content_id", "kind", "at")[:batch_size]
+            )
+            if not events:
+                break
+            result = _fold(events)
+            ActivityEvent.objects.filter(pk__in=[event[0] for event in events]).update(compacted_at=timezone.now())
+        for name, count in result.items():
+            totals[name] += count
+        totals["events"] += len(events)
+        if len(events) < batch_size:
+            break
+    if totals["events"]:
+        logger.info("Compacted activity: %s", totals)
+    return totals
+
+
+def _fold(events):
+    # (student, content) -> [latest event, earliest completion]
+    folded = {}
+    for _, student_id, content_id, kind, at in events:
+        entry = folded.setdefault((student_id, content_id), [at, None])
+        entry[0] = max(entry[0], at)
+        if kind == ActivityEvent.COMPLETE and (entry[1] is None or at < entry[1]):
+            entry[1] = at
+
+    student_ids = {student_id for student_id, _ in folded}
+    content_ids = {content_id for _, content_id in folded}
+    students = set(Profile.objects.filter(pk__in=student_ids).values_list("pk", flat=True))
+    contents = {
+        pk: (course_id, chapter_id)
+        for pk, course_id, chapter_id in Content.objects.filter(
+            pk__in=content_ids, chapter__course__deleted_at__isnull=True
+        ).values_list("pk", "chapter__course_id", "chapter_id")
+    }
+    dropped = [key for key in folded if key[0] not in students or key[1] not in contents]
+    for key in dropped:
+        del folded[key]
+
+    changed = []
+    for progress in CourseProgress.objects.filter(student_id__in=student_ids, content_id__in=content_ids):
+        entry = folded.pop((progress.student_id, progress.content_id), None)
+        if entry is None:
+            continue
+        latest, completed_at = entry
+        if latest > progress.last_accessed or (completed_at and not progress.completed):
+            progress.last_accessed = max(progress.last_accessed, latest)
+            if completed_at and not progress.completed:
+                progress.completed, progress.completed_at = True, completed_at
+            changed.append(progress)
+    CourseProgress.objects.bulk_update(changed, ["last_accessed", "completed", "completed_at"], batch_size=1000)
+
+    # auto_now stamps new rows with the compaction time, seconds after the events. A row created
+    # meanwhile by another writer wins the conflict; the next open updates it
+    inserted = CourseProgress.objects.bulk_create(
+        [
+            CourseProgress(
+                student_id=student_id, course_id=contents[content_id][0], chapter_id=contents[content_id][1],
+                content_id=content_id, completed=completed_at is not None, completed_at=completed_at,
+            )
+            for (student_id, content_id), (_, completed_at) in folded.items()
+        ],
+        batch_size=1000, ignore_conflicts=True,
+    )
+    return {"updated": len(changed), "inserted": len(inserted), "dropped": len(dropped)}
+
+
+def prune(retention_days=RETENTION_DAYS, chunk_size=PRUNE_CHUNK_SIZE):
+    """Delete events compacted more than ``retention_days`` ago, in chunks. Returns how many."""
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    deleted = 0
+    while True:
+        ids = list(ActivityEvent.objects.filter(compacted_at__lt=cutoff).values_list("pk", flat=True)[:chunk_size])
+        if not ids:
+            return deleted
+        deleted += ActivityEvent.objects.filter(pk__in=ids).delete()[0]
@@ -1,4 +1,15 @@
-from django.contrib import admin
+import json
+
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponseRedirect
+from django.shortcuts import get_object_or_404
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from core.admin_utils import AutocompleteFilter, LargeTableAdmin
+from .chapter_tree import course_tree, rearrange
 from .models import (
     Domain,
     Discipline,
@@ -9,8 +20,11 @@ from .models import (
     Content,
     Review,
     Favourite,
-    CourseProgress
+    CourseProgress,
+    CoursePopularity,
+    CoursePurge,
 )
+from .purge import soft_delete_courses
 
 # -----------------------
 # Domain, Discipline, Track
@@ -22,16 +36,18 @@ class DomainAdmin(admin.ModelAdmin):
 
 
 @admin.register(Discipline)
-class DisciplineAdmin(admin.ModelAdmin):
+class DisciplineAdmin(LargeTableAdmin):
     list_display = ('name', 'domain')
     list_filter = ('domain',)
+    list_select_related = ('domain',)
     search_fields = ('name',)
 
 
 @admin.register(Track)
-class TrackAdmin(admin.ModelAdmin):
+class TrackAdmin(LargeTableAdmin):
     list_display = ('name', 'domain')
     list_filter = ('domain',)
+    list_select_related = ('domain',)
     search_fields = ('name',)
 
 
@@ -45,51 +61,129 @@ class LevelAdmin(admin.ModelAdmin):
 # Courses
 # -----------------------
 @admin.register(Course)
-class CourseAdmin(admin.ModelAdmin):
-    list_display = ('title', 'domain', 'discipline', 'track', 'teacher', 'status', 'price', 'price_unit')
-    list_filter = ('domain', 'discipline', 'track', 'status', 'language')
+class CourseAdmin(LargeTableAdmin):
+    list_display = ('title', 'domain', 'discipline', 'track', 'teacher', 'status', 'price', 'price_unit', 'chapter_tree')
+    list_filter = (
+        'domain', ('discipline', AutocompleteFilter), ('track', AutocompleteFilter),
+        ('teacher', AutocompleteFilter), 'status', 'language',
+    )
+    list_select_related = ('domain', 'discipline__domain', 'track__domain', 'teacher__user')
+    autocomplete_fields = ('discipline', 'track', 'teacher')
     search_fields = ('title', 'teacher__user__username')
     ordering = ('title',)
 
+    @admin.display(description="Chapters")
+    def chapter_tree(self, obj):
+        return format_html('<a href="{}">Arrange</a>', reverse("admin:courses_course_chapter_tree", args=[obj.pk]))
+
+    def get_urls(self):
+        return [
+            path(
+                "<int:course_id>/chapters/", self.admin_site.admin_view(self.chapter_tree_view),
+                name="courses_course_chapter_tree",
+            ),
+            *super().get_urls(),
+        ]
+
+    def chapter_tree_view(self, request, course_id):
+        """Drag-and-drop chapter tree of one course, saved as one rebuild (courses/chapter_tree.py)."""
+        course = get_object_or_404(Course, pk=course_id)
+        if not self.has_change_permission(request, course):
+            raise PermissionDenied
+        if request.method == "POST":
+            try:
+                changed = rearrange(course.pk, json.loads(request.POST.get("tree") or "[]"))
+            except ValueError as exc:  # InvalidTree or malformed JSON
+                self.message_user(request, f"The chapters were not saved: {exc}", messages.ERROR)
+            else:
+                self.message_user(request, f"Saved the chapter tree ({changed} chapters changed).", messages.SUCCESS)
+            return HttpResponseRedirect(request.path)
+        context = {
+            **self.admin_site.each_context(request),
+            "title": f"Chapters of {course.title}",
+            "opts": self.opts,
+            "original": course,
+            "tree": course_tree(course.pk),
+        }
+        return TemplateResponse(request, "admin/courses/course/chapter_tree.html", context)
+
+    # Deleting is a soft delete plus a background purge (courses/purge.py), so the
+    # confirmation page doesn't walk every chapter, content and enrollment either.
+    def get_deleted_objects(self, objs, request):
+        return [str(obj) for obj in objs], {Course._meta.verbose_name_plural: len(objs)}, set(), []
+
+    def delete_model(self, request, obj):
+        obj.soft_delete()
+
+    def delete_queryset(self, request, queryset):
+        soft_delete_courses(queryset.values_list("pk", flat=True))
+
 
 # -----------------------
 # Chapters & Contents
 # -----------------------
 @admin.register(Chapter)
-class ChapterAdmin(admin.ModelAdmin):
+class ChapterAdmin(LargeTableAdmin):
     list_display = ('title', 'course', 'parent', 'order')
-    list_filter = ('course',)
+    list_filter = (('course', AutocompleteFilter),)
+    list_select_related = ('course__domain', 'parent__course')
+    autocomplete_fields = ('course', 'parent')
     search_fields = ('title',)
 
 
 @admin.register(Content)
-class ContentAdmin(admin.ModelAdmin):
+class ContentAdmin(LargeTableAdmin):
     list_display = ('title', 'chapter', 'type', 'order')
-    list_filter = ('chapter', 'type')
+    list_filter = (('chapter__course', AutocompleteFilter), ('chapter', AutocompleteFilter), 'type')
+    list_select_related = ('chapter__course',)
+    autocomplete_fields = ('chapter',)
     search_fields = ('title',)
+    # Content.Meta orders by "order", which is a sort of the whole table here
+    ordering = ('-pk',)
 
 
 # -----------------------
 # User Behavior
 # -----------------------
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(LargeTableAdmin):
     list_display = ('student', 'course', 'rating', 'created_at')
-    list_filter = ('course', 'rating', 'created_at')
+    list_filter = (('course', AutocompleteFilter), 'rating', 'created_at')
+    list_select_related = ('student__user', 'course__domain')
+    autocomplete_fields = ('student', 'course')
     search_fields = ('student__user__username', 'course__title')
 
 
 @admin.register(Favourite)
-class FavouriteAdmin(admin.ModelAdmin):
+class FavouriteAdmin(LargeTableAdmin):
     list_display = ('student', 'course', 'created_at')
-    list_filter = ('course', 'created_at')
+    list_filter = (('course', AutocompleteFilter), 'created_at')
+    list_select_related = ('student__user', 'course__domain')
+    autocomplete_fields = ('student', 'course')
     search_fields = ('student__user__username', 'course__title')
 
 
 
 
 @admin.register(CourseProgress)
-class CourseProgressAdmin(admin.ModelAdmin):
+class CourseProgressAdmin(LargeTableAdmin):
     list_display = ('student', 'course', 'chapter', 'content', 'completed', 'last_accessed')
-    list_filter = ('course', 'completed')
+    list_filter = (('course', AutocompleteFilter), 'completed')
+    list_select_related = ('student__user', 'course__domain', 'chapter__course', 'content__chapter')
+    autocomplete_fields = ('student', 'course', 'chapter', 'content')
     search_fields = ('student__user__username', 'course__title')
+
+
+@admin.register(CoursePopularity)
+class CoursePopularityAdmin(LargeTableAdmin):
+    list_display = ('course', 'enrollments', 'favourites', 'reviews', 'recomputed_at')
+    list_select_related = ('course__domain',)
+    search_fields = ('course__title',)
+    readonly_fields = ('course', 'enrollments', 'favourites', 'reviews', 'recomputed_at')
+
+
+@admin.register(CoursePurge)
+class CoursePurgeAdmin(admin.ModelAdmin):
+    list_display = ('title', 'course_id', 'status', 'current', 'deleted', 'started_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = ('course_id', 'title', 'status', 'current', 'deleted', 'started_at', 'updated_at', 'finished_at', 'error')
@@ -0,0 +1,155 @@
+"""
+Daily rollups behind the teacher analytics API.
+
+``CourseDailyStats`` holds per-course, per-day enrollments, reviews (count and rating total)
+and content completions; ``ChapterFunnel`` holds per-chapter started/completed student counts.
+The API reads only these tables.
+
+``update()`` runs every few minutes and consumes rows newer than a watermark. Buckets are
+always recounted from the source rows rather than incremented, so overlapping runs are
+harmless: enrollments and reviews are recounted for every day since the watermark, completions
+for those days plus the days of any older progress row touched since, and funnels for every
+course with touched progress. ``backfill()`` (``manage.py backfill_analytics``) recounts
+everything, which also picks up deletions.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Min, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import (
+    ActivityEvent, Chapter, ChapterFunnel, Content, Course, CourseDailyStats, CourseEnrollment, CourseProgress, Review,
+    RollupWatermark,
+)
+
+WATERMARK = "teacher_analytics"
+# rows saved shortly before a run can commit after it; reread them next time
+OVERLAP = timedelta(minutes=5)
+BATCH_SIZE = 500  # courses per backfill/funnel batch
+
+# source -> (rows, timestamp field, CourseDailyStats columns)
+SOURCES = {
+    "enrollments": (CourseEnrollment.objects.all(), "enrolled_at", {"enrollments": Count("id")}),
+    "reviews": (Review.objects.all(), "created_at", {"reviews": Count("id"), "rating_total": Sum("rating")}),
+    "completions": (
+        CourseProgress.objects.filter(completed=True, completed_at__isnull=False), "completed_at",
+        {"completions": Count("id")},
+    ),
+}
+
+
+def _start_of(day):
+    return datetime.combine(day, time.min, tzinfo=timezone.get_current_timezone())
+
+
+def _recount(source, events, buckets):
+    """Recount one source's columns for the ``buckets`` (CourseDailyStats queryset) from ``events``."""
+    _, timestamp, aggregates = SOURCES[source]
+    rows = events.annotate(day=TruncDate(timestamp)).order_by().values("course_id", "day").annotate(**aggregates)
+    stats = [
+        CourseDailyStats(course_id=row["course_id"], day=row["day"], **{name: row[name] or 0 for name in aggregates})
+        for row in rows
+    ]
+    with transaction.atomic():
+        buckets.update(**dict.fromkeys(aggregates, 0))
+        CourseDailyStats.objects.bulk_create(
+            stats, batch_size=1000, update_conflicts=True, unique_fields=["course", "day"],
+            update_fields=list(aggregates),
+        )
+
+
+def refresh_funnels(course_ids):
+    course_ids = list(course_ids)
+    for start in range(0, len(course_ids), BATCH_SIZE):
+        batch = course_ids[start:start + BATCH_SIZE]
+        progress = CourseProgress.objects.filter(course_id__in=batch).annotate(
+            chapter_key=Coalesce("content__chapter_id", "chapter_id")
+        ).order_by()
+        contents = dict(
+            Content.objects.filter(chapter__course_id__in=batch).order_by().values("chapter_id")
+            .annotate(total=Count("id")).values_list("chapter_id", "total")
+        )
+        started = dict(
+            progress.exclude(chapter_key=None).values("chapter_key")
+            .annotate(students=Count("student_id", distinct=True)).values_list("chapter_key", "students")
+        )
+        completed = {}
+        per_student = (
+            progress.filter(completed=True, content__isnull=False).values("chapter_key", "student_id")
+            .annotate(done=Count("content_id", distinct=True)).values_list("chapter_key", "done")
+        )
+        for chapter_id, done in per_student:
+            if done >= contents.get(chapter_id, 0) > 0:
+                completed[chapter_id] = completed.get(chapter_id, 0) + 1
+
+        funnels = [
+            ChapterFunnel(
+                chapter_id=chapter_id, course_id=course_id,
+                students_started=started.get(chapter_id, 0), students_completed=completed.get(chapter_id, 0),
+            )
+            for chapter_id, course_id in Chapter.objects.filter(course_id__in=batch).values_list("id", "course_id")
+        ]
+        ChapterFunnel.objects.bulk_create(
+            funnels, batch_size=1000, update_conflicts=True, unique_fields=["chapter"],
+            update_fields=["students_started", "students_completed", "updated_at"],
+        )
+
+
+def update():
+    """Fold rows newer than the watermark into the rollups; backfills on the first run."""
+    started = timezone.now()
+    mark = RollupWatermark.objects.filter(name=WATERMARK).first()
+    if mark is None:
+        return backfill()
+
+    since = mark.value - OVERLAP
+    # compacted activity (courses/activity.py) stamps last_accessed with the event time, which is
+    # older than the watermark when compaction fell behind: reach back to the oldest event
+    # compacted since
+    oldest_event = ActivityEvent.objects.filter(compacted_at__gte=since).aggregate(oldest=Min("at"))["oldest"]
+    if oldest_event is not None:
+        since = min(since, oldest_event)
+    since_day = timezone.localdate(since)
+    day_start = _start_of(since_day)
+    for source in ("enrollments", "reviews"):
+        events, timestamp, _ = SOURCES[source]
+        _recount(source, events.filter(**{f"{timestamp}__gte": day_start}), CourseDailyStats.objects.filter(day__gte=since_day))
+
+    touched = CourseProgress.objects.filter(last_accessed__gte=since)
+    course_ids = set(touched.values_list("course_id", flat=True))
+    old_days = set(
+        touched.filter(completed_at__lt=day_start).annotate(day=TruncDate("completed_at"))
+        .values_list("day", flat=True).distinct()
+    )
+    events, _, _ = SOURCES["completions"]
+    _recount(
+        "completions",
+        events.filter(Q(completed_at__gte=day_start) | Q(course_id__in=course_ids, completed_at__date__in=old_days)),
+        CourseDailyStats.objects.filter(Q(day__gte=since_day) | Q(course_id__in=course_ids, day__in=old_days)),
+    )
+    refresh_funnels(course_ids)
+
+    RollupWatermark.objects.update_or_create(name=WATERMARK, defaults={"value": started})
+    return len(course_ids)
+
+
+def backfill(course_ids=None, progress=None):
+    """
+    Recount every rollup from scratch (or only for ``course_ids``), ``BATCH_SIZE`` courses at a
+    time. ``progress(done, total)`` is called after each batch.
+    """
+    started = timezone.now()
+    ids = list(course_ids) if course_ids is not None else list(Course.objects.order_by("pk").values_list("pk", flat=True))
+    for start in range(0, len(ids), BATCH_SIZE):
+        batch = ids[start:start + BATCH_SIZE]
+        for source, (events, _, _) in SOURCES.items():
+            _recount(source, events.filter(course_id__in=batch), CourseDailyStats.objects.filter(course_id__in=batch))
+        refresh_funnels(batch)
+        if progress:
+            progress(min(start + BATCH_SIZE, len(ids)), len(ids))
+
+    if course_ids is None:
+        RollupWatermark.objects.update_or_create(name=WATERMARK, defaults={"value": started})
+    return len(ids)
@@ -0,0 +1,306 @@
+"""
+HTML and plain text of a content's Puck document (``Content.data``).
+
+``render(data)`` walks ``root``, ``content`` and the ``zones`` nested under each block (zone
+keys are ``"<block id>:<zone name>"``) in document order. Known block types (``BLOCKS``) get
+their own markup; any other block contributes its text props (``TEXT_PROPS``). Quiz
+``Question`` blocks render the question and option labels only, never the answer.
+
+Everything is escaped, and text props holding HTML markup (``HTML_MARKUP``: a closing tag or a
+line break, so "x<y and y>z" stays plain text) go through an allowlist sanitizer: only
+``ALLOWED_TAGS`` survive, links keep ``href`` only for http(s), mailto and relative URLs, and
+the content of ``script``/``style``-like elements is dropped.
+
+This module only depends on the standard library and Django's ``escape``, so the prerender
+process pool (courses/rendering.py) can use it without touching the database.
+"""
+import hashlib
+import json
+import re
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+from django.utils.html import escape
+
+VERSION = 2  # bump when the output changes, so every stored rendering is redone
+MAX_DEPTH = 16  # zones nested deeper than this are ignored
+TEXT_PROPS = ("title", "heading", "text", "content", "body", "description", "caption", "quote")
+
+ALLOWED_TAGS = {
+    "p", "br", "hr", "strong", "b", "em", "i", "u", "s", "sub", "sup", "span", "a", "code", "pre", "blockquote",
+    "ul", "ol", "li", "h2", "h3", "h4", "h5", "h6",
+}
+VOID_TAGS = {"br", "hr"}
+DROPPED_TAGS = {"script", "style", "iframe", "object", "embed", "template", "noscript", "svg", "math", "head", "title"}
+# tags that start a new line in the plain text
+BREAK_TAGS = {"p", "br", "hr", "div", "li", "blockquote", "pre", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6", "tr"}
+URL_SCHEMES = {"", "http", "https", "mailto"}
+# a text prop is HTML when it has a closed element or a line break of a tag the editor emits;
+# anything else ("if x<y and y>z") is plain text and escaped
+_TAG_NAMES = "|".join(sorted(ALLOWED_TAGS | DROPPED_TAGS | BREAK_TAGS | {"div", "img", "table", "td", "th"}))
+HTML_MARKUP = re.compile(rf"</({_TAG_NAMES})\s*>|<(br|hr)\s*/?>", re.IGNORECASE)
+
+
+def data_hash(data):
+    """Hash of ``data`` and the renderer version: a stored rendering is valid while it matches."""
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha1(f"{VERSION}:{canonical}".encode()).hexdigest()
+
+
+def safe_url(url, schemes=URL_SCHEMES):
+    if not isinstance(url, str):
+        return None
+    url = "".join(char for char in url if char > " ")  # browsers ignore these, e.g. "java\tscript:"
+    if not url:
+        return None
+    try:
+        scheme = urlsplit(url).scheme.lower()
+    except ValueError:
+        return None
+    return url if scheme in schemes else None
+
+
+class _Sanitizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.html = []
+        self.text = []
+        self.open = []
+        self.dropping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROPPED_TAGS:
+            self.dropping += 1
+            return
+        if self.dropping:
+            return
+        if tag in BREAK_TAGS:
+            self.text.append("\n")
+        if tag not in ALLOWED_TAGS:
+            return
+        attributes = ""
+        if tag == "a":
+            href = safe_url(dict(attrs).get("href"))
+            if href:
+                attributes = f' href="{escape(href)}" rel="nofollow noopener"'
+        self.html.append(f"<{tag}{attributes}>")
+        if tag not in VOID_TAGS:
+            self.open.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_TAGS:
+            self.dropping = max(self.dropping - 1, 0)
+            return
+        if tag in BREAK_TAGS:
+            self.text.append("\n")
+        if self.dropping or tag not in self.open:
+            return
+        while self.open:  # close anything left open inside it, so the output stays well formed
+            closed = self.open.pop()
+            self.html.append(f"</{closed}>")
+            if closed == tag:
+                break
+
+    def handle_data(self, data):
+        if not self.dropping:
+            self.html.append(escape(data))
+            self.text.append(data)
+
+    def result(self):
+        self.close()
+        while self.open:
+            self.html.append(f"</{self.open.pop()}>")
+        return "".join(self.html), "".join(self.text)
+
+
+def sanitize(fragment):
+    """``(html, text)`` of an untrusted HTML fragment."""
+    sanitizer = _Sanitizer()
+    sanitizer.feed(fragment)
+    return sanitizer.result()
+
+
+def _clean_text(text):
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+class _Document:
+    def __init__(self):
+        self.html = []
+        self.text = []
+
+    def add(self, html, text):
+        text = _clean_text(text)
+        if html:
+            self.html.append(html)
+        if text:
+            self.text.append(text)
+
+    def rich(self, value, tag="p", markup=False):
+        """
+        A text prop that may hold HTML (``markup``, or see HTML_MARKUP); plain text keeps its
+        paragraphs and line breaks.
+        """
+        if not isinstance(value, str) or not value.strip():
+            return
+        if markup or HTML_MARKUP.search(value):
+            html, text = sanitize(value)
+            self.add(html, text)
+            return
+        for paragraph in re.split(r"\n\s*\n", value.strip()):
+            self.add(f"<{tag}>{'<br>'.join(escape(line) for line in paragraph.splitlines())}</{tag}>", paragraph)
+
+    def result(self):
+        return "\n".join(self.html), "\n\n".join(self.text)
+
+
+def _string(props, *names):
+    for name in names:
+        value = props.get(name)
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    return ""
+
+
+def _label(item):
+    if isinstance(item, dict):
+        return _string(item, "label", "text", "title")
+    return str(item).strip() if isinstance(item, (str, int, float)) else ""
+
+
+def _heading(props, document):
+    text = _string(props, "text", "title", "heading")
+    try:
+        level = min(max(int(props.get("level") or 2), 2), 6)  # h1 is the lesson title
+    except (TypeError, ValueError):
+        level = 2
+    if text:
+        document.add(f"<h{level}>{escape(text)}</h{level}>", text)
+
+
+def _text(props, document):
+    for name in ("text", "content", "body", "html"):
+        document.rich(props.get(name), markup=name == "html")
+
+
+def _list(props, document):
+    items = [label for label in map(_label, props.get("items") or []) if label]
+    if items:
+        tag = "ol" if props.get("ordered") else "ul"
+        html = "".join(f"<li>{escape(item)}</li>" for item in items)
+        document.add(f"<{tag}>{html}</{tag}>", "\n".join(f"- {item}" for item in items))
+
+
+def _image(props, document):
+    src = safe_url(props.get("src") or props.get("url"), {"http", "https"})
+    alt = _string(props, "alt", "title")
+    caption = _string(props, "caption")
+    figure = f'<img src="{escape(src)}" alt="{escape(alt)}" loading="lazy">' if src else ""
+    if caption:
+        figure += f"<figcaption>{escape(caption)}</figcaption>"
+    if figure:
+        document.add(f"<figure>{figure}</figure>", caption or alt)
+
+
+def _media(props, document):
+    # lesson media is served behind the enrollment check (courses/media.py); only name it here
+    title = _string(props, "title", "caption", "name")
+    if title:
+        document.add(f'<figure class="media"><figcaption>{escape(title)}</figcaption></figure>', title)
+
+
+def _code(props, document):
+    code = props.get("code") or props.get("text")
+    if isinstance(code, str) and code.strip():
+        language = re.sub(r"[^a-zA-Z0-9_+-]", "", str(props.get("language") or ""))
+        css = f' class="language-{language}"' if language else ""
+        document.html.append(f"<pre><code{css}>{escape(code)}</code></pre>")
+        document.text.append(code.strip("\n"))
+
+
+def _quote(props, document):
+    text = _string(props, "text", "quote")
+    cite = _string(props, "cite", "author")
+    if text:
+        footer = f"<footer>{escape(cite)}</footer>" if cite else ""
+        plain = f"“{text}”" + (f" — {cite}" if cite else "")
+        document.add(f"<blockquote><p>{escape(text)}</p>{footer}</blockquote>", plain)
+
+
+def _question(props, document):
+    # never the answer: renderings end up in search indexes, previews and emails
+    question = _string(props, "question", "text")
+    options = [label for label in map(_label, props.get("options") or []) if label]
+    if question or options:
+        html = f"<p>{escape(question)}</p>" if question else ""
+        if options:
+            html += "<ol>" + "".join(f"<li>{escape(option)}</li>" for option in options) + "</ol>"
+        document.add(f'<div class="question">{html}</div>', "\n".join([question, *(f"- {o}" for o in options)]))
+
+
+def _divider(props, document):
+    document.html.append("<hr>")
+
+
+def _generic(props, document):
+    for name in TEXT_PROPS:
+        document.rich(props.get(name))
+
+
+BLOCKS = {
+    "Heading": _heading,
+    "Text": _text,
+    "Paragraph": _text,
+    "RichText": _text,
+    "List": _list,
+    "Image": _image,
+    "Video": _media,
+    "Audio": _media,
+    "File": _media,
+    "PDF": _media,
+    "Code": _code,
+    "Quote": _quote,
+    "Question": _question,
+    "Divider": _divider,
+}
+
+
+def _blocks(blocks, zones, document, depth):
+    if depth > MAX_DEPTH or not isinstance(blocks, list):
+        return
+    for block in blocks:
+        if not isinstance(block, dict):
+            continue
+        props = block.get("props") if isinstance(block.get("props"), dict) else {}
+        BLOCKS.get(block.get("type"), _generic)(props, document)
+        block_id = props.get("id")
+        if block_id:
+            for key, children in zones.items():
+                if key.startswith(f"{block_id}:"):
+                    _blocks(children, zones, document, depth + 1)
+
+
+def render(data):
+    """``(html, text)`` of a content's ``data``."""
+    document = _Document()
+    if not isinstance(data, dict):
+        return document.result()
+    root = data.get("root") if isinstance(data.get("root"), dict) else {}
+    root_props = root.get("props") if isinstance(root.get("props"), dict) else {}
+    title = _string(root_props, "title")
+    if title:
+        document.add(f"<h1>{escape(title)}</h1>", title)
+    zones = data.get("zones") if isinstance(data.get("zones"), dict) else {}
+    _blocks(data.get("content"), zones, document, 0)
+    return document.result()
+
+
+def render_many(items):
+    """``[(id, hash, html, text)]`` for ``[(id, hash, data)]``; what the process pool runs."""
+    return [(pk, digest, *render(data)) for pk, digest, data in items]
@@ -0,0 +1,21 @@
+"""
+Shared caches of course listings (see core/cache.py), cleared by courses.signals.
+
+The full catalog changes only when a course does; recommendation lists when the hourly
+neighbour refresh runs, so they simply expire.
+"""
+from django.conf import settings
+
+from core.cache import TieredCache
+
+catalog = TieredCache(
+    "courses.catalog", timeout=getattr(settings, "CATALOG_CACHE_SECONDS", 60), stale_seconds=300,
+)
+recommendations = TieredCache(
+    "courses.recommendations", timeout=getattr(settings, "RECOMMENDATIONS_CACHE_SECONDS", 300), stale_seconds=900,
+)
+
+
+def request_key(request, *parts):
+    # responses hold absolute URLs (images), so they differ per scheme and host
+    return "|".join([f"{request.scheme}://{request.get_host()}", *map(str, parts)])
@@ -0,0 +1,102 @@
+"""
+Rearranging a course's chapter tree in one go, for the admin's drag-and-drop view.
+
+Moving chapters one at a time with MPTT's ``move_node`` shifts the ``lft``/``rght`` of every
+later node in the tree for each move. Instead the admin submits the whole arrangement
+(parent and position of every chapter), and ``rearrange`` recomputes the course's MPTT
+fields in memory and writes the changed rows with a single ``bulk_update``.
+
+Each root chapter owns a ``tree_id``; the course keeps its existing tree ids, handed out to
+the roots in their new order, so other courses' trees are never touched.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Chapter, Content
+from .outline import outline_changed
+from .snapshots import course_changed
+
+TREE_FIELDS = ("parent_id", "order", "tree_id", "lft", "rght", "level")
+
+
+class InvalidTree(ValueError):
+    pass
+
+
+def course_tree(course_id):
+    """The course's chapters as nested ``{"id", "title", "is_free", "contents", "children"}`` dicts."""
+    contents = dict(
+        Content.objects.filter(chapter__course_id=course_id).order_by().values("chapter_id")
+        .annotate(total=Count("id")).values_list("chapter_id", "total")
+    )
+    nodes, roots = {}, []
+    chapters = Chapter.objects.filter(course_id=course_id).order_by("tree_id", "lft")
+    for pk, title, is_free, parent_id in chapters.values_list("id", "title", "is_free", "parent_id"):
+        nodes[pk] = {"id": pk, "title": title, "is_free": is_free, "contents": contents.get(pk, 0), "children": []}
+        (nodes[parent_id]["children"] if parent_id in nodes else roots).append(nodes[pk])
+    return roots
+
+
+def rearrange(course_id, placements):
+    """
+    Apply ``placements`` — ``[{"id": chapter, "parent": chapter or None, "order": position}]``
+    covering every chapter of the course — and return how many chapters changed.
+    """
+    try:
+        wanted = {int(item["id"]): (item["parent"] and int(item["parent"]), int(item["order"])) for item in placements}
+    except (KeyError, TypeError, ValueError) as exc:
+        raise InvalidTree("Every chapter needs an id, a parent and an order") from exc
+
+    with transaction.atomic():
+        chapters = {
+            chapter.pk: chapter
+            for chapter in Chapter.objects.select_for_update().filter(course_id=course_id).only("id", *TREE_FIELDS)
+        }
+        if len(wanted) != len(placements) or set(wanted) != set(chapters):
+            raise InvalidTree("The tree must list every chapter of the course exactly once")
+        before = {pk: tuple(getattr(chapter, field) for field in TREE_FIELDS) for pk, chapter in chapters.items()}
+
+        children = defaultdict(list)
+        for pk, (parent, position) in wanted.items():
+            if parent is not None and parent not in chapters:
+                raise InvalidTree(f"Chapter {pk} has a parent from another course")
+            children[parent].append((position, pk))
+        roots = [pk for _, pk in sorted(children[None])]
+        if not roots and chapters:
+            raise InvalidTree("The tree has no root chapter")
+
+        tree_ids = sorted({chapter.tree_id for chapter in chapters.values()})
+        if len(tree_ids) < len(roots):
+            next_id = Chapter._tree_manager._get_next_tree_id()
+            tree_ids += range(next_id, next_id + len(roots) - len(tree_ids))
+
+        visited = 0
+
+        def place(pk, parent, order, tree_id, left, level):
+            nonlocal visited
+            visited += 1
+            chapter = chapters[pk]
+            chapter.parent_id, chapter.order, chapter.tree_id, chapter.lft, chapter.level = parent, order, tree_id, left, level
+            right = left + 1
+            for position, (_, child) in enumerate(sorted(children[pk])):
+                right = place(child, pk, position, tree_id, right, level + 1) + 1
+            chapter.rght = right
+            return right
+
+        for position, (root, tree_id) in enumerate(zip(roots, tree_ids)):
+            place(root, None, position, tree_id, 1, 0)
+        if visited != len(chapters):
+            raise InvalidTree("A chapter cannot be nested inside itself")
+
+        changed = [
+            chapter for pk, chapter in chapters.items()
+            if tuple(getattr(chapter, field) for field in TREE_FIELDS) != before[pk]
+        ]
+        Chapter.objects.bulk_update(changed, ["parent", "order", "tree_id", "lft", "rght", "level"], batch_size=500)
+
+    if changed:
+        course_changed(course_id)
+        outline_changed(course_id)
+    return len(changed)
@@ -0,0 +1,69 @@
+"""
+Bulk enrollment of a cohort of students into one or more courses.
+
+``bulk_enroll`` checks the students' roles in one query, then inserts every
+(student, course) pair with ``bulk_create(ignore_conflicts=True)`` on the unique
+(student, course) key, ``BATCH_SIZE`` students per transaction. Pairs that already exist are
+skipped, so repeating a request (or retrying its job) is harmless.
+
+``bulk_create`` sends no ``post_save``, so ``enrollments_changed`` brings the state derived
+from enrollments up to date in one go: course popularity is recomputed for the touched
+courses. Recommendations and teacher analytics pick new enrollments up by ``enrolled_at``.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+
+from users.models import Profile
+from .models import CourseEnrollment
+from .popularity import recompute
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = getattr(settings, "BULK_ENROLL_BATCH_SIZE", 1000)  # students per transaction
+# requests with more (student, course) pairs than this run as a background job
+SYNC_LIMIT = getattr(settings, "BULK_ENROLL_SYNC_LIMIT", 5000)
+
+
+def valid_students(student_ids):
+    """The subset of ``student_ids`` that are profiles with the student role, in one query."""
+    return set(Profile.objects.filter(pk__in=list(student_ids), role="student").values_list("pk", flat=True))
+
+
+def bulk_enroll(student_ids, course_ids, batch_size=BATCH_SIZE):
+    """
+    Enroll every student in every course. Returns ``{"created", "skipped", "rejected_students"}``:
+    ``skipped`` counts pairs that already existed, ``rejected_students`` the ids that are not
+    students. ``created`` is exact unless the same pairs are being enrolled concurrently.
+    """
+    student_ids = sorted(set(student_ids))
+    course_ids = sorted(set(course_ids))
+    students = sorted(valid_students(student_ids))
+    result = {"created": 0, "skipped": 0, "rejected_students": sorted(set(student_ids) - set(students))}
+
+    for start in range(0, len(students), batch_size):
+        batch = students[start:start + batch_size]
+        pairs = CourseEnrollment.objects.filter(student_id__in=batch, course_id__in=course_ids)
+        with transaction.atomic():
+            before = pairs.count()
+            CourseEnrollment.objects.bulk_create(
+                [
+                    CourseEnrollment(student_id=student_id, course_id=course_id)
+                    for student_id in batch for course_id in course_ids
+                ],
+                batch_size=1000, ignore_conflicts=True,
+            )
+            created = pairs.count() - before
+        result["created"] += created
+        result["skipped"] += len(batch) * len(course_ids) - created
+
+    if result["created"]:
+        enrollments_changed(course_ids)
+    logger.info("Bulk enrollment of %s students into courses %s: %s", len(students), course_ids, result)
+    return result
+
+
+def enrollments_changed(course_ids):
+    """Refresh what is derived from enrollments after writes that bypassed the signals."""
+    recompute(sorted(set(course_ids)))
@@ -0,0 +1,54 @@
+"""
+Who may open a course's paid content.
+
+The rule is the one ContentDetailBySlug has always applied: free chapters are open to
+everyone, anything else needs a logged-in profile enrolled in the course. Enrollment checks
+are cached for ``ENTITLEMENT_CACHE_SECONDS`` so that a lesson player seeking through a video
+(one request per range) doesn't query the enrollment table every time.
+
+Only grants are cached. A new enrollment is therefore visible at once in every worker, while
+an unenrollment is forgotten immediately by the worker that handles it (signals) and by the
+others within the cache timeout.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import CourseEnrollment
+
+CACHE_SECONDS = getattr(settings, "ENTITLEMENT_CACHE_SECONDS", 60)
+
+LOGIN_REQUIRED = "Please login to view this content."
+NO_PROFILE = "Profile not found."
+PURCHASE_REQUIRED = "Purchase required to access this content."
+
+
+def _key(profile_id, course_id):
+    return f"entitled:{course_id}:{profile_id}"
+
+
+def is_enrolled(profile_id, course_id):
+    key = _key(profile_id, course_id)
+    if cache.get(key):
+        return True
+    enrolled = CourseEnrollment.objects.filter(student_id=profile_id, course_id=course_id).exists()
+    if enrolled:
+        cache.set(key, True, CACHE_SECONDS)
+    return enrolled
+
+
+def forget(profile_id, course_id):
+    cache.delete(_key(profile_id, course_id))
+
+
+def access_denied(user, is_free, course_id):
+    """None when ``user`` may open content of a chapter, else the reason for a 403."""
+    if is_free:
+        return None
+    if not user.is_authenticated:
+        return LOGIN_REQUIRED
+    profile = getattr(user, "profile", None)
+    if not profile:
+        return NO_PROFILE
+    if not is_enrolled(profile.pk, course_id):
+        return PURCHASE_REQUIRED
+    return None
@@ -0,0 +1,188 @@
+"""
+Compiled read-only serialization for the hot catalog/detail endpoints.
+
+``plan_for(SerializerClass)`` walks a DRF serializer once and generates a function that builds
+the same dict straight from a ``values_list()`` tuple, so no model instances or serializer
+fields are created per row. Output must stay byte-identical to the DRF serializer once
+rendered; ``manage.py bench_serializers`` checks that and measures the speedup.
+"""
+from django.db.models import FileField as ModelFileField
+from rest_framework import fields as drf_fields
+from rest_framework import relations, serializers
+
+from users.serializers import UserSerializer
+from .models import Chapter, Content, CourseEnrollment
+from .quizzes import sees_answers, without_answers
+from .serializers import (
+    ChapterSerializer, ContentDetailSerializer, ContentSerializer, CourseDetailSerializer, CourseSerializer,
+)
+
+# SerializerMethodFields mirrored as column paths (relative to the serializer's model).
+# Keep in sync with the get_* methods in serializers.py.
+METHOD_SOURCES = {
+    UserSerializer: {"bio": "profile__bio"},
+    ContentSerializer: {"chapter": "chapter_id"},
+    ContentDetailSerializer: {"chapter": "chapter_id", "course": "chapter__course_id"},
+    ChapterSerializer: {"course": "course_id", "parent": "parent_id"},
+}
+
+# DRF fields whose to_representation() returns database values unchanged
+IDENTITY_FIELDS = (
+    drf_fields.CharField, drf_fields.IntegerField, drf_fields.BooleanField,
+    drf_fields.JSONField, drf_fields.ChoiceField,
+)
+
+
+def _file_url(storage):
+    def convert(name, request):
+        # mirrors rest_framework.fields.FileField.to_representation with use_url=True
+        if not name:
+            return None
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+    return convert
+
+
+class Plan:
+    """Columns to fetch plus the generated ``build(row, request, extra)`` function."""
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self.columns = []
+        self.extra_keys = []
+        self.namespace = {}
+        expression = self._compile(serializer_class(), serializer_class.Meta.model, "")
+        source = f"def build(r, request, extra):\n    return {expression}\n"
+        exec(compile(source, f"<plan {serializer_class.__name__}>", "exec"), self.namespace)
+        self.build = self.namespace["build"]
+        self.source = source
+
+    def _column(self, path):
+        if path not in self.columns:
+            self.columns.append(path)
+        return f"r[{self.columns.index(path)}]"
+
+    def _converter(self, func):
+        name = f"c{len(self.namespace)}"
+        self.namespace[name] = func
+        return name
+
+    def _compile(self, serializer, model, prefix):
+        items = []
+        method_sources = METHOD_SOURCES.get(type(serializer), {})
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            items.append(f"{name!r}: {self._field(name, field, model, prefix, method_sources)}")
+        return "{" + ", ".join(items) + "}"
+
+    def _field(self, name, field, model, prefix, method_sources):
+        if isinstance(field, serializers.ListSerializer) or (
+            isinstance(field, serializers.SerializerMethodField) and name not in method_sources
+        ):
+            # reverse relations and request-dependent values are supplied by the caller
+            if prefix:
+                raise TypeError(f"{name} can only be supplied at the top level")
+            self.extra_keys.append(name)
+            return f"extra[{name!r}]"
+
+        if isinstance(field, serializers.SerializerMethodField):
+            return self._column(prefix + method_sources[name])
+
+        if isinstance(field, serializers.BaseSerializer):
+            # nested forward relation: None when the foreign key is null
+            related = model._meta.get_field(field.source)
+            nested = self._compile(field, related.related_model, f"{prefix}{field.source}__")
+            return f"(None if {self._column(prefix + field.source)} is None else {nested})"
+
+        if isinstance(field, relations.ManyRelatedField):
+            raise TypeError(f"{name}: many-to-many fields are not supported")
+
+        path = prefix + field.source.replace(".", "__")
+        column = self._column(path)
+        if isinstance(field, relations.PrimaryKeyRelatedField):
+            return column
+        if isinstance(field, drf_fields.FileField):
+            model_field = model._meta.get_field(field.source)
+            assert isinstance(model_field, ModelFileField)
+            convert = self._converter(_file_url(model_field.storage))
+            return f"{convert}({column}, request)"
+        if isinstance(field, IDENTITY_FIELDS):
+            return column
+        convert = self._converter(field.to_representation)
+        return f"(None if {column} is None else {convert}({column}))"
+
+    def rows(self, queryset):
+        return queryset.values_list(*self.columns)
+
+
+_plans = {}
+
+
+def plan_for(serializer_class):
+    plan = _plans.get(serializer_class)
+    if plan is None:
+        plan = _plans[serializer_class] = Plan(serializer_class)
+    return plan
+
+
+def serialize_courses(queryset, request=None):
+    plan = plan_for(CourseSerializer)
+    return [plan.build(row, request, None) for row in plan.rows(queryset)]
+
+
+def is_enrolled(request, course_id):
+    # same rules as CourseDetailSerializer.get_is_enrolled
+    user = getattr(request, "user", None)
+    if not user or not user.is_authenticated:
+        return False
+    profile = getattr(user, "profile", None)
+    if not profile:
+        return False
+    return CourseEnrollment.objects.filter(student=profile, course_id=course_id).exists()
+
+
+def serialize_course_detail(queryset, request=None):
+    """CourseDetailSerializer output for the single course in ``queryset``, or None."""
+    course_plan = plan_for(CourseDetailSerializer)
+    chapter_plan = plan_for(ChapterSerializer)
+    content_plan = plan_for(ContentSerializer)
+
+    row = course_plan.rows(queryset).first()
+    if row is None:
+        return None
+    course_id = row[course_plan.columns.index("id")]
+
+    contents = {}
+    chapter_index = content_plan.columns.index("chapter_id")
+    content_rows = content_plan.rows(
+        Content.objects.filter(chapter__course_id=course_id).order_by("chapter_id", "order", "id")
+    )
+    for content in content_rows:
+        contents.setdefault(content[chapter_index], []).append(content_plan.build(content, request, None))
+
+    # course.chapters.all() has no ordering; keep the same query so rows come back the same way
+    chapter_id = chapter_plan.columns.index("id")
+    chapters = [
+        chapter_plan.build(chapter, request, {"contents": contents.get(chapter[chapter_id], [])})
+        for chapter in chapter_plan.rows(Chapter.objects.filter(course_id=course_id))
+    ]
+    return course_plan.build(row, request, {"chapters": chapters, "is_enrolled": is_enrolled(request, course_id)})
+
+
+def content_detail_row(queryset, *gate_columns):
+    """ContentDetailSerializer plan row plus extra columns (e.g. access checks), or None."""
+    plan = plan_for(ContentDetailSerializer)
+    row = queryset.values_list(*plan.columns, *gate_columns).first()
+    if row is None:
+        return None, None
+    return row[:len(plan.columns)], dict(zip(gate_columns, row[len(plan.columns):]))
+
+
+def serialize_content_detail(row, request=None, teacher_id=None):
+    """ContentDetailSerializer output; a quiz's answers only for staff and the teacher (a Profile id)."""
+    data = plan_for(ContentDetailSerializer).build(row, request, None)
+    if data["type"] == "quiz" and not sees_answers(getattr(request, "user", None), teacher_id):
+        data["data"] = without_answers(data["data"])
+    return data
+
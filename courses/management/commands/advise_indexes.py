@@ -0,0 +1,202 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+
+from courses.models import (
+    Chapter, Content, ContentSnapshot, Course, CourseEnrollment, CourseProgress, CourseSnapshot, Favourite, Review,
+)
+
+
+class Query:
+    """A queryset one of the endpoints in courses/urls.py runs, plus the shape an index would need."""
+
+    def __init__(self, endpoint, build, model, filters=(), ordering=(), condition=None):
+        self.endpoint = endpoint
+        self.build = build          # () -> queryset, using sample ids from the database
+        self.model = model
+        self.filters = list(filters)
+        self.ordering = list(ordering)
+        self.condition = condition  # constant filter worth a partial index
+
+
+def sample(model, *fields):
+    row = model.objects.order_by("-pk").values(*fields).first()
+    return row or {field: 0 for field in fields}
+
+
+QUERIES = [
+    Query("GET courses/", lambda: Course.objects.all(), Course),
+    Query(
+        "GET courses/ (published, newest first)",
+        lambda: Course.objects.filter(status="published").order_by("-published_at")[:50],
+        Course, ordering=["-published_at"], condition=Q(status="published"),
+    ),
+    Query("GET courses/slug/<slug>/", lambda: Course.objects.filter(slug=sample(Course, "slug")["slug"]), Course, ["slug"]),
+    Query(
+        "GET courses/slug/<slug>/ (chapters)",
+        lambda: Chapter.objects.filter(course_id=sample(Chapter, "course_id")["course_id"]),
+        Chapter, ["course"], ["tree_id", "lft"],
+    ),
+    Query(
+        "GET courses/slug/<slug>/ (contents)",
+        lambda: Content.objects.filter(chapter_id=sample(Content, "chapter_id")["chapter_id"]).order_by("order"),
+        Content, ["chapter"], ["order"],
+    ),
+    Query(
+        "GET courses/slug/<slug>/ (anonymous snapshot)",
+        lambda: CourseSnapshot.objects.filter(slug=sample(Course, "slug")["slug"]), CourseSnapshot, ["slug"],
+    ),
+    Query("GET contents/slug/<slug>/", lambda: Content.objects.filter(slug=sample(Content, "slug")["slug"]), Content, ["slug"]),
+    Query(
+        "GET contents/slug/<slug>/ (anonymous snapshot)",
+        lambda: ContentSnapshot.objects.filter(slug=sample(Content, "slug")["slug"]), ContentSnapshot, ["slug"],
+    ),
+    Query(
+        "GET contents/slug/<slug>/ (enrollment check)",
+        lambda: CourseEnrollment.objects.filter(**sample(CourseEnrollment, "student_id", "course_id")),
+        CourseEnrollment, ["student", "course"],
+    ),
+    Query(
+        "GET chapters/?course_id=",
+        lambda: Chapter.objects.filter(course_id=sample(Chapter, "course_id")["course_id"]),
+        Chapter, ["course"], ["tree_id", "lft"],
+    ),
+    Query("GET contents/", lambda: Content.objects.order_by("id")[:51], Content, ordering=["id"]),
+    Query("GET reviews/", lambda: Review.objects.order_by("-created_at", "-id")[:51], Review, ordering=["-created_at", "-id"]),
+    Query("GET favourites/", lambda: Favourite.objects.order_by("-created_at", "-id")[:51], Favourite, ordering=["-created_at", "-id"]),
+    Query(
+        "GET course-enrollment/", lambda: CourseEnrollment.objects.order_by("-enrolled_at", "-id")[:51],
+        CourseEnrollment, ordering=["-enrolled_at", "-id"],
+    ),
+    Query(
+        "GET progress/", lambda: CourseProgress.objects.order_by("-last_accessed", "-id")[:51],
+        CourseProgress, ordering=["-last_accessed", "-id"],
+    ),
+    Query(
+        "GET courses/user/my-courses/",
+        lambda: CourseEnrollment.objects.filter(student_id=sample(CourseEnrollment, "student_id")["student_id"]),
+        CourseEnrollment, ["student"],
+    ),
+    Query(
+        "GET courses/user/bootstrap/ (progress)",
+        lambda: CourseProgress.objects.filter(
+            student_id=sample(CourseProgress, "student_id")["student_id"]
+        ).order_by("-last_accessed", "-id"),
+        CourseProgress, ["student"], ["-last_accessed", "-id"],
+    ),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay the querysets behind the course endpoints under EXPLAIN, flag sequential scans and "
+        "sorts, and propose Meta.indexes for them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--no-analyze", action="store_true", help="Plain EXPLAIN instead of EXPLAIN ANALYZE (PostgreSQL).",
+        )
+        parser.add_argument(
+            "--natural", action="store_true",
+            help="Keep the planner's cost choices. By default sequential scans and sorts are disabled so "
+                 "that a plan still using them proves no usable index exists, even on a small database.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ("postgresql", "sqlite"):
+            raise CommandError(f"Unsupported database backend: {connection.vendor}")
+
+        proposals = {}
+        flagged = 0
+        for query in QUERIES:
+            problems = self.explain(query, options)
+            flagged += bool(problems)
+            status = self.style.ERROR("; ".join(problems)) if problems else self.style.SUCCESS("ok")
+            self.stdout.write(f"{query.endpoint:<48} {status}")
+            if not problems:
+                continue
+            proposal = self.propose(query)
+            if proposal:
+                proposals.setdefault(query.model.__name__, set()).add(proposal)
+            elif not (query.filters or query.ordering):
+                self.stdout.write("    reads the whole table; no index can help (paginate or cache it)")
+
+        if not flagged:
+            self.stdout.write(self.style.SUCCESS("✅ Every replayed query is served by an index."))
+            return
+        if not proposals:
+            self.stdout.write(self.style.WARNING("No new indexes to propose."))
+            return
+        self.stdout.write(self.style.WARNING("\nProposed Meta.indexes:"))
+        for model, indexes in sorted(proposals.items()):
+            self.stdout.write(f"  {model}:")
+            for index in sorted(indexes):
+                self.stdout.write(f"    {index},")
+
+    def explain(self, query, options):
+        queryset = query.build()
+        if connection.vendor == "sqlite":
+            plan = queryset.explain()
+            problems = []
+            for line in plan.splitlines():
+                if "SCAN " in line and "USING" not in line:
+                    problems.append(f"full scan: {line.split('SCAN ', 1)[1].strip()}")
+                if "TEMP B-TREE" in line:
+                    problems.append("sort: " + line.split("USE ", 1)[-1].strip())
+            return problems
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                if not options["natural"]:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+                    cursor.execute("SET LOCAL enable_sort = off")
+            raw = queryset.explain(format="json", analyze=not options["no_analyze"])
+        columns = [query.model._meta.get_field(name).column for name in query.filters]
+        problems = []
+        for node in self.walk(json.loads(raw)[0]["Plan"]):
+            if node["Node Type"] == "Seq Scan":
+                detail = f" filter {node['Filter']}" if "Filter" in node else ""
+                problems.append(f"seq scan on {node['Relation Name']}{detail}")
+            elif node["Node Type"] in ("Sort", "Incremental Sort") and node.get("Plan Rows", 0) > 1:
+                # sorting a unique lookup's single row is free
+                problems.append(f"sort on {', '.join(node.get('Sort Key', []))}")
+            elif "Index" in node["Node Type"] and any(column in node.get("Filter", "") for column in columns):
+                # the index was only used for ordering; the endpoint's filter is applied row by row
+                problems.append(f"{node['Index Name']} filters {node['Filter']} row by row")
+        return problems
+
+    def walk(self, node):
+        yield node
+        for child in node.get("Plans", []):
+            yield from self.walk(child)
+
+    def propose(self, query):
+        # equality filters first, then the ordering
+        fields = query.filters + query.ordering
+        if not fields:
+            return None
+        if any(self.covered(index, fields, query.condition) for index in self.existing(query.model)):
+            # an index exists; the plan issue is data volume or statistics, not a missing index
+            return None
+        name = f"{query.model._meta.db_table}_{'_'.join(f.lstrip('-') for f in fields)}"[:26] + "_idx"
+        condition = f", condition=Q({', '.join(f'{k}={v!r}' for k, v in query.condition.children)})" if query.condition else ""
+        return f"models.Index(fields={fields!r}{condition}, name={name!r})"
+
+    def existing(self, model):
+        meta = model._meta
+        yield from ((index.fields, index.condition) for index in meta.indexes)
+        yield from ((list(fields), None) for fields in meta.unique_together)
+        for field in meta.concrete_fields:
+            if field.db_index or field.unique or field.primary_key:
+                yield [field.name], None
+
+    def covered(self, index, fields, condition):
+        index_fields, index_condition = index
+        if index_condition is not None and index_condition != condition:
+            return False
+        names = [field.lstrip("-") for field in index_fields]
+        wanted = [field.lstrip("-") for field in fields]
+        return names[:len(wanted)] == wanted
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.analytics import backfill
+from courses.models import Course
+
+
+class Command(BaseCommand):
+    help = "Recount the teacher analytics rollups from enrollments, reviews and progress."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--course", action="append", help="Course slug; may be repeated. Defaults to all courses.")
+
+    def handle(self, *args, **options):
+        course_ids = None
+        if options["course"]:
+            course_ids = list(Course.objects.filter(slug__in=options["course"]).values_list("pk", flat=True))
+            if len(course_ids) != len(set(options["course"])):
+                raise CommandError("Some course slugs do not exist")
+
+        started = time.perf_counter()
+
+        def progress(done, total):
+            self.stdout.write(f"  {done}/{total} courses  {time.perf_counter() - started:.1f}s")
+
+        total = backfill(course_ids, progress=progress)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Backfilled analytics for {total} courses in {time.perf_counter() - started:.2f}s"
+        ))
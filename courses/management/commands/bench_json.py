@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import FastJSONRenderer, orjson
+from courses.fast_serializers import content_detail_row, serialize_content_detail, serialize_course_detail, serialize_courses
+from courses.models import Content, Course
+
+
+class Command(BaseCommand):
+    help = "Compare the stdlib and orjson JSON renderers on real course payloads."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument("--contents", type=int, default=200, help="Content documents to include.")
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.ERROR("❌ orjson is not installed; FastJSONRenderer falls back to stdlib."))
+            return
+
+        courses = Course.objects.order_by("id")
+        payloads = {
+            "catalog": serialize_courses(courses),
+            "course details": [serialize_course_detail(Course.objects.filter(pk=pk)) for pk in courses.values_list("pk", flat=True)],
+            "content documents": [
+                serialize_content_detail(content_detail_row(Content.objects.filter(pk=pk))[0])
+                for pk in Content.objects.order_by("id").values_list("pk", flat=True)[:options["contents"]]
+            ],
+            # raw rows: Decimal and datetime objects go through the encoder's default()
+            "raw course rows": list(courses.values()),
+        }
+
+        stdlib, fast = JSONRenderer(), FastJSONRenderer()
+        self.stdout.write(self.style.WARNING(f"{options['repeat']} renders per payload"))
+        for label, data in payloads.items():
+            expected, actual = stdlib.render(data), fast.render(data)
+            same = "identical" if expected == actual else "differs (Decimal as string)"
+            slow_ms, fast_ms = self.time(stdlib, data, options["repeat"]), self.time(fast, data, options["repeat"])
+            self.stdout.write(
+                f"{label:<18} {len(actual) / 1024:8.1f}KB  stdlib {slow_ms:7.2f}ms  orjson {fast_ms:7.2f}ms"
+                f"  ({slow_ms / fast_ms:.1f}x, {same})"
+            )
+
+    def time(self, renderer, data, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            renderer.render(data)
+        return (time.perf_counter() - started) * 1000 / repeat
@@ -0,0 +1,55 @@
+import time
+import tracemalloc
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from courses.recommendations import MIN_SUPPORT, TOP_K, affected_courses, top_neighbours
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the co-enrollment similarity build on synthetic data (no database writes): "
+        "a full build and an incremental one after a burst of new enrollments."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--enrollments", type=int, default=1_000_000)
+        parser.add_argument("--students", type=int, default=200_000)
+        parser.add_argument("--courses", type=int, default=5_000)
+        parser.add_argument("--changed", type=int, default=50, help="Courses touched before the incremental run.")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options["seed"])
+        n = options["enrollments"]
+        # a few courses are far more popular than the rest, as in a real catalog
+        popularity = 1.0 / np.arange(1, options["courses"] + 1) ** 0.8
+        courses = rng.choice(options["courses"], size=n, p=popularity / popularity.sum()) + 1
+        students = rng.integers(1, options["students"] + 1, size=n)
+        weights = np.ones(n)
+        self.stdout.write(self.style.WARNING(
+            f"{n:,} enrollments, {options['students']:,} students, {options['courses']:,} courses, top {TOP_K}"
+        ))
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        neighbours = top_neighbours(students, courses, weights)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        stored = sum(len(items) for items in neighbours.values())
+        self.stdout.write(
+            f"full build         {elapsed:7.2f}s  peak {peak / 2**20:7.1f}MB  "
+            f"{len(neighbours):,} courses, {stored:,} neighbour pairs"
+        )
+
+        changed = set(rng.choice(options["courses"], size=options["changed"], replace=False) + 1)
+        started = time.perf_counter()
+        targets = affected_courses(students, courses, changed)
+        top_neighbours(students, courses, weights, targets)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"incremental build  {elapsed:7.2f}s  {len(targets):,} affected courses")
+
+        sample = next(iter(neighbours))
+        self.stdout.write(f"course {sample}: {neighbours[sample][:3]} (min support {MIN_SUPPORT})")
@@ -0,0 +1,145 @@
+import time
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from courses.fast_serializers import (
+    content_detail_row, plan_for, serialize_content_detail, serialize_course_detail, serialize_courses,
+)
+from courses.models import Chapter, Content, Course
+from courses.serializers import (
+    ChapterSerializer, ContentDetailSerializer, ContentSerializer, CourseDetailSerializer, CourseSerializer,
+)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Check that the compiled serializers render byte-identical JSON to the DRF serializers "
+        "for every course and content, and benchmark both on a synthetic course."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lessons", type=int, default=300, help="Lessons in the synthetic benchmark course.")
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--skip-parity", action="store_true")
+
+    def handle(self, *args, **options):
+        self.renderer = JSONRenderer()
+        request = Request(RequestFactory().get("/"))
+        request.user = AnonymousUser()
+
+        if not options["skip_parity"]:
+            self.check_parity(request)
+
+        # the synthetic course only lives inside this transaction
+        try:
+            with transaction.atomic():
+                course = self.build_course(options["lessons"])
+                self.benchmark(course, request, options["repeat"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def render(self, data):
+        return self.renderer.render(data)
+
+    def check_parity(self, request):
+        mismatches = 0
+        context = {"request": request}
+
+        courses = Course.objects.order_by("id")
+        if self.render(CourseSerializer(courses, many=True, context=context).data) != self.render(
+            serialize_courses(courses, request)
+        ):
+            mismatches += 1
+            self.stdout.write(self.style.ERROR("❌ catalog differs"))
+
+        for course in courses:
+            expected = self.render(CourseDetailSerializer(course, context=context).data)
+            actual = self.render(serialize_course_detail(Course.objects.filter(pk=course.pk), request))
+            if expected != actual:
+                mismatches += 1
+                self.stdout.write(self.style.ERROR(f"❌ course {course.slug} differs"))
+
+        for content in Content.objects.order_by("id").iterator():
+            row, columns = content_detail_row(Content.objects.filter(pk=content.pk), "chapter__course__teacher_id")
+            if self.render(ContentDetailSerializer(content, context=context).data) != self.render(
+                serialize_content_detail(row, request, columns["chapter__course__teacher_id"])
+            ):
+                mismatches += 1
+                self.stdout.write(self.style.ERROR(f"❌ content {content.slug} differs"))
+
+        if mismatches:
+            raise CommandError(f"{mismatches} responses differ between DRF and compiled serializers")
+        self.stdout.write(self.style.SUCCESS("✅ Compiled serializers match DRF output byte for byte."))
+
+    def build_course(self, lessons):
+        user = User.objects.create_user(username="bench-serializers-teacher")
+        user.profile.role = "teacher"
+        user.profile.save()
+        course = Course.objects.create(
+            title="Serializer Benchmark", description="x" * 2000, teacher=user.profile,
+            price=19.99, status="published",
+        )
+        per_chapter = 10
+        for c in range((lessons + per_chapter - 1) // per_chapter):
+            chapter = Chapter.objects.create(course=course, title=f"Chapter {c}", order=c)
+            Content.objects.bulk_create(
+                Content(
+                    chapter=chapter, title=f"Lesson {c}.{i}", slug=f"bench-serializers-{c}-{i}", order=i,
+                    data={"content": [{"type": "Text", "props": {"text": "lorem ipsum " * 20}}], "root": {}},
+                )
+                for i in range(min(per_chapter, lessons - c * per_chapter))
+            )
+        return course
+
+    def benchmark(self, course, request, repeat):
+        context = {"request": request}
+
+        def drf():
+            obj = Course.objects.prefetch_related("chapters__contents").get(pk=course.pk)
+            return self.render(CourseDetailSerializer(obj, context=context).data)
+
+        def compiled():
+            return self.render(serialize_course_detail(Course.objects.filter(pk=course.pk), request))
+
+        # serialization only: rows/objects fetched up front, time spent building dicts
+        obj = Course.objects.prefetch_related("chapters__contents").get(pk=course.pk)
+        chapters = list(obj.chapters.all())
+        contents = [content for chapter in chapters for content in chapter.contents.all()]
+        chapter_rows = list(plan_for(ChapterSerializer).rows(Chapter.objects.filter(course=course)))
+        content_rows = list(plan_for(ContentSerializer).rows(Content.objects.filter(chapter__course=course)))
+
+        def drf_serialize_only():
+            ChapterSerializer(chapters, many=True, context=context).data
+            ContentSerializer(contents, many=True, context=context).data
+
+        def compiled_serialize_only():
+            chapter_plan, content_plan = plan_for(ChapterSerializer), plan_for(ContentSerializer)
+            [content_plan.build(row, request, None) for row in content_rows]
+            [chapter_plan.build(row, request, {"contents": []}) for row in chapter_rows]
+
+        self.stdout.write(self.style.WARNING(f"Course with {len(contents)} lessons, {repeat} runs"))
+        for label, slow, fast in (
+            ("end to end (queries + render)", drf, compiled),
+            ("serialization only", drf_serialize_only, compiled_serialize_only),
+        ):
+            slow_ms, fast_ms = self.time(slow, repeat), self.time(fast, repeat)
+            self.stdout.write(
+                f"{label:<32} DRF {slow_ms:8.2f}ms  compiled {fast_ms:8.2f}ms  ({slow_ms / fast_ms:.1f}x)"
+            )
+
+    def time(self, func, repeat):
+        func()
+        started = time.process_time()
+        for _ in range(repeat):
+            func()
+        return (time.process_time() - started) * 1000 / repeat
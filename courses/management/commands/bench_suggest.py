@@ -0,0 +1,79 @@
+import random
+import statistics
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.suggest import SuggestIndex, normalize
+
+ENGLISH = (
+    "algebra", "biology", "calculus", "chemistry", "data", "economics", "english", "geometry", "grammar",
+    "history", "introduction", "linear", "mathematics", "physics", "programming", "python", "statistics",
+    "advanced", "basic", "for", "beginners", "complete", "guide", "to", "the", "of", "and", "exam", "preparation",
+)
+BENGALI = (
+    "বাংলা", "গণিত", "পদার্থবিজ্ঞান", "রসায়ন", "জীববিজ্ঞান", "ইংরেজি", "ব্যাকরণ", "ইতিহাস", "ভূগোল",
+    "প্রোগ্রামিং", "পরিচিতি", "উচ্চতর", "মৌলিক", "সম্পূর্ণ", "প্রস্তুতি", "পরীক্ষা", "অধ্যায়", "ক্লাস",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the course title suggestion index on synthetic Bengali and English titles (no database): "
+        "build time, memory, query latency by prefix length and single-course updates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--courses", type=int, default=100_000)
+        parser.add_argument("--queries", type=int, default=2_000, help="Queries per prefix length.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--budget-ms", type=float, default=20.0, help="Fail when the p99 query is slower.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        titles = [self.title(rng) for _ in range(options["courses"])]
+        rows = [(n, title, f"course-{n}", rng.paretovariate(1.2)) for n, title in enumerate(titles, start=1)]
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        index = SuggestIndex(rows)
+        elapsed = time.perf_counter() - started
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(self.style.WARNING(
+            f"{len(index):,} courses, {len(index.keys):,} keys: built in {elapsed:.2f}s, {memory / 2**20:.1f}MB"
+        ))
+
+        worst = 0.0
+        for length in (1, 2, 3, 5, 8, 15, 30):
+            first, repeated = [], []
+            for _ in range(options["queries"]):
+                words = normalize(rng.choice(titles)).split(" ")
+                query = " ".join(words[rng.randrange(len(words)):])[:length]
+                for timings in (first, repeated):  # popular prefixes are memoized after the first query
+                    started = time.perf_counter()
+                    index.search(query, 10)
+                    timings.append((time.perf_counter() - started) * 1000)
+            p99 = statistics.quantiles(first, n=100)[98]
+            worst = max(worst, p99)
+            self.stdout.write(
+                f"prefix {length:>2} chars  p50 {statistics.median(first):6.3f}ms  p99 {p99:6.3f}ms  "
+                f"repeated p50 {statistics.median(repeated):6.3f}ms"
+            )
+
+        updates = []
+        for n in range(200):
+            course_id = rng.randrange(1, len(rows) + 1)
+            started = time.perf_counter()
+            index.put(course_id, self.title(rng), f"course-{course_id}", rng.paretovariate(1.2))
+            updates.append((time.perf_counter() - started) * 1000)
+        self.stdout.write(f"course update     p50 {statistics.median(updates):6.3f}ms  max {max(updates):6.3f}ms")
+
+        if worst > options["budget_ms"]:
+            raise CommandError(f"p99 query latency {worst:.2f}ms is over the {options['budget_ms']}ms budget")
+        self.stdout.write(self.style.SUCCESS(f"✅ Suggestions at {len(index):,} courses: p99 {worst:.2f}ms or better"))
+
+    def title(self, rng):
+        words = BENGALI if rng.random() < 0.5 else ENGLISH
+        return " ".join(rng.choice(words) for _ in range(rng.randint(2, 7))).title()
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from courses.models import Course
+from courses.outline import build_outline
+
+
+class Command(BaseCommand):
+    help = "Build (or rebuild) the flattened reading-order outline used for lesson prev/next."
+
+    def add_arguments(self, parser):
+        parser.add_argument("slugs", nargs="*", help="Only these courses (default: every course).")
+
+    def handle(self, *args, **options):
+        courses = Course.objects.all()
+        if options["slugs"]:
+            courses = courses.filter(slug__in=options["slugs"])
+
+        built = 0
+        for course_id, slug in courses.values_list("id", "slug"):
+            total = build_outline(course_id)
+            built += 1
+            self.stdout.write(f"  {slug}: {total} contents")
+        self.stdout.write(self.style.SUCCESS(f"✅ Built {built} course outlines."))
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from courses.recommendations import MIN_SUPPORT, TOP_K, refresh
+
+
+class Command(BaseCommand):
+    help = "Rebuild the co-enrollment neighbour lists behind courses/slug/<slug>/recommendations/."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Rebuild every course instead of only the changed ones.")
+        parser.add_argument("--k", type=int, default=TOP_K, help="Neighbours kept per course.")
+        parser.add_argument("--min-support", type=int, default=MIN_SUPPORT, help="Minimum shared students.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = refresh(full=options["full"], k=options["k"], min_support=options["min_support"])
+        elapsed = time.perf_counter() - started
+        if written:
+            self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt neighbours of {written} courses in {elapsed:.2f}s"))
+        else:
+            self.stdout.write(self.style.SUCCESS("✅ Nothing changed since the last build."))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from courses.models import Course
+from courses.snapshots import build_snapshot
+
+
+class Command(BaseCommand):
+    help = "Build (or rebuild) the pre-rendered snapshots of published courses."
+
+    def add_arguments(self, parser):
+        parser.add_argument("slugs", nargs="*", help="Only these courses (default: every published course).")
+
+    def handle(self, *args, **options):
+        courses = Course.objects.filter(status="published")
+        if options["slugs"]:
+            courses = courses.filter(slug__in=options["slugs"])
+
+        built = 0
+        for course_id, slug in courses.values_list("id", "slug"):
+            snapshot = build_snapshot(course_id)
+            if snapshot:
+                built += 1
+                self.stdout.write(f"  {slug}: {len(snapshot.body)} bytes ({len(snapshot.body_gzip)} gzipped)")
+        self.stdout.write(self.style.SUCCESS(f"✅ Built {built} course snapshots."))
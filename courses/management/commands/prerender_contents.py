@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from courses.models import Content
+from courses.rendering import CHUNK_SIZE, prerender
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the HTML and plain text of every content whose data changed since it was last rendered, "
+        "on a process pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("slugs", nargs="*", help="Only the contents of these courses (default: every content).")
+        parser.add_argument("--workers", type=int, default=None, help="Processes (default: one per CPU).")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+        parser.add_argument("--force", action="store_true", help="Render unchanged contents too.")
+
+    def handle(self, *args, **options):
+        contents = Content.objects.all()
+        if options["slugs"]:
+            contents = contents.filter(chapter__course__slug__in=options["slugs"])
+
+        def progress(counts):
+            self.stdout.write(f"  {counts['rendered']} rendered, {counts['skipped']} unchanged")
+
+        started = time.perf_counter()
+        counts = prerender(
+            contents, workers=options["workers"], chunk_size=options["chunk_size"], force=options["force"],
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Rendered {counts['rendered']} of {counts['contents']} contents "
+            f"({counts['skipped']} unchanged) in {time.perf_counter() - started:.1f}s."
+        ))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from courses.models import Course
+from courses.purge import CHUNK_SIZE, PAUSE_SECONDS, purge_course
+
+
+class Command(BaseCommand):
+    help = "Purge soft-deleted courses now, in chunks, printing progress (the worker does this in the background)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("slugs", nargs="*", help="Only these soft-deleted courses (default: all of them).")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+        parser.add_argument("--pause", type=float, default=PAUSE_SECONDS, help="Seconds to sleep between chunks.")
+
+    def handle(self, *args, **options):
+        courses = Course.all_objects.filter(deleted_at__isnull=False)
+        if options["slugs"]:
+            courses = courses.filter(slug__in=options["slugs"])
+
+        purged = 0
+        for course_id, title in courses.values_list("id", "title"):
+            self.stdout.write(self.style.WARNING(f"Purging {title} (#{course_id})"))
+            purge = purge_course(
+                course_id, chunk_size=options["chunk_size"], pause=options["pause"], progress=self.report,
+            )
+            if purge:
+                purged += 1
+                self.stdout.write(f"\r  done: {self.summary(purge)}")
+        self.stdout.write(self.style.SUCCESS(f"✅ Purged {purged} courses."))
+
+    def report(self, purge):
+        self.stdout.write(f"\r  {purge.current}: {purge.deleted.get(purge.current, 0)} rows", ending="")
+        self.stdout.flush()
+
+    def summary(self, purge):
+        return ", ".join(f"{label} {count}" for label, count in purge.deleted.items()) or "nothing under it"
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from courses.models import Course
+from courses.popularity import COMPONENTS, WEIGHTS, decayed, explain, recompute, score
+
+
+class Command(BaseCommand):
+    help = "Rebuild the time-decayed popularity score of every course from enrollments, favourites and reviews."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--course", action="append", help="Course slug; may be repeated. Defaults to all courses.")
+        parser.add_argument("--top", type=int, default=10, help="Print the top N courses afterwards.")
+        parser.add_argument("--explain", metavar="SLUG", help="Only print the score and components of one course.")
+
+    def handle(self, *args, **options):
+        if options["explain"]:
+            course = Course.objects.filter(slug=options["explain"]).first()
+            if course is None:
+                raise CommandError(f"No course with slug {options['explain']!r}")
+            self.print_explain(explain(course))
+            return
+
+        course_ids = None
+        if options["course"]:
+            course_ids = list(Course.objects.filter(slug__in=options["course"]).values_list("pk", flat=True))
+            if len(course_ids) != len(set(options["course"])):
+                raise CommandError("Some course slugs do not exist")
+
+        started = time.perf_counter()
+        totals = recompute(course_ids)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"✅ Recomputed popularity of {len(totals)} courses in {elapsed:.2f}s"))
+
+        now = timezone.now()
+        ranked = sorted(totals.items(), key=lambda item: score(item[1]), reverse=True)[:options["top"]]
+        titles = dict(Course.objects.filter(pk__in=[pk for pk, _ in ranked]).values_list("pk", "title"))
+        for pk, components in ranked:
+            parts = "  ".join(f"{name} {decayed(components[name], now):.2f}" for name in COMPONENTS)
+            self.stdout.write(f"{decayed(score(components), now):9.2f}  {titles[pk][:40]:<40}  {parts}")
+
+    def print_explain(self, info):
+        self.stdout.write(f"score {info['score']:.4f} (half-life {info['half_life_days']:g} days)")
+        for name, part in info["components"].items():
+            self.stdout.write(
+                f"  {name:<12} {part['events']:.4f} decayed events × {WEIGHTS[name]:g} = {part['events'] * part['weight']:.4f}"
+            )
+        self.stdout.write(f"last recomputed: {info['recomputed_at'] or 'never'}")
@@ -0,0 +1,242 @@
+"""
+Lesson media (videos, audio, PDFs, images) served from ``LESSON_MEDIA_ROOT``.
+
+A file is served at ``/api/courses/contents/slug/<slug>/media/<path>`` when the content's
+``data`` references it — a relative path in an asset prop (``ASSET_PROPS``) of any Puck block
+or of ``root`` — and the requester may open the content (``courses.entitlements``). What a
+content references, its course and whether its chapter is free are cached per slug (the
+"gate") until the content or its chapter is saved.
+
+Media players fetch a file as many ``Range`` requests and can't send an ``Authorization``
+header from a ``<video src>``. ``GET .../media/`` (no path) therefore returns the content's
+asset URLs with a signed ``grant``: proof, for ``MEDIA_GRANT_SECONDS``, that the profile was
+entitled to the course, so range requests carrying it need neither a token nor the database.
+
+Single byte ranges are answered with 206 (multi-range requests get the whole file), with
+``ETag``/``Last-Modified`` and ``If-Range``/``If-None-Match`` support. The body is a file
+object bounded to the range that keeps ``fileno()``, so gunicorn sends it with ``sendfile()``.
+With ``LESSON_MEDIA_OFFLOAD`` set, the response only names the file and the web server
+(nginx ``X-Accel-Redirect`` or ``X-Sendfile``) does the serving, ranges included.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+import stat
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+
+from .models import Content
+
+MEDIA_ROOT = Path(getattr(settings, "LESSON_MEDIA_ROOT", settings.BASE_DIR / "media" / "lessons"))
+OFFLOAD = getattr(settings, "LESSON_MEDIA_OFFLOAD", "")  # "", "x-accel-redirect" or "x-sendfile"
+ACCEL_PREFIX = getattr(settings, "LESSON_MEDIA_ACCEL_PREFIX", "/protected/lessons/")
+GATE_CACHE_SECONDS = getattr(settings, "LESSON_MEDIA_GATE_SECONDS", 300)
+GRANT_SECONDS = getattr(settings, "MEDIA_GRANT_SECONDS", 3600)
+ASSET_PROPS = ("src", "url", "file", "asset", "video", "audio", "pdf", "image", "poster", "captions")
+
+GRANT_SALT = "courses.media.grant"
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class UnsatisfiableRange(ValueError):
+    pass
+
+
+def asset_path(value):
+    """``value`` as a path below the media root, or None for URLs and paths that escape it."""
+    if not isinstance(value, str) or not value.strip() or "\x00" in value or "\\" in value:
+        return None
+    value = value.strip()
+    if value.startswith("/") or ":" in value.split("/", 1)[0]:  # absolute paths, http:, data:, ...
+        return None
+    path = posixpath.normpath(value)
+    if path == "." or path == ".." or path.startswith("../"):
+        return None
+    return path
+
+
+def referenced_assets(data):
+    """The asset paths referenced by a content's Puck ``data``."""
+    found = set()
+    if not isinstance(data, dict):
+        return found
+    blocks = list(data.get("content") or [])
+    for zone in (data.get("zones") or {}).values():
+        blocks.extend(zone or [])
+    blocks.append(data.get("root") or {})
+    for block in blocks:
+        props = block.get("props") if isinstance(block, dict) else None
+        if not isinstance(props, dict):
+            continue
+        for name in ASSET_PROPS:
+            values = props.get(name)
+            for value in values if isinstance(values, list) else [values]:
+                path = asset_path(value)
+                if path:
+                    found.add(path)
+    return found
+
+
+def _gate_key(slug):
+    return f"media-gate:{slug}"
+
+
+def content_gate(slug):
+    """``{"course_id", "is_free", "assets"}`` of a live content, cached; None when there is none."""
+    key = _gate_key(slug)
+    gate = cache.get(key)
+    if gate is None:
+        row = Content.objects.filter(slug=slug, chapter__course__deleted_at__isnull=True).values_list(
+            "chapter__course_id", "chapter__is_free", "data"
+        ).first()
+        gate = {"course_id": row[0], "is_free": row[1], "assets": sorted(referenced_assets(row[2]))} if row else {}
+        cache.set(key, gate, GATE_CACHE_SECONDS)  # misses too, so probing slugs stays cheap
+    return gate or None
+
+
+def forget_gates(slugs):
+    cache.delete_many([_gate_key(slug) for slug in slugs])
+
+
+def make_grant(profile_id, course_id):
+    return signing.TimestampSigner(salt=GRANT_SALT).sign_object({"p": profile_id, "c": course_id})
+
+
+def grant_allows(grant, course_id):
+    try:
+        claims = signing.TimestampSigner(salt=GRANT_SALT).unsign_object(grant, max_age=GRANT_SECONDS)
+    except signing.BadSignature:  # includes SignatureExpired
+        return False
+    return isinstance(claims, dict) and claims.get("c") == course_id
+
+
+def parse_range(header, size):
+    """
+    ``(first, last)`` byte positions of a single-range ``Range`` header, or None to send the whole
+    file (no, malformed or multi-range header). Raises UnsatisfiableRange past the end of the
+    file, and for any range of an empty file.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:  # "bytes=-500": the last 500 bytes
+        if int(last) == 0 or size == 0:
+            raise UnsatisfiableRange(header)
+        return max(size - int(last), 0), size - 1
+    first = int(first)
+    last = min(int(last), size - 1) if last else size - 1
+    if first > last:
+        if first >= size:
+            raise UnsatisfiableRange(header)
+        return None  # "bytes=5-2" is invalid and ignored
+    return first, last
+
+
+def _if_range_matches(request, etag, mtime):
+    value = request.headers.get("If-Range")
+    if not value:
+        return True
+    if value.startswith(('"', 'W/')):
+        return value == etag  # strong comparison; weak validators never match
+    modified = parse_http_date_safe(value)
+    return modified is not None and int(mtime) == modified
+
+
+class FileRange:
+    """
+    A file read from its current position for at most ``length`` bytes. ``fileno`` is kept so
+    ``wsgi.file_wrapper`` can ``sendfile()`` from that position for the response's Content-Length.
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        data = self.file.read(self.remaining if size is None or size < 0 else min(size, self.remaining))
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def serve(request, path):
+    """The response for the asset at ``path`` (already checked against the content and the requester)."""
+    try:
+        full_path = safe_join(MEDIA_ROOT, path)
+        info = os.stat(full_path)
+    except (OSError, SuspiciousFileOperation):
+        raise Http404("No such media file.")
+    if not stat.S_ISREG(info.st_mode):
+        raise Http404("No such media file.")
+
+    content_type, _ = mimetypes.guess_type(path)
+    headers = {
+        "Content-Type": content_type or "application/octet-stream",
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, max-age=3600",
+        "ETag": f'"{info.st_size:x}-{info.st_mtime_ns:x}"',
+        "Last-Modified": http_date(info.st_mtime),
+    }
+    if OFFLOAD:
+        return _offloaded(path, full_path, headers)
+
+    if headers["ETag"] in parse_etags(request.headers.get("If-None-Match", "")):
+        return _response(HttpResponse(status=304), headers)
+
+    size = info.st_size
+    byte_range = None
+    if _if_range_matches(request, headers["ETag"], info.st_mtime):
+        try:
+            byte_range = parse_range(request.headers.get("Range"), size)
+        except UnsatisfiableRange:
+            headers["Content-Range"] = f"bytes */{size}"
+            return _response(HttpResponse(status=416), headers)
+    first, last = byte_range or (0, size - 1)
+    length = last - first + 1
+    if byte_range:
+        headers["Content-Range"] = f"bytes {first}-{last}/{size}"
+    headers["Content-Length"] = str(length)
+    status = 206 if byte_range else 200
+
+    if request.method == "HEAD":
+        return _response(HttpResponse(status=status), headers)
+    file = open(full_path, "rb")
+    file.seek(first)
+    return _response(FileResponse(FileRange(file, length), status=status), headers)
+
+
+def _offloaded(path, full_path, headers):
+    response = HttpResponse()
+    if OFFLOAD == "x-accel-redirect":
+        response["X-Accel-Redirect"] = ACCEL_PREFIX.rstrip("/") + "/" + quote(path)
+    else:
+        response["X-Sendfile"] = full_path
+    # the web server answers ranges and conditional requests itself, from the file
+    del headers["ETag"], headers["Last-Modified"]
+    return _response(response, headers)
+
+
+def _response(response, headers):
+    for name, value in headers.items():
+        response[name] = value
+    return response
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_chapter_is_free_courseenrollment_and_more'),
+        ('users', '0003_profile_role'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='courseenrollment',
+            index=models.Index(fields=['enrolled_at', 'id'], name='courses_enroll_enrolled_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='courseprogress',
+            index=models.Index(fields=['last_accessed', 'id'], name='courses_progress_accessed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='favourite',
+            index=models.Index(fields=['created_at', 'id'], name='courses_fav_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['created_at', 'id'], name='courses_review_created_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slug', models.SlugField(max_length=255, unique=True)),
+                ('is_free', models.BooleanField(default=False)),
+                ('body', models.BinaryField()),
+                ('body_gzip', models.BinaryField()),
+                ('content', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='snapshot', to='courses.content')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='content_snapshots', to='courses.course')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CourseSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slug', models.SlugField(max_length=255, unique=True)),
+                ('body', models.BinaryField()),
+                ('body_gzip', models.BinaryField()),
+                ('outline', models.BinaryField()),
+                ('outline_gzip', models.BinaryField()),
+                ('built_at', models.DateTimeField(auto_now=True)),
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='snapshot', to='courses.course')),
+            ],
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_course_snapshots'),
+        ('users', '0003_profile_role'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chapter',
+            index=models.Index(fields=['course', 'tree_id', 'lft'], name='courses_chapter_outline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chapter',
+            index=models.Index(fields=['tree_id', 'lft'], name='courses_chapter_tree_id_lffa80'),
+        ),
+        migrations.AddIndex(
+            model_name='content',
+            index=models.Index(fields=['chapter', 'order'], name='courses_content_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(condition=models.Q(('status', 'published')), fields=['-published_at'], name='courses_course_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='courseprogress',
+            index=models.Index(fields=['student', '-last_accessed', '-id'], name='courses_progress_student_idx'),
+        ),
+    ]
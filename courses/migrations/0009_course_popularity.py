@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_hot_path_indexes'),
+        ('users', '0003_profile_role'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoursePopularity',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='popularity', serialize=False, to='courses.course')),
+                ('enrollments', models.FloatField(default=0)),
+                ('favourites', models.FloatField(default=0)),
+                ('reviews', models.FloatField(default=0)),
+                ('recomputed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='popularity_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['-popularity_score', '-id'], name='courses_course_trending_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0009_course_popularity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseNeighbours',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='neighbours', serialize=False, to='courses.course')),
+                ('neighbours', models.JSONField(default=list)),
+                ('built_at', models.DateTimeField()),
+                ('stale', models.BooleanField(default=False)),
+            ],
+        ),
+    ]
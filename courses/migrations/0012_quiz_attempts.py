@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:54
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0011_teacher_analytics_rollups'),
+        ('users', '0003_profile_role'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='courseprogress',
+            name='score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='QuizAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('answers', models.JSONField(default=dict)),
+                ('results', models.JSONField(default=dict)),
+                ('score', models.FloatField(default=0)),
+                ('max_score', models.FloatField(default=0)),
+                ('percent', models.FloatField(default=0)),
+                ('passed', models.BooleanField(default=False)),
+                ('key_version', models.CharField(max_length=12)),
+                ('submitted_at', models.DateTimeField(auto_now_add=True)),
+                ('graded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('content', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_attempts', to='courses.content')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_attempts', to='users.profile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['content', 'student', '-submitted_at'], name='courses_quiz_attempt_idx')],
+            },
+        ),
+    ]
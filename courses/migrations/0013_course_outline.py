@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0012_quiz_attempts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentsnapshot',
+            name='next_slug',
+            field=models.SlugField(blank=True, max_length=255),
+        ),
+        migrations.CreateModel(
+            name='CourseOutlineEntry',
+            fields=[
+                ('content', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='outline', serialize=False, to='courses.content')),
+                ('sequence', models.PositiveIntegerField()),
+                ('total', models.PositiveIntegerField()),
+                ('previous_slug', models.SlugField(blank=True, max_length=255)),
+                ('next_slug', models.SlugField(blank=True, max_length=255)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outline_entries', to='courses.course')),
+            ],
+            options={
+                'unique_together': {('course', 'sequence')},
+            },
+        ),
+    ]
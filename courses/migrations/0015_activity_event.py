@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-19 15:21
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0014_course_soft_delete'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('student_id', models.BigIntegerField()),
+                ('content_id', models.BigIntegerField()),
+                ('kind', models.PositiveSmallIntegerField(choices=[(1, 'Open'), (2, 'Complete')])),
+                ('at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('compacted_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('compacted_at__isnull', True)), fields=['id'], name='courses_activity_pending_idx'), models.Index(condition=models.Q(('compacted_at__isnull', False)), fields=['compacted_at'], name='courses_activity_compacted_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-19 15:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0015_activity_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentRendering',
+            fields=[
+                ('content', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rendering', serialize=False, to='courses.content')),
+                ('data_hash', models.CharField(max_length=40)),
+                ('html', models.TextField(blank=True)),
+                ('text', models.TextField(blank=True)),
+                ('rendered_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
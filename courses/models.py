@@ -2,7 +2,7 @@ from django.db import models
 from django.utils import timezone
 from users.models import Profile
 from mptt.models import MPTTModel, TreeForeignKey
-from django.db.models import JSONField
+from django.db.models import JSONField, Q
 from django.utils.text import slugify
 import re
 import unicodedata
@@ -58,6 +58,18 @@ class Level(models.Model):
 
 
 
+class CourseQuerySet(models.QuerySet):
+    def alive(self):
+        return self.filter(deleted_at__isnull=True)
+
+
+class CourseManager(models.Manager.from_queryset(CourseQuerySet)):
+    """Default manager: soft-deleted courses are hidden everywhere."""
+
+    def get_queryset(self):
+        return super().get_queryset().alive()
+
+
 class Course(models.Model):
     PRICE_UNITS = [
         ('bdt', 'BDT'),
@@ -96,13 +108,29 @@ class Course(models.Model):
     thumbnail_url = models.URLField(blank=True, null=True) 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # time-decayed activity, maintained by courses/popularity.py
+    popularity_score = models.FloatField(default=0, editable=False)
+    # soft delete: hidden at once, rows removed later by courses/purge.py
+    deleted_at = models.DateTimeField(blank=True, null=True, editable=False)
+
+    objects = CourseManager()
+    all_objects = CourseQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # published catalog, newest first
+            models.Index(fields=["-published_at"], condition=Q(status="published"), name="courses_course_published_idx"),
+            # ?ordering=trending
+            models.Index(fields=["-popularity_score", "-id"], name="courses_course_trending_idx"),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.slug:
             base_slug = bn_slugify(self.title)
             slug = base_slug
             counter = 1
             # ensure uniqueness
-            while Course.objects.filter(slug=slug).exclude(pk=self.pk).exists():
+            while Course.all_objects.filter(slug=slug).exclude(pk=self.pk).exists():
                 slug = f"{base_slug}-{counter}"
                 counter += 1
             self.slug = slug
@@ -110,8 +138,21 @@ class Course(models.Model):
         if self.status == "published" and self.published_at is None:
             self.published_at = timezone.now()
 
+        if not self._state.adding and not args and kwargs.get("update_fields") is None:
+            # these are written with queryset updates (popularity events, soft delete); don't
+            # write back a stale copy
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in ("popularity_score", "deleted_at")
+            ]
+
         super().save(*args, **kwargs)
 
+    def soft_delete(self):
+        """Hide the course now and queue the purge of its rows (courses/purge.py)."""
+        from .purge import soft_delete_courses
+        soft_delete_courses([self.pk])
+
     def __str__(self):
         return f"{self.title} ({self.domain.name if self.domain else 'NoDomain'})"
 
@@ -139,6 +180,7 @@ class Chapter(MPTTModel):
 
     class Meta:
         unique_together = ("course", "title")
+        indexes = [models.Index(fields=["course", "tree_id", "lft"], name="courses_chapter_outline_idx")]
 
     def __str__(self):
         return f"{self.course.title} → {self.title}"
@@ -177,6 +219,7 @@ class Content(models.Model):
 
     class Meta:
         ordering = ["order"]
+        indexes = [models.Index(fields=["chapter", "order"], name="courses_content_order_idx")]
 
     def __str__(self):
         return f"{self.chapter.title} → {self.title}"
@@ -195,6 +238,7 @@ class Review(models.Model):
     class Meta:
         unique_together = ("student", "course")  # one review per student per course
         ordering = ["-created_at"]
+        indexes = [models.Index(fields=["created_at", "id"], name="courses_review_created_idx")]
 
     def __str__(self):
         return f"{self.student.user.username} → {self.course.title} ({self.rating}★)"
@@ -207,6 +251,7 @@ class Favourite(models.Model):
 
     class Meta:
         unique_together = ("student", "course")  # prevent duplicate favourites
+        indexes = [models.Index(fields=["created_at", "id"], name="courses_fav_created_idx")]
 
     def __str__(self):
         return f"{self.student.user.username} ❤️ {self.course.title}"
@@ -228,6 +273,7 @@ class CourseEnrollment(models.Model):
 
     class Meta:
         unique_together = ("student", "course")
+        indexes = [models.Index(fields=["enrolled_at", "id"], name="courses_enroll_enrolled_idx")]
 
     def __str__(self):
         return f"{self.student.user.username} → {self.course.title}"
@@ -244,11 +290,206 @@ class CourseProgress(models.Model):
     completed = models.BooleanField(default=False)
     completed_at = models.DateTimeField(blank=True, null=True)
     last_accessed = models.DateTimeField(auto_now=True)
+    score = models.FloatField(blank=True, null=True)  # best quiz percentage (courses/quizzes.py)
 
     class Meta:
         unique_together = ("student", "course", "content")
+        indexes = [
+            models.Index(fields=["last_accessed", "id"], name="courses_progress_accessed_idx"),
+            models.Index(fields=["student", "-last_accessed", "-id"], name="courses_progress_student_idx"),
+        ]
 
     def __str__(self):
         return f"{self.student.user.username} → {self.course.title} ({'Done' if self.completed else 'In Progress'})"
 
 
+class ContentRendering(models.Model):
+    """HTML and plain text of a content's data (courses/rendering.py), valid while data_hash matches."""
+    content = models.OneToOneField(Content, on_delete=models.CASCADE, primary_key=True, related_name="rendering")
+    data_hash = models.CharField(max_length=40)
+    html = models.TextField(blank=True)
+    text = models.TextField(blank=True)
+    rendered_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Rendering of {self.content_id}"
+
+
+class ActivityEvent(models.Model):
+    """A lesson open or completion, folded into CourseProgress by courses/activity.py."""
+    OPEN, COMPLETE = 1, 2
+    KINDS = [(OPEN, "Open"), (COMPLETE, "Complete")]
+
+    # plain ids, not foreign keys: appending must not look up or lock the student and content
+    # rows; compaction drops events whose student or content is gone
+    student_id = models.BigIntegerField()
+    content_id = models.BigIntegerField()
+    kind = models.PositiveSmallIntegerField(choices=KINDS)
+    at = models.DateTimeField(default=timezone.now)
+    compacted_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # both partial, so an insert only touches the pending one
+            models.Index(fields=["id"], condition=Q(compacted_at__isnull=True), name="courses_activity_pending_idx"),
+            models.Index(
+                fields=["compacted_at"], condition=Q(compacted_at__isnull=False), name="courses_activity_compacted_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} of content {self.content_id} by profile {self.student_id}"
+
+
+class CoursePopularity(models.Model):
+    """Per-source parts of Course.popularity_score, forward-decayed (see courses/popularity.py)."""
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, primary_key=True, related_name="popularity")
+    enrollments = models.FloatField(default=0)
+    favourites = models.FloatField(default=0)
+    reviews = models.FloatField(default=0)
+    recomputed_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"Popularity of {self.course.title}"
+
+
+class CourseNeighbours(models.Model):
+    """Top-K co-enrollment neighbours of a course (see courses/recommendations.py)."""
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, primary_key=True, related_name="neighbours")
+    # [[course_id, cosine similarity], ...], most similar first
+    neighbours = JSONField(default=list)
+    built_at = models.DateTimeField()
+    stale = models.BooleanField(default=False)  # an enrollment/favourite was removed since built_at
+
+    def __str__(self):
+        return f"Neighbours of {self.course.title}"
+
+
+class QuizAttempt(models.Model):
+    """One graded submission of a quiz (see courses/quizzes.py)."""
+    content = models.ForeignKey(Content, on_delete=models.CASCADE, related_name="quiz_attempts")
+    student = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name="quiz_attempts")
+    answers = JSONField(default=dict)   # {question_id: option index | [indices] | text}
+    results = JSONField(default=dict)   # {question_id: correct}
+    score = models.FloatField(default=0)
+    max_score = models.FloatField(default=0)
+    percent = models.FloatField(default=0)
+    passed = models.BooleanField(default=False)
+    key_version = models.CharField(max_length=12)  # answer key the attempt was graded against
+    submitted_at = models.DateTimeField(auto_now_add=True)
+    graded_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=["content", "student", "-submitted_at"], name="courses_quiz_attempt_idx")]
+
+    def __str__(self):
+        return f"{self.student.user.username} → {self.content.title} ({self.percent}%)"
+
+
+# -------------------------------
+# TEACHER ANALYTICS ROLLUPS (courses/analytics.py)
+# -------------------------------
+
+class CourseDailyStats(models.Model):
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="daily_stats")
+    day = models.DateField()
+    enrollments = models.PositiveIntegerField(default=0)
+    reviews = models.PositiveIntegerField(default=0)
+    rating_total = models.PositiveIntegerField(default=0)  # average = rating_total / reviews
+    completions = models.PositiveIntegerField(default=0)   # contents completed that day
+
+    class Meta:
+        unique_together = ("course", "day")
+
+    def __str__(self):
+        return f"{self.course.title} {self.day}"
+
+
+class ChapterFunnel(models.Model):
+    chapter = models.OneToOneField(Chapter, on_delete=models.CASCADE, primary_key=True, related_name="funnel")
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="chapter_funnels")
+    students_started = models.PositiveIntegerField(default=0)    # any progress in the chapter
+    students_completed = models.PositiveIntegerField(default=0)  # completed every content in it
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Funnel of {self.chapter.title}"
+
+
+class RollupWatermark(models.Model):
+    """How far a rollup has consumed its source rows."""
+    name = models.CharField(max_length=50, unique=True)
+    value = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name} @ {self.value}"
+
+
+class CoursePurge(models.Model):
+    """Progress of a soft-deleted course's background purge (see courses/purge.py)."""
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    course_id = models.IntegerField(db_index=True)  # no FK: the course row goes at the end
+    title = models.CharField(max_length=255)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='running')
+    deleted = JSONField(default=dict)  # table label -> rows deleted so far
+    current = models.CharField(max_length=50, blank=True)  # table being purged
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    error = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"Purge of {self.title} ({self.status})"
+
+
+class CourseOutlineEntry(models.Model):
+    """A content's place in its course's reading order (see courses/outline.py)."""
+    content = models.OneToOneField(Content, on_delete=models.CASCADE, primary_key=True, related_name="outline")
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="outline_entries")
+    sequence = models.PositiveIntegerField()  # 0-based
+    total = models.PositiveIntegerField()
+    previous_slug = models.SlugField(max_length=255, blank=True)
+    next_slug = models.SlugField(max_length=255, blank=True)
+
+    class Meta:
+        unique_together = ("course", "sequence")
+
+    def __str__(self):
+        return f"{self.course_id} #{self.sequence}"
+
+
+# -------------------------------
+# PUBLISHED SNAPSHOTS
+# -------------------------------
+
+class CourseSnapshot(models.Model):
+    """Pre-rendered anonymous course detail of a published course (see courses/snapshots.py)."""
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, related_name="snapshot")
+    slug = models.SlugField(max_length=255, unique=True)
+
+    body = models.BinaryField()          # CourseDetailSerializer JSON
+    body_gzip = models.BinaryField()
+    outline = models.BinaryField()       # chapters → contents JSON
+    outline_gzip = models.BinaryField()
+    built_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Snapshot of {self.slug}"
+
+
+class ContentSnapshot(models.Model):
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="content_snapshots")
+    content = models.OneToOneField(Content, on_delete=models.CASCADE, related_name="snapshot")
+    slug = models.SlugField(max_length=255, unique=True)
+    is_free = models.BooleanField(default=False)
+    next_slug = models.SlugField(max_length=255, blank=True)  # for the prefetch Link header
+
+    body = models.BinaryField()          # ContentDetailSerializer JSON + navigation
+    body_gzip = models.BinaryField()
+
+    def __str__(self):
+        return f"Snapshot of {self.slug}"
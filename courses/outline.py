@@ -0,0 +1,64 @@
+"""
+Flattened course outline for lesson navigation.
+
+Every content of a course gets a ``CourseOutlineEntry`` holding its position in reading order
+(chapters by tree order, then ``Content.order``), the course's content count and its
+neighbours' slugs, so the lesson player's prev/next/position is one primary-key join.
+Chapter and content changes queue a debounced rebuild of the course's outline, and of the
+course they left when they moved.
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.urls import reverse
+
+from core.jobs import enqueue
+from .models import Content, CourseOutlineEntry
+
+REBUILD_DELAY = 2  # seconds; same debounce as the snapshots
+
+# extra columns for content_detail_row(); LEFT JOIN, so None until the outline is built
+NAVIGATION_COLUMNS = ("outline__sequence", "outline__total", "outline__previous_slug", "outline__next_slug")
+
+
+def build_outline(course_id):
+    contents = list(
+        Content.objects.filter(chapter__course_id=course_id)
+        .order_by("chapter__tree_id", "chapter__lft", "order", "id")
+        .values_list("id", "slug")
+    )
+    total = len(contents)
+    entries = [
+        CourseOutlineEntry(
+            content_id=content_id, course_id=course_id, sequence=sequence, total=total,
+            previous_slug=contents[sequence - 1][1] if sequence else "",
+            next_slug=contents[sequence + 1][1] if sequence + 1 < total else "",
+        )
+        for sequence, (content_id, _) in enumerate(contents)
+    ]
+    with transaction.atomic():
+        # contents moved here from another course still have an entry there until it is rebuilt
+        CourseOutlineEntry.objects.filter(
+            Q(course_id=course_id) | Q(content_id__in=[content_id for content_id, _ in contents])
+        ).delete()
+        CourseOutlineEntry.objects.bulk_create(entries, batch_size=500)
+    return total
+
+
+def outline_changed(course_id):
+    if course_id is not None:
+        enqueue("courses.rebuild_outline", args=(course_id,), delay=REBUILD_DELAY, unique_key=f"outline:{course_id}")
+
+
+def navigation(columns):
+    """The ``navigation`` object of a content response from NAVIGATION_COLUMNS values."""
+    sequence, total, previous_slug, next_slug = (columns[name] for name in NAVIGATION_COLUMNS)
+    if sequence is None:
+        return None
+    return {"position": sequence + 1, "total": total, "previous": previous_slug or None, "next": next_slug or None}
+
+
+def prefetch_link(next_slug):
+    """``Link`` header value asking the client to prefetch the next lesson, or None."""
+    if not next_slug:
+        return None
+    return f'<{reverse("content-detail-by-slug", kwargs={"slug": next_slug})}>; rel=prefetch'
@@ -0,0 +1,32 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination without COUNT(*). DRF positions the cursor on the first ordering field only
+    (e.g. WHERE created_at < position); rows sharing that value are skipped with an offset stored in
+    the cursor, so a long run of equal timestamps still costs OFFSET within the run. The trailing
+    "id" is not part of the WHERE: it only makes the order within a tie deterministic, so that
+    offset lands on the same rows from one request to the next.
+    """
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
+    ordering = ('-id',)
+
+
+class CreatedAtPagination(KeysetPagination):
+    ordering = ('-created_at', '-id')
+
+
+class EnrolledAtPagination(KeysetPagination):
+    ordering = ('-enrolled_at', '-id')
+
+
+class LastAccessedPagination(KeysetPagination):
+    ordering = ('-last_accessed', '-id')
+
+
+class IdPagination(KeysetPagination):
+    ordering = ('id',)
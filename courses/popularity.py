@@ -0,0 +1,116 @@
+"""
+Time-decayed course popularity ("trending").
+
+Every enrollment, favourite and review adds ``weight * 2 ** (age / half-life)`` to its course,
+measured from a fixed epoch (forward decay). Newer events count exponentially more, and
+because every course is scaled by the same factor, ordering by the stored sum ranks courses by
+their decayed score at any moment. Nothing has to be re-decayed as time passes: new events are
+added with an atomic ``F()`` update and ``Course.popularity_score`` can be indexed.
+
+``decayed()`` turns a stored value back into "weighted events as of now" for display.
+``manage.py recompute_popularity`` rebuilds everything from the event tables; run it after
+changing the weights or half-life, or before 2 ** (age / half-life) gets near float range
+(about 19 years with a 7 day half-life) after moving POPULARITY_EPOCH forward.
+"""
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Course, CourseEnrollment, CoursePopularity, Favourite, Review
+
+HALF_LIFE_SECONDS = getattr(settings, "POPULARITY_HALF_LIFE_DAYS", 7) * 86400
+EPOCH = getattr(settings, "POPULARITY_EPOCH", datetime(2025, 1, 1, tzinfo=dt_timezone.utc))
+WEIGHTS = {
+    "enrollments": 1.0,
+    "favourites": 0.5,
+    "reviews": 2.0,
+    **getattr(settings, "POPULARITY_WEIGHTS", {}),
+}
+
+# component -> (event model, timestamp field)
+SOURCES = {
+    "enrollments": (CourseEnrollment, "enrolled_at"),
+    "favourites": (Favourite, "created_at"),
+    "reviews": (Review, "created_at"),
+}
+
+COMPONENTS = tuple(SOURCES)
+
+
+def boost(when):
+    """Forward-decay factor of an event at ``when``."""
+    return 2.0 ** ((when - EPOCH).total_seconds() / HALF_LIFE_SECONDS)
+
+
+def decayed(value, now=None):
+    """A stored (forward-decayed) value expressed as of ``now``."""
+    return value / boost(now or timezone.now())
+
+
+def record_event(course_id, component, when, sign=1):
+    """Add (or, with ``sign=-1``, remove) one event's contribution to a course."""
+    amount = sign * boost(when)
+    with transaction.atomic():
+        Course.objects.filter(pk=course_id).update(
+            popularity_score=F("popularity_score") + amount * WEIGHTS[component]
+        )
+        updated = CoursePopularity.objects.filter(course_id=course_id).update(
+            **{component: F(component) + amount}
+        )
+        if not updated and sign > 0:
+            _, created = CoursePopularity.objects.get_or_create(course_id=course_id, defaults={component: amount})
+            if not created:
+                CoursePopularity.objects.filter(course_id=course_id).update(**{component: F(component) + amount})
+
+
+def recompute(course_ids=None):
+    """
+    Rebuild scores and components from the event tables; returns ``{course_id: components}``.
+
+    Events recorded while this runs may be overwritten; the next run picks them up.
+    """
+    totals = defaultdict(lambda: dict.fromkeys(COMPONENTS, 0.0))
+    for component, (model, timestamp) in SOURCES.items():
+        events = model.objects.all()
+        if course_ids is not None:
+            events = events.filter(course_id__in=course_ids)
+        for course_id, when in events.values_list("course_id", timestamp).iterator(chunk_size=5000):
+            totals[course_id][component] += boost(when)
+
+    courses = Course.objects.all() if course_ids is None else Course.objects.filter(pk__in=course_ids)
+    ids = list(courses.values_list("pk", flat=True))
+    now = timezone.now()
+    rows = [CoursePopularity(course_id=pk, recomputed_at=now, **totals[pk]) for pk in ids]
+    scores = [Course(pk=pk, popularity_score=score(totals[pk])) for pk in ids]
+
+    with transaction.atomic():
+        CoursePopularity.objects.bulk_create(
+            rows, batch_size=1000, update_conflicts=True, unique_fields=["course"],
+            update_fields=[*COMPONENTS, "recomputed_at"],
+        )
+        Course.objects.bulk_update(scores, ["popularity_score"], batch_size=1000)
+    return {pk: totals[pk] for pk in ids}
+
+
+def score(components):
+    return sum(WEIGHTS[name] * components[name] for name in COMPONENTS)
+
+
+def explain(course, now=None):
+    """Score and components of a course as of ``now``, for debugging."""
+    now = now or timezone.now()
+    popularity = CoursePopularity.objects.filter(course=course).first()
+    components = {name: getattr(popularity, name, 0.0) for name in COMPONENTS}
+    return {
+        "course": course.pk,
+        "score": decayed(course.popularity_score, now),
+        "components": {
+            name: {"weight": WEIGHTS[name], "events": decayed(value, now)} for name, value in components.items()
+        },
+        "half_life_days": HALF_LIFE_SECONDS / 86400,
+        "recomputed_at": popularity.recomputed_at if popularity else None,
+    }
@@ -0,0 +1,190 @@
+"""
+Soft delete and background purge of courses.
+
+Deleting a course used to cascade through every chapter, content, enrollment, review and
+progress row in one transaction. Now ``soft_delete_courses`` only stamps ``deleted_at`` (the
+default manager and every course-scoped view hide it from then on), drops its snapshots and
+queues ``courses.purge_course``. The purge removes dependent rows leaf tables first, in
+``chunk_size`` rows per short transaction with a pause in between, records its progress in
+``CoursePurge`` and deletes the course row last, when nothing is left to cascade to.
+
+Chapters go one MPTT tree at a time: a course's root chapters each own a ``tree_id``, so once
+their contents are gone a whole tree is a single ``DELETE ... WHERE tree_id = ?`` with no
+per-node tree maintenance. ``delete_chapter_tree`` uses the same path for deleting one root
+chapter from the API.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.db import router, transaction
+from django.utils import timezone
+
+from core.jobs import enqueue
+from .caches import catalog
+from .models import (
+    Chapter, ChapterFunnel, Content, ContentRendering, ContentSnapshot, Course, CourseDailyStats, CourseEnrollment,
+    CourseOutlineEntry, CourseProgress, CoursePurge, Favourite, QuizAttempt, Review,
+)
+from .media import forget_gates
+from .outline import outline_changed
+from .snapshots import course_changed, invalidate_snapshot
+from .suggest import courses_changed
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = getattr(settings, "PURGE_CHUNK_SIZE", 1000)
+PAUSE_SECONDS = getattr(settings, "PURGE_PAUSE_SECONDS", 0.2)
+
+
+def soft_delete_courses(course_ids):
+    """Hide the courses immediately and queue their purge. Returns how many were newly deleted."""
+    course_ids = list(Course.objects.filter(pk__in=list(course_ids)).values_list("pk", flat=True))
+    deleted = Course.objects.filter(pk__in=course_ids).update(deleted_at=timezone.now())
+    for course_id in course_ids:
+        invalidate_snapshot(course_id)
+        # cached media gates (and the grants they check) would keep serving the files meanwhile
+        forget_gates(Content.objects.filter(chapter__course_id=course_id).values_list("slug", flat=True))
+        enqueue("courses.purge_course", args=(course_id,), unique_key=f"purge:{course_id}")
+    if deleted:
+        catalog.clear()
+        courses_changed(course_ids)
+    return deleted
+
+
+def delete_in_chunks(queryset, chunk_size=CHUNK_SIZE, pause=PAUSE_SECONDS, on_chunk=None):
+    """
+    Delete the rows of ``queryset`` ``chunk_size`` at a time, each chunk in its own transaction.
+    Rows are removed with a plain DELETE (no signals or cascade collection), so callers must
+    have deleted anything referencing them first. Returns the number of rows deleted.
+    """
+    model = queryset.model
+    using = router.db_for_write(model)
+    total = 0
+    while True:
+        ids = list(queryset.using(using).order_by().values_list("pk", flat=True)[:chunk_size])
+        if not ids:
+            return total
+        with transaction.atomic(using=using):
+            # QuerySet._raw_delete is what Django's collector uses for its own fast deletes
+            total += model._base_manager.using(using).filter(pk__in=ids)._raw_delete(using)
+        if on_chunk:
+            on_chunk(total)
+        if len(ids) < chunk_size:
+            return total
+        if pause:
+            time.sleep(pause)
+
+
+def _content_dependents(contents):
+    """Rows that must go before ``contents`` (a Content queryset) can be raw-deleted."""
+    return [
+        ("quiz attempts", QuizAttempt.objects.filter(content__in=contents)),
+        ("outline entries", CourseOutlineEntry.objects.filter(content__in=contents)),
+        ("content snapshots", ContentSnapshot.objects.filter(content__in=contents)),
+        ("content renderings", ContentRendering.objects.filter(content__in=contents)),
+    ]
+
+
+def _course_steps(course_id):
+    contents = Content.objects.filter(chapter__course_id=course_id)
+    return [
+        ("progress", CourseProgress.objects.filter(course_id=course_id)),
+        *_content_dependents(contents),
+        ("enrollments", CourseEnrollment.objects.filter(course_id=course_id)),
+        ("favourites", Favourite.objects.filter(course_id=course_id)),
+        ("reviews", Review.objects.filter(course_id=course_id)),
+        ("daily stats", CourseDailyStats.objects.filter(course_id=course_id)),
+        ("chapter funnels", ChapterFunnel.objects.filter(course_id=course_id)),
+        ("contents", contents),
+    ]
+
+
+def purge_course(course_id, chunk_size=CHUNK_SIZE, pause=PAUSE_SECONDS, progress=None):
+    """
+    Remove a soft-deleted course and everything under it. ``progress(purge)`` is called after
+    every chunk with the updated ``CoursePurge``.
+    """
+    course = Course.all_objects.filter(pk=course_id).values("title", "deleted_at").first()
+    if course is None:
+        return None
+    if course["deleted_at"] is None:
+        raise ValueError(f"Course {course_id} is not soft-deleted")
+
+    # a retried job carries on with the record of the failed run
+    purge = CoursePurge.objects.filter(course_id=course_id).exclude(status="done").first()
+    if purge is None:
+        purge = CoursePurge.objects.create(course_id=course_id, title=course["title"])
+    elif purge.status != "running":
+        purge.status, purge.error = "running", ""
+        purge.save(update_fields=["status", "error", "updated_at"])
+
+    def report(label, count):
+        purge.deleted[label] = purge.deleted.get(label, 0) + count
+        purge.current = label
+        purge.save(update_fields=["deleted", "current", "updated_at"])
+        if progress:
+            progress(purge)
+
+    try:
+        for label, queryset in _course_steps(course_id):
+            done = 0
+
+            def on_chunk(total, label=label):
+                nonlocal done
+                report(label, total - done)
+                done = total
+
+            delete_in_chunks(queryset, chunk_size, pause, on_chunk)
+        for tree_id in Chapter.objects.filter(course_id=course_id).values_list("tree_id", flat=True).distinct():
+            # one statement per tree: a chunk boundary between parent and child rows would
+            # fail the self-referencing foreign key
+            report("chapters", _delete_tree(tree_id))
+            if pause:
+                time.sleep(pause)
+        # nothing big is left to cascade to (snapshot, popularity, neighbours rows)
+        Course.all_objects.filter(pk=course_id).delete()
+    except Exception as exc:
+        purge.status, purge.error = "failed", repr(exc)
+        purge.save(update_fields=["status", "error", "updated_at"])
+        raise
+
+    purge.status, purge.current, purge.finished_at = "done", "", timezone.now()
+    purge.save(update_fields=["status", "current", "finished_at", "updated_at"])
+    logger.info("Purged course %s: %s", course_id, purge.deleted)
+    return purge
+
+
+def _delete_tree(tree_id):
+    using = router.db_for_write(Chapter)
+    with transaction.atomic(using=using):
+        return Chapter._base_manager.using(using).filter(tree_id=tree_id)._raw_delete(using)
+
+
+def delete_chapter_tree(chapter, chunk_size=CHUNK_SIZE, pause=PAUSE_SECONDS):
+    """
+    Delete a root chapter with its subchapters and contents without the ORM cascade. Progress
+    rows keep existing with chapter/content cleared, as ``on_delete=SET_NULL`` would.
+    """
+    if not chapter.is_root_node():
+        raise ValueError("Only root chapters own a whole tree")
+    contents = Content.objects.filter(chapter__tree_id=chapter.tree_id)
+
+    tree = Chapter.objects.filter(tree_id=chapter.tree_id)
+    for field, targets in (("chapter", tree), ("content", contents)):
+        progress = CourseProgress.objects.filter(**{f"{field}__in": targets})
+        while True:
+            ids = list(progress.order_by().values_list("pk", flat=True)[:chunk_size])
+            if not ids:
+                break
+            CourseProgress.objects.filter(pk__in=ids).update(**{field: None})
+
+    for _, queryset in _content_dependents(contents):
+        delete_in_chunks(queryset, chunk_size, pause)
+    delete_in_chunks(ChapterFunnel.objects.filter(chapter__tree_id=chapter.tree_id), chunk_size, pause)
+    delete_in_chunks(contents, chunk_size, pause)
+    _delete_tree(chapter.tree_id)
+
+    # the signals that a normal delete would have sent
+    course_changed(chapter.course_id)
+    outline_changed(chapter.course_id)
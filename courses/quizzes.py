@@ -0,0 +1,301 @@
+"""
+Quiz grading for ``Content`` of type ``quiz``.
+
+Questions are Puck blocks of type ``Question`` anywhere in ``Content.data`` (``content`` or any
+zone), graded in document order. Their props::
+
+    {"id": "q1", "question": "...", "options": ["A", "B", "C"], "answer": 1, "points": 2}
+
+``answer`` is an option index, a list of indices (all must be selected) or, for questions
+without options, an accepted text or list of texts (compared case- and whitespace-insensitively).
+Options may also be ``{"label": "...", "correct": true}``. ``root.props.passMark`` is the pass
+percentage (default ``QUIZ_PASS_PERCENT``). Students get the data ``without_answers``; only the
+course teacher and staff see ``answer`` and ``correct`` (``sees_answers``).
+
+The answer key is compiled once into a compact JSON form — one bitmask of correct options per
+choice question — and cached until the content is saved again, or for ``QUIZ_KEY_CACHE_SECONDS``
+in workers that did not see the save (without ``REDIS_URL`` each worker has its own cache).
+Submissions are graded against it one at a time (``grade``); ``regrade`` re-scores every
+attempt of a quiz as NumPy arrays.
+"""
+import hashlib
+import json
+import math
+import unicodedata
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Content, CourseProgress, QuizAttempt
+
+QUESTION_BLOCK = "Question"
+PASS_PERCENT = getattr(settings, "QUIZ_PASS_PERCENT", 60)
+CHOICE, TEXT = 0, 1
+MAX_OPTIONS = 63  # choice answers are int64 bitmasks
+KEY_CACHE_SECONDS = getattr(settings, "QUIZ_KEY_CACHE_SECONDS", 60)
+
+
+class InvalidQuiz(ValueError):
+    pass
+
+
+def _key_cache_key(content_id):
+    return f"quiz-key:{content_id}"
+
+
+def _blocks(data):
+    yield from data.get("content") or []
+    for blocks in (data.get("zones") or {}).values():
+        yield from blocks or []
+
+
+def _is_index(value, size):
+    return isinstance(value, int) and not isinstance(value, bool) and 0 <= value < size
+
+
+def _number(value, default, name):
+    """A non-negative number prop; the editor sends "" for an empty field."""
+    if value is None or value == "":
+        return float(default)
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise InvalidQuiz(f"{name} must be a number, not {value!r}")
+    if not math.isfinite(number) or number < 0:
+        raise InvalidQuiz(f"{name} must be a non-negative number, not {value!r}")
+    return number
+
+
+def sees_answers(user, teacher_id):
+    """Whether ``user`` may see a quiz's answers: staff, or the course's teacher (a Profile id)."""
+    if not user or not user.is_authenticated:
+        return False
+    profile = getattr(user, "profile", None)
+    return user.is_staff or (profile is not None and profile.pk == teacher_id)
+
+
+def without_answers(data):
+    """A copy of a quiz's ``Content.data`` without the answers of its Question blocks."""
+    if not isinstance(data, dict):
+        return data
+
+    def strip(block):
+        if not isinstance(block, dict) or block.get("type") != QUESTION_BLOCK:
+            return block
+        if not isinstance(block.get("props"), dict):
+            return block
+        props = {name: value for name, value in block["props"].items() if name != "answer"}
+        if isinstance(props.get("options"), list):
+            props["options"] = [
+                {name: value for name, value in option.items() if name != "correct"} if isinstance(option, dict)
+                else option
+                for option in props["options"]
+            ]
+        return {**block, "props": props}
+
+    def strip_all(blocks):
+        return [strip(block) for block in blocks] if isinstance(blocks, list) else blocks
+
+    stripped = dict(data)
+    if "content" in data:
+        stripped["content"] = strip_all(data["content"])
+    if isinstance(data.get("zones"), dict):
+        stripped["zones"] = {name: strip_all(blocks) for name, blocks in data["zones"].items()}
+    return stripped
+
+
+def normalize_text(value):
+    return " ".join(unicodedata.normalize("NFC", str(value)).casefold().split())
+
+
+def compile_key(data):
+    """Answer key of a quiz's ``Content.data`` in compact form."""
+    if not isinstance(data, dict):
+        raise InvalidQuiz("Quiz data must be an object")
+    ids, kinds, masks, accepted, points = [], [], [], [], []
+    for block in _blocks(data):
+        if not isinstance(block, dict) or block.get("type") != QUESTION_BLOCK:
+            continue
+        props = block.get("props") or {}
+        if not isinstance(props, dict):
+            raise InvalidQuiz(f"Question {len(ids) + 1} has malformed props")
+        question_id = str(props.get("id") or len(ids))
+        if question_id in ids:
+            raise InvalidQuiz(f"More than one question has the id {question_id}")
+        options = props.get("options") or []
+        answer = props.get("answer")
+        if options:
+            if not isinstance(options, list) or len(options) > MAX_OPTIONS:
+                raise InvalidQuiz(f"Question {question_id} needs a list of at most {MAX_OPTIONS} options")
+            correct = {i for i, option in enumerate(options) if isinstance(option, dict) and option.get("correct")}
+            if answer is not None:
+                indices = answer if isinstance(answer, list) else [answer]
+                if not all(_is_index(i, len(options)) for i in indices):  # before set(): [[0]] is unhashable
+                    raise InvalidQuiz(f"Question {question_id} has no valid correct option")
+                correct.update(indices)
+            if not correct:
+                raise InvalidQuiz(f"Question {question_id} has no valid correct option")
+            kinds.append(CHOICE)
+            masks.append(sum(1 << i for i in correct))
+            accepted.append([])
+        else:
+            answers = answer if isinstance(answer, list) else [answer]
+            texts = sorted({normalize_text(text) for text in answers if text not in (None, "")})
+            if not texts:
+                raise InvalidQuiz(f"Question {question_id} has no answer")
+            kinds.append(TEXT)
+            masks.append(0)
+            accepted.append(texts)
+        ids.append(question_id)
+        points.append(_number(props.get("points"), 1, f"Points of question {question_id}"))
+
+    root = data.get("root") if isinstance(data.get("root"), dict) else {}
+    root = root.get("props") if isinstance(root.get("props"), dict) else {}
+    version = hashlib.sha1(json.dumps([ids, kinds, masks, accepted, points], sort_keys=True).encode()).hexdigest()[:12]
+    return {
+        "version": version, "ids": ids, "kinds": kinds, "masks": masks, "accepted": accepted, "points": points,
+        "total": sum(points), "pass_percent": _number(root.get("passMark"), PASS_PERCENT, "passMark"),
+    }
+
+
+def get_answer_key(content_id):
+    key = cache.get(_key_cache_key(content_id))
+    if key is None:
+        data = Content.objects.filter(pk=content_id, type="quiz").values_list("data", flat=True).first()
+        if data is None:
+            raise InvalidQuiz("Not a quiz")
+        key = compile_key(data)
+        cache.set(_key_cache_key(content_id), key, KEY_CACHE_SECONDS)
+    return key
+
+
+def invalidate_answer_key(content_id):
+    cache.delete(_key_cache_key(content_id))
+
+
+def encode_answer(kind, value):
+    """A submitted answer as a choice bitmask or normalized text; malformed answers never match."""
+    if kind == TEXT:
+        return normalize_text(value) if isinstance(value, (str, int, float)) else ""
+    selected = value if isinstance(value, list) else [value]
+    if not selected or not all(_is_index(i, MAX_OPTIONS) for i in selected):
+        return -1
+    return sum(1 << i for i in set(selected))
+
+
+def grade(key, answers):
+    """(score, percent, passed, {question_id: correct}) of one submission."""
+    answers = answers if isinstance(answers, dict) else {}
+    results, score = {}, 0.0
+    for question_id, kind, mask, accepted, points in zip(
+        key["ids"], key["kinds"], key["masks"], key["accepted"], key["points"]
+    ):
+        given = encode_answer(kind, answers.get(question_id))
+        correct = given in accepted if kind == TEXT else given == mask
+        results[question_id] = correct
+        score += points if correct else 0.0
+    return _summary(key, score) + (results,)
+
+
+def _summary(key, score):
+    percent = round(100 * score / key["total"], 2) if key["total"] else 0.0
+    return score, percent, percent >= key["pass_percent"]
+
+
+@transaction.atomic
+def submit(content, profile, answers):
+    """Grade and store an attempt, then record the best score in CourseProgress."""
+    key = get_answer_key(content.pk)
+    score, percent, passed, results = grade(key, answers)
+    attempt = QuizAttempt.objects.create(
+        content=content, student=profile, answers=answers, results=results, score=score,
+        max_score=key["total"], percent=percent, passed=passed, key_version=key["version"],
+    )
+    course_id = content.chapter.course_id
+    progress, _ = CourseProgress.objects.select_for_update().get_or_create(
+        student=profile, course_id=course_id, content=content, defaults={"chapter_id": content.chapter_id},
+    )
+    progress.score = max(progress.score or 0.0, percent)
+    if passed and not progress.completed:
+        progress.completed, progress.completed_at = True, timezone.now()
+    progress.save()
+    return attempt
+
+
+def regrade(content_id):
+    """
+    Re-score every attempt of a quiz against its current key and rewrite the students' best
+    scores in CourseProgress. Returns the number of attempts regraded.
+    """
+    import numpy as np  # only the batch job needs NumPy
+
+    invalidate_answer_key(content_id)
+    key = get_answer_key(content_id)
+    attempts = list(QuizAttempt.objects.filter(content_id=content_id).order_by("id").values_list("id", "student_id", "answers"))
+    if not attempts:
+        return 0
+
+    kinds = np.array(key["kinds"])
+    ids = key["ids"]
+    choice = np.flatnonzero(kinds == CHOICE)
+    text = np.flatnonzero(kinds == TEXT)
+
+    # attempts × questions: submitted bitmasks compared against the key's in one operation
+    correct = np.zeros((len(attempts), len(ids)), dtype=bool)
+    submitted = [answers if isinstance(answers, dict) else {} for _, _, answers in attempts]
+    if len(choice):
+        given = np.array(
+            [[encode_answer(CHOICE, answers.get(ids[q])) for q in choice] for answers in submitted], dtype=np.int64,
+        )
+        correct[:, choice] = given == np.array(key["masks"], dtype=np.int64)[choice]
+    for q in text:
+        given = np.array([encode_answer(TEXT, answers.get(ids[q])) for answers in submitted], dtype=str)
+        correct[:, q] = np.isin(given, key["accepted"][q])
+    scores = correct.astype(float) @ np.array(key["points"])
+
+    now = timezone.now()
+    updated, best = [], {}
+    for (attempt_id, student_id, _), row, score in zip(attempts, correct, scores.tolist()):
+        score, percent, passed = _summary(key, score)
+        updated.append(QuizAttempt(
+            pk=attempt_id, score=score, max_score=key["total"], percent=percent, passed=passed,
+            results=dict(zip(ids, row.tolist())), key_version=key["version"], graded_at=now,
+        ))
+        best[student_id] = max(best.get(student_id, 0.0), percent)
+
+    content = Content.objects.select_related("chapter").get(pk=content_id)
+    with transaction.atomic():
+        QuizAttempt.objects.bulk_update(
+            updated, ["score", "max_score", "percent", "passed", "results", "key_version", "graded_at"], batch_size=500,
+        )
+        record_best_scores(content, best, key["pass_percent"], now)
+    return len(updated)
+
+
+def record_best_scores(content, best, pass_percent, now):
+    """Set CourseProgress score/completion of ``content`` from ``{student_id: best percent}``."""
+    course_id = content.chapter.course_id
+    existing = {
+        progress.student_id: progress
+        for progress in CourseProgress.objects.filter(course_id=course_id, content=content, student_id__in=list(best))
+    }
+    changed, created = [], []
+    for student_id, percent in best.items():
+        passed = percent >= pass_percent
+        progress = existing.get(student_id)
+        if progress is None:
+            created.append(CourseProgress(
+                student_id=student_id, course_id=course_id, chapter_id=content.chapter_id, content=content,
+                score=percent, completed=passed, completed_at=now if passed else None,
+            ))
+            continue
+        progress.score, progress.last_accessed = percent, now
+        if passed != progress.completed:
+            progress.completed, progress.completed_at = passed, now if passed else None
+        changed.append(progress)
+    # last_accessed is set explicitly: bulk_update skips auto_now, and the analytics rollups
+    # find changed progress rows by it
+    CourseProgress.objects.bulk_update(changed, ["score", "completed", "completed_at", "last_accessed"], batch_size=500)
+    CourseProgress.objects.bulk_create(created, batch_size=500, ignore_conflicts=True)
@@ -0,0 +1,135 @@
+"""
+"Students who enrolled in this also enrolled in…" from co-enrollment.
+
+Enrollments (weight 1) and favourites (weight 0.5) form a sparse student × course matrix X.
+Item-item cosine similarity is ``X[:, a] · X[:, b] / (|X[:, a]| |X[:, b]|)``, computed for a
+block of courses at a time as one sparse product ``X[:, block].T @ X``. The top K neighbours
+of each course (seen together by at least ``min_support`` students) are stored in
+``CourseNeighbours``, one row per course, so the endpoint is a primary-key lookup.
+
+An incremental refresh only rebuilds the courses whose similarities can have changed: those
+with new or removed enrollments/favourites since the last build, and every course sharing a
+student with them.
+"""
+from itertools import chain
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from scipy import sparse
+
+from .models import CourseEnrollment, CourseNeighbours, Favourite
+
+TOP_K = 20
+MIN_SUPPORT = 2
+FAVOURITE_WEIGHT = 0.5
+BLOCK_SIZE = 512  # courses per sparse product; bounds memory for very popular catalogs
+
+
+def _pairs(queryset):
+    rows = queryset.values_list("student_id", "course_id").iterator(chunk_size=20000)
+    return np.fromiter(chain.from_iterable(rows), dtype=np.int64).reshape(-1, 2)
+
+
+def load_interactions():
+    """(students, courses, weights) arrays, one entry per enrollment or favourite."""
+    enrollments = _pairs(CourseEnrollment.objects.all())
+    favourites = _pairs(Favourite.objects.all())
+    pairs = np.concatenate([enrollments, favourites])
+    weights = np.concatenate([np.ones(len(enrollments)), np.full(len(favourites), FAVOURITE_WEIGHT)])
+    return pairs[:, 0], pairs[:, 1], weights
+
+
+def top_neighbours(students, courses, weights, targets=None, k=TOP_K, min_support=MIN_SUPPORT):
+    """
+    ``{course_id: [[neighbour_id, similarity], ...]}`` for ``targets`` (course ids; default all
+    courses present in the data). Courses without neighbours map to an empty list.
+    """
+    course_ids, columns = np.unique(courses, return_inverse=True)
+    _, rows = np.unique(students, return_inverse=True)
+    # duplicate (student, course) entries, e.g. enrolled and favourited, are summed
+    X = sparse.csr_matrix((weights, (rows, columns)), shape=(rows.max(initial=-1) + 1, len(course_ids)))
+    X.sum_duplicates()
+    B = X.copy()
+    B.data[:] = 1.0  # shared-student counts, for min_support
+    norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=0)).ravel())
+
+    if targets is None:
+        target_columns = np.arange(len(course_ids))
+    else:
+        target_columns = np.searchsorted(course_ids, np.intersect1d(np.asarray(list(targets)), course_ids))
+
+    Xc, Bc = X.tocsc(), B.tocsc()
+    result = {int(course_id): [] for course_id in (course_ids if targets is None else targets)}
+    for start in range(0, len(target_columns), BLOCK_SIZE):
+        block = target_columns[start:start + BLOCK_SIZE]
+        dot = (Xc[:, block].T @ X).tocsr()
+        support = (Bc[:, block].T @ B).tocsr()
+        dot.sort_indices()
+        support.sort_indices()
+
+        block_row = np.repeat(np.arange(len(block)), np.diff(dot.indptr))
+        column = dot.indices
+        similarity = dot.data / (norms[block[block_row]] * norms[column])
+        keep = (column != block[block_row]) & (support.data >= min_support)
+        block_row, column, similarity = block_row[keep], column[keep], similarity[keep]
+
+        # rank within each row by similarity, then keep the first k of every row
+        order = np.lexsort((column, -similarity, block_row))
+        block_row, column, similarity = block_row[order], column[order], similarity[order]
+        first = np.searchsorted(block_row, block_row, side="left")
+        rank = np.arange(len(block_row)) - first
+        keep = rank < k
+        block_row, column, similarity = block_row[keep], column[keep], similarity[keep]
+
+        bounds = np.searchsorted(block_row, np.arange(len(block) + 1))
+        neighbour_ids = course_ids[column].tolist()
+        scores = np.round(similarity, 6).tolist()
+        for i, col in enumerate(block):
+            lo, hi = bounds[i], bounds[i + 1]
+            result[int(course_ids[col])] = [list(pair) for pair in zip(neighbour_ids[lo:hi], scores[lo:hi])]
+    return result
+
+
+def affected_courses(students, courses, changed):
+    """``changed`` plus every course that shares a student with one of them."""
+    changed = np.asarray(sorted(changed), dtype=np.int64)
+    touched_students = np.unique(students[np.isin(courses, changed)])
+    return set(changed.tolist()) | set(np.unique(courses[np.isin(students, touched_students)]).tolist())
+
+
+def refresh(full=False, k=TOP_K, min_support=MIN_SUPPORT):
+    """Rebuild neighbour lists (all of them, or only the affected ones); returns how many were written."""
+    started = timezone.now()
+    students, courses, weights = load_interactions()
+
+    watermark = None if full else CourseNeighbours.objects.aggregate(Max("built_at"))["built_at__max"]
+    if watermark is None:
+        targets = None
+    else:
+        changed = set(CourseEnrollment.objects.filter(enrolled_at__gte=watermark).values_list("course_id", flat=True))
+        changed |= set(Favourite.objects.filter(created_at__gte=watermark).values_list("course_id", flat=True))
+        changed |= set(CourseNeighbours.objects.filter(stale=True).values_list("course_id", flat=True))
+        # courses that gained their first interactions through bulk imports etc.
+        built = set(CourseNeighbours.objects.values_list("course_id", flat=True))
+        changed |= set(np.unique(courses).tolist()) - built
+        if not changed:
+            return 0
+        targets = affected_courses(students, courses, changed)
+
+    neighbours = top_neighbours(students, courses, weights, targets, k=k, min_support=min_support)
+    rows = [
+        CourseNeighbours(course_id=course_id, neighbours=items, built_at=started, stale=False)
+        for course_id, items in neighbours.items()
+    ]
+    with transaction.atomic():
+        CourseNeighbours.objects.bulk_create(
+            rows, batch_size=1000, update_conflicts=True, unique_fields=["course"],
+            update_fields=["neighbours", "built_at", "stale"],
+        )
+        if targets is None:
+            # courses that no longer have any enrollments or favourites
+            CourseNeighbours.objects.filter(built_at__lt=started).delete()
+    return len(rows)
+
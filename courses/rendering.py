@@ -0,0 +1,139 @@
+"""
+Stored HTML and plain-text renderings of contents (courses/blocks.py).
+
+A ``ContentRendering`` row is valid while its ``data_hash`` matches ``blocks.data_hash`` of the
+content's current ``data``, so a lesson is only rendered again after its data (or the renderer
+``VERSION``) changed. ``rendered`` returns renderings for the request path, redoing the stale
+or missing ones inline; content saves also queue a debounced re-render. ``prerender`` (the
+``prerender_contents`` command) renders every stale content on a process pool.
+"""
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.utils import timezone
+
+from core.jobs import enqueue
+from . import blocks
+from .models import Content, ContentRendering
+
+RENDER_DELAY = 2  # seconds; same debounce as the outline and snapshots
+CHUNK_SIZE = 500
+UPDATE_FIELDS = ["data_hash", "html", "text", "rendered_at"]
+
+
+def _store(results):
+    """Upsert ``[(id, hash, html, text)]``."""
+    now = timezone.now()
+    ContentRendering.objects.bulk_create(
+        [
+            ContentRendering(content_id=pk, data_hash=digest, html=html, text=text, rendered_at=now)
+            for pk, digest, html, text in results
+        ],
+        update_conflicts=True, unique_fields=["content"], update_fields=UPDATE_FIELDS,
+    )
+
+
+def _stale(rows, force=False):
+    """``[(id, hash, data)]`` of the ``(id, data)`` rows whose stored rendering is missing or out of date."""
+    hashed = [(pk, blocks.data_hash(data), data) for pk, data in rows]
+    if force:
+        return hashed
+    stored = dict(
+        ContentRendering.objects.filter(content_id__in=[pk for pk, _, _ in hashed])
+        .values_list("content_id", "data_hash")
+    )
+    return [item for item in hashed if stored.get(item[0]) != item[1]]
+
+
+def render_contents(content_ids, force=False):
+    """Render the given contents whose stored rendering is stale; returns how many were rendered."""
+    stale = _stale(Content.objects.filter(pk__in=list(content_ids)).values_list("pk", "data"), force)
+    if stale:
+        _store(blocks.render_many(stale))
+    return len(stale)
+
+
+def rendered(content_ids):
+    """``{content id: (html, text)}``, rendering the contents whose stored rendering is stale."""
+    rows = Content.objects.filter(pk__in=list(content_ids)).values_list("pk", "data", "rendering__data_hash")
+    current, stale = [], []
+    for pk, data, stored_hash in rows:
+        digest = blocks.data_hash(data)
+        if digest == stored_hash:
+            current.append(pk)
+        else:
+            stale.append((pk, digest, data))
+    renderings = {
+        pk: (html, text)
+        for pk, html, text in ContentRendering.objects.filter(content_id__in=current).values_list(
+            "content_id", "html", "text"
+        )
+    }
+    if stale:
+        results = blocks.render_many(stale)
+        _store(results)
+        renderings.update((pk, (html, text)) for pk, _, html, text in results)
+    return renderings
+
+
+def content_changed(content_id):
+    if content_id is not None:
+        enqueue("courses.render_content", args=(content_id,), delay=RENDER_DELAY, unique_key=f"render:{content_id}")
+
+
+def _chunks(contents, chunk_size):
+    chunk = []
+    for row in contents.order_by("pk").values_list("pk", "data").iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def prerender(contents=None, workers=None, chunk_size=CHUNK_SIZE, force=False, progress=None):
+    """
+    Render every stale content of ``contents`` (default: all) on ``workers`` processes.
+
+    The parent reads contents in ``chunk_size`` batches, hashes them and skips the unchanged
+    ones; the pool only renders, and the parent stores the results. Returns
+    ``{"contents", "rendered", "skipped"}``; ``progress(counts)`` is called after each batch.
+    """
+    contents = Content.objects.all() if contents is None else contents
+    workers = workers or os.cpu_count() or 1
+    counts = {"contents": 0, "rendered": 0, "skipped": 0}
+
+    def done(results):
+        _store(results)
+        counts["rendered"] += len(results)
+        if progress:
+            progress(counts)
+
+    if workers == 1:
+        for chunk in _chunks(contents, chunk_size):
+            stale = _stale(chunk, force)
+            counts["contents"] += len(chunk)
+            counts["skipped"] += len(chunk) - len(stale)
+            if stale:
+                done(blocks.render_many(stale))
+        return counts
+
+    # workers come from a fresh forkserver, not forks of this process: a fork would inherit the
+    # open database connection, and a child's exit could tear it down under the parent
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("forkserver")) as pool:
+        pending = set()
+        for chunk in _chunks(contents, chunk_size):
+            stale = _stale(chunk, force)
+            counts["contents"] += len(chunk)
+            counts["skipped"] += len(chunk) - len(stale)
+            if stale:
+                pending.add(pool.submit(blocks.render_many, stale))
+            while len(pending) >= workers * 2:  # keep the pool busy without holding every lesson in memory
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done(future.result())
+        for future in pending:
+            done(future.result())
+    return counts
@@ -1,13 +1,105 @@
 from rest_framework import serializers
+from django.db.models import Prefetch
 from .models import (
     Domain, Discipline, Track, Level, Course,
     Chapter, Content, Review, Favourite,
-    CourseEnrollment, CourseProgress
+    CourseEnrollment, CourseProgress, QuizAttempt
 )
+from .quizzes import sees_answers, without_answers
 from users.serializers import ProfileSerializer
 from users.models import Profile
 
 
+class SparseFieldsMixin:
+    """
+    Read-side ``?fields=`` / ``?expand=`` support. The view puts the parsed lists in the
+    serializer context as ``fields`` and ``expand``; only the top-level serializer applies them.
+
+    ``?fields=id,title`` limits the output to those fields. ``?expand=domain`` renders only the
+    listed relations as nested objects and the other ``expandable_fields`` as primary keys.
+    Without ``?expand`` every relation is expanded, as before.
+    """
+    # relation name -> extra select_related/prefetch path needed to render it expanded
+    expandable_fields = {}
+    # method field -> model paths it reads (so the queryset can load just those)
+    field_sources = {}
+
+    def _is_top_level(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._is_top_level():
+            return fields
+
+        expand = self.context.get("expand")
+        if expand is not None:
+            for name in self.expandable_fields:
+                if name in fields and name not in expand:
+                    many = isinstance(fields[name], serializers.ListSerializer)
+                    fields[name] = serializers.PrimaryKeyRelatedField(many=many, read_only=True)
+
+        requested = self.context.get("fields")
+        if requested:
+            fields = {name: field for name, field in fields.items() if name in requested or field.write_only}
+        return fields
+
+    @classmethod
+    def optimize_queryset(cls, queryset, fields=None, expand=None, defer_unused=True, always=()):
+        """
+        Add the joins the (trimmed) serializer needs and, with ``defer_unused``, load only the
+        columns it reads. Falls back to loading every column when a field's source is unknown.
+        """
+        model = queryset.model
+        relations = {f.name: f for f in model._meta.get_fields() if f.is_relation}
+        concrete = {f.name for f in model._meta.concrete_fields}
+        only = {model._meta.pk.name, *always}
+        select, prefetch = set(), []
+
+        def add_path(path):
+            only.add(path)
+            if "__" in path:
+                select.add(path.rsplit("__", 1)[0])
+
+        for name, field in cls(context={"fields": fields, "expand": expand}).fields.items():
+            if field.write_only:
+                continue
+            expanded = isinstance(field, serializers.BaseSerializer)
+            relation = relations.get(name)
+            if name in cls.expandable_fields and relation is not None and not relation.concrete:
+                # reverse relation (e.g. chapter.contents): prefetch it, ids only when collapsed
+                related = relation.related_model.objects.all()
+                if not expanded:
+                    related = related.only("pk", relation.field.name)
+                elif cls.expandable_fields[name]:
+                    related = related.select_related(cls.expandable_fields[name])
+                prefetch.append(Prefetch(name, queryset=related))
+            elif name in cls.expandable_fields:
+                only.add(name)
+                if expanded:
+                    select.add(cls.expandable_fields[name] or name)
+            elif name in cls.field_sources:
+                for path in cls.field_sources[name]:
+                    add_path(path)
+            elif field.source in concrete:
+                only.add(field.source)
+            elif "." in field.source:
+                add_path(field.source.replace(".", "__"))
+            else:
+                defer_unused = False
+
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        if defer_unused:
+            queryset = queryset.only(*only)
+        return queryset
+
+
 class DomainSerializer(serializers.ModelSerializer):
     class Meta:
         model = Domain
@@ -49,10 +141,10 @@ class ContentSerializer(serializers.ModelSerializer):
         fields = ["id", "chapter_id", "chapter", "title", "slug", "type", "order"]
 
     def get_chapter(self, obj):
-        return obj.chapter.id if obj.chapter else None
+        return obj.chapter_id
     
 # create a Content detail serializer with all fields
-class ContentDetailSerializer(serializers.ModelSerializer):
+class ContentDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     chapter_id = serializers.PrimaryKeyRelatedField(
         queryset=Chapter.objects.all(),
         source="chapter",
@@ -60,14 +152,25 @@ class ContentDetailSerializer(serializers.ModelSerializer):
     )
     chapter = serializers.SerializerMethodField()
     course = serializers.SerializerMethodField()
+
+    field_sources = {"chapter": ["chapter"], "course": ["chapter__course"]}
+
     class Meta:
         model = Content
         fields = "__all__"
 
     def get_chapter(self, obj):
-        return obj.chapter.id if obj.chapter else None
+        return obj.chapter_id
     def get_course(self, obj):
-        return obj.chapter.course.id if obj.chapter and obj.chapter.course else None
+        return obj.chapter.course_id if obj.chapter_id else None
+
+    def to_representation(self, obj):
+        data = super().to_representation(obj)
+        if "data" in data and obj.type == "quiz":
+            request = self.context.get("request")
+            if not sees_answers(getattr(request, "user", None), obj.chapter.course.teacher_id):
+                data["data"] = without_answers(data["data"])
+        return data
 
 # class ChapterSerializer(serializers.ModelSerializer):
 #     contents = ContentSerializer(many=True, read_only=True)
@@ -81,7 +184,7 @@ class ContentDetailSerializer(serializers.ModelSerializer):
 #         children = obj.get_children()
 #         return ChapterSerializer(children, many=True).data
 
-class ChapterSerializer(serializers.ModelSerializer):
+class ChapterSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     contents = ContentSerializer(many=True, read_only=True)
 
     # Writable relationships
@@ -102,6 +205,9 @@ class ChapterSerializer(serializers.ModelSerializer):
     course = serializers.SerializerMethodField()
     parent = serializers.SerializerMethodField()
 
+    expandable_fields = {"contents": None}
+    field_sources = {"course": ["course"], "parent": ["parent"]}
+
     class Meta:
         model = Chapter
         fields = [
@@ -118,15 +224,15 @@ class ChapterSerializer(serializers.ModelSerializer):
         ]
 
     def get_course(self, obj):
-        return obj.course.id if obj.course else None
+        return obj.course_id
 
     def get_parent(self, obj):
-        return obj.parent.id if obj.parent else None
+        return obj.parent_id
 
 
 
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     domain = DomainSerializer(read_only=True)
     discipline = DisciplineSerializer(read_only=True)
     track = TrackSerializer(read_only=True)
@@ -151,9 +257,13 @@ class CourseSerializer(serializers.ModelSerializer):
         queryset=Profile.objects.filter(role='teacher'), source='teacher', write_only=True, required=False
     )
 
+    expandable_fields = {
+        "domain": None, "discipline": None, "track": None, "level": None, "teacher": "teacher__user",
+    }
+
     class Meta:
         model = Course
-        fields = "__all__"
+        exclude = ["popularity_score"]
 
 class CourseDetailSerializer(serializers.ModelSerializer):
     domain = DomainSerializer(read_only=True)
@@ -194,7 +304,7 @@ class CourseDetailSerializer(serializers.ModelSerializer):
 
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     student_name = serializers.CharField(source="student.user.username", read_only=True)
 
     class Meta:
@@ -227,3 +337,18 @@ class CourseProgressSerializer(serializers.ModelSerializer):
     class Meta:
         model = CourseProgress
         fields = "__all__"
+
+
+class ActivityEventSerializer(serializers.Serializer):
+    content = serializers.IntegerField()
+    type = serializers.ChoiceField(choices=["open", "complete"])
+
+
+class QuizAttemptSerializer(serializers.ModelSerializer):
+    answers = serializers.DictField(write_only=True)
+
+    class Meta:
+        model = QuizAttempt
+        fields = ["id", "content", "answers", "results", "score", "max_score", "percent", "passed", "submitted_at"]
+        read_only_fields = ["content", "results", "score", "max_score", "percent", "passed", "submitted_at"]
+
@@ -0,0 +1,127 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import caches, entitlements
+from .media import forget_gates
+from .models import Chapter, Content, Course, CourseEnrollment, CourseNeighbours, Favourite
+from .quizzes import invalidate_answer_key
+from .rendering import content_changed
+from .outline import outline_changed
+from .popularity import SOURCES as POPULARITY_SOURCES, record_event
+from .snapshots import course_changed, course_id_for_chapter, course_saved as snapshot_course_saved
+from .suggest import courses_changed
+
+
+def _deleted_with_parent(origin, *parents):
+    # rows removed by a cascade from a parent's delete are handled by the parent's signal
+    model = getattr(origin, "model", type(origin))
+    return model in parents
+
+
+@receiver(post_save, sender=Course)
+def course_saved(sender, instance, created=False, update_fields=None, **kwargs):
+    snapshot_course_saved(instance, created, update_fields)
+    caches.catalog.clear()
+    courses_changed([instance.pk])
+
+
+@receiver(post_delete, sender=Course)
+def course_deleted(sender, instance, **kwargs):
+    caches.catalog.clear()
+    courses_changed([instance.pk])
+
+
+def _moved_from(instance, parent_field):
+    """The stored ``parent_field`` value when this save moves the row elsewhere, else None."""
+    previous = getattr(instance, "_previous_parent", None)
+    return previous if previous not in (None, getattr(instance, parent_field)) else None
+
+
+@receiver(pre_save, sender=Chapter)
+def chapter_saving(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance._previous_parent = Chapter.objects.filter(pk=instance.pk).values_list("course_id", flat=True).first()
+
+
+@receiver(post_save, sender=Chapter)
+def chapter_saved(sender, instance, **kwargs):
+    course_changed(instance.course_id)
+    outline_changed(instance.course_id)
+    previous_course_id = _moved_from(instance, "course_id")
+    if previous_course_id is not None:
+        course_changed(previous_course_id)
+        outline_changed(previous_course_id)
+    forget_gates(instance.contents.values_list("slug", flat=True))  # is_free may have changed
+
+
+@receiver(post_delete, sender=Chapter)
+def chapter_deleted(sender, instance, origin=None, **kwargs):
+    if not _deleted_with_parent(origin, Course):
+        course_changed(instance.course_id)
+        outline_changed(instance.course_id)
+
+
+@receiver(pre_save, sender=Content)
+def content_saving(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance._previous_parent = Content.objects.filter(pk=instance.pk).values_list("chapter_id", flat=True).first()
+
+
+@receiver(post_save, sender=Content)
+def content_saved(sender, instance, **kwargs):
+    invalidate_answer_key(instance.pk)
+    forget_gates([instance.slug])
+    content_changed(instance.pk)
+    course_id = course_id_for_chapter(instance.chapter_id)
+    course_changed(course_id)
+    outline_changed(course_id)
+    previous_chapter_id = _moved_from(instance, "chapter_id")
+    if previous_chapter_id is not None:
+        previous_course_id = course_id_for_chapter(previous_chapter_id)
+        if previous_course_id != course_id:
+            course_changed(previous_course_id)
+            outline_changed(previous_course_id)
+
+
+@receiver(post_delete, sender=Content)
+def content_deleted(sender, instance, origin=None, **kwargs):
+    invalidate_answer_key(instance.pk)
+    forget_gates([instance.slug])
+    if not _deleted_with_parent(origin, Course, Chapter):
+        course_id = course_id_for_chapter(instance.chapter_id)
+        course_changed(course_id)
+        outline_changed(course_id)
+
+
+def _popularity_handlers(model, component, timestamp):
+    def saved(sender, instance, created, **kwargs):
+        if created:
+            record_event(instance.course_id, component, getattr(instance, timestamp))
+
+    def deleted(sender, instance, origin=None, **kwargs):
+        if not _deleted_with_parent(origin, Course):
+            record_event(instance.course_id, component, getattr(instance, timestamp), sign=-1)
+
+    post_save.connect(saved, sender=model, weak=False, dispatch_uid=f"popularity_{component}_saved")
+    post_delete.connect(deleted, sender=model, weak=False, dispatch_uid=f"popularity_{component}_deleted")
+
+
+for _component, (_model, _timestamp) in POPULARITY_SOURCES.items():
+    _popularity_handlers(_model, _component, _timestamp)
+
+
+@receiver(post_delete, sender=CourseEnrollment)
+def enrollment_deleted(sender, instance, **kwargs):
+    entitlements.forget(instance.student_id, instance.course_id)
+
+
+@receiver(post_delete, sender=CourseEnrollment)
+@receiver(post_delete, sender=Favourite)
+def interaction_deleted(sender, instance, origin=None, **kwargs):
+    # new interactions are found by timestamp; removals leave none, so flag the affected
+    # neighbour lists (this course and the student's other courses) for the next refresh
+    if _deleted_with_parent(origin, Course):
+        return
+    CourseNeighbours.objects.filter(course_id=instance.course_id).update(stale=True)
+    CourseNeighbours.objects.filter(course__enrollments__student_id=instance.student_id).update(stale=True)
+    CourseNeighbours.objects.filter(course__favourites__student_id=instance.student_id).update(stale=True)
@@ -0,0 +1,132 @@
+"""
+Pre-rendered snapshots of published courses.
+
+A published course's anonymous detail response, its outline and every content response are
+rendered once and stored raw and gzipped. Edits delete the snapshot straight away (so nothing
+stale is served) and queue a rebuild; until it runs, requests fall back to the live views.
+"""
+import gzip
+
+from django.db import transaction
+from django.db.models import Q
+from django.http import HttpResponse
+
+from core.http import accepts_gzip
+from core.jobs import enqueue
+from core.renderers import FastJSONRenderer
+from .fast_serializers import plan_for, serialize_content_detail, serialize_course_detail
+from .models import Chapter, Content, ContentSnapshot, Course, CourseSnapshot
+from .outline import NAVIGATION_COLUMNS, build_outline, navigation
+from .serializers import ContentDetailSerializer, CourseDetailSerializer
+
+REBUILD_DELAY = 2  # seconds; coalesces a burst of edits into one rebuild
+
+_renderer = FastJSONRenderer()
+
+
+def _pack(data):
+    body = _renderer.render(data)
+    return body, gzip.compress(body, compresslevel=6)
+
+
+def build_snapshot(course_id):
+    """Render and store the snapshot of a published course; drop it if the course isn't published."""
+    course = Course.objects.filter(pk=course_id).values_list("status", "slug").first()
+    if course is None or course[0] != "published":
+        invalidate_snapshot(course_id)
+        return None
+
+    detail = serialize_course_detail(Course.objects.filter(pk=course_id))
+    body, body_gzip = _pack(detail)
+    outline, outline_gzip = _pack([
+        {
+            "id": chapter["id"],
+            "title": chapter["title"],
+            "parent": chapter["parent"],
+            "is_free": chapter["is_free"],
+            "contents": [
+                {"id": content["id"], "slug": content["slug"], "title": content["title"], "type": content["type"]}
+                for content in chapter["contents"]
+            ],
+        }
+        for chapter in detail["chapters"]
+    ])
+
+    # the snapshot embeds prev/next, so bring the outline up to date first
+    build_outline(course_id)
+    plan = plan_for(ContentDetailSerializer)
+    size = len(plan.columns)
+    content_snapshots = []
+    rows = Content.objects.filter(chapter__course_id=course_id).values_list(
+        *plan.columns, "chapter__is_free", *NAVIGATION_COLUMNS
+    )
+    for row in rows:
+        data = serialize_content_detail(row[:size])  # anonymous: quiz answers are left out
+        data["navigation"] = navigation(dict(zip(NAVIGATION_COLUMNS, row[size + 1:])))
+        content_body, content_gzip = _pack(data)
+        content_snapshots.append(ContentSnapshot(
+            course_id=course_id, content_id=data["id"], slug=data["slug"], is_free=row[size],
+            next_slug=(data["navigation"] or {}).get("next") or "", body=content_body, body_gzip=content_gzip,
+        ))
+
+    with transaction.atomic():
+        # a content moved here from another course may still have a snapshot there
+        ContentSnapshot.objects.filter(
+            Q(course_id=course_id) | Q(content_id__in=[snapshot.content_id for snapshot in content_snapshots])
+        ).delete()
+        snapshot, _ = CourseSnapshot.objects.update_or_create(
+            course_id=course_id,
+            defaults=dict(slug=course[1], body=body, body_gzip=body_gzip, outline=outline, outline_gzip=outline_gzip),
+        )
+        ContentSnapshot.objects.bulk_create(content_snapshots, batch_size=200)
+    return snapshot
+
+
+def invalidate_snapshot(course_id):
+    ContentSnapshot.objects.filter(course_id=course_id).delete()
+    CourseSnapshot.objects.filter(course_id=course_id).delete()
+
+
+def course_changed(course_id, published=None):
+    """
+    Called on any course/chapter/content change: drop the snapshot now, rebuild it shortly.
+    ``published`` is the course's status when the caller already knows it.
+    """
+    if course_id is None:
+        return
+    invalidate_snapshot(course_id)
+    if published is None:
+        published = Course.objects.filter(pk=course_id, status="published").exists()
+    if published:
+        enqueue("courses.rebuild_snapshot", args=(course_id,), delay=REBUILD_DELAY, unique_key=f"snapshot:{course_id}")
+
+
+def course_saved(course, created=False, update_fields=None):
+    """course_changed for a saved Course, skipped when nothing its snapshot shows can have changed."""
+    if update_fields is not None and not set(update_fields) & _snapshot_fields():
+        return  # e.g. bookkeeping columns
+    if course.status == "published":
+        course_changed(course.pk, published=True)
+    elif not created and CourseSnapshot.objects.filter(course_id=course.pk).exists():
+        invalidate_snapshot(course.pk)  # just unpublished; drafts have no snapshot to drop
+
+
+def _snapshot_fields():
+    """Course fields the course snapshot is rendered from."""
+    return {column.split("__")[0] for column in plan_for(CourseDetailSerializer).columns}
+
+
+def course_id_for_chapter(chapter_id):
+    return Chapter.objects.filter(pk=chapter_id).values_list("course_id", flat=True).first()
+
+
+def snapshot_response(request, body, body_gzip):
+    """Serve stored JSON, gzipped when the client accepts it."""
+    if accepts_gzip(request):
+        response = HttpResponse(bytes(body_gzip), content_type="application/json")
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = HttpResponse(bytes(body), content_type="application/json")
+    response["Vary"] = "Accept-Encoding"
+    response["X-Snapshot"] = "hit"
+    return response
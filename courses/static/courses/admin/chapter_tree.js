@@ -0,0 +1,76 @@
+'use strict';
+{
+    // Drag-and-drop for the course chapter tree. The DOM is the source of truth; on submit the
+    // whole arrangement is posted as [{id, parent, order}] and saved as one rebuild.
+    const tree = document.getElementById('chapter-tree');
+    const form = document.getElementById('chapter-tree-form');
+    let dragged = null;
+    let target = null;
+    let position = null;
+
+    function clearMarker() {
+        if (target) {
+            target.classList.remove('drop-before', 'drop-after', 'drop-inside');
+        }
+        target = position = null;
+    }
+
+    if (tree) {
+        tree.addEventListener('dragstart', function(event) {
+            dragged = event.target.closest('li[data-id]');
+            event.dataTransfer.effectAllowed = 'move';
+            event.dataTransfer.setData('text/plain', dragged.dataset.id);
+            dragged.classList.add('dragging');
+        });
+
+        tree.addEventListener('dragend', function() {
+            dragged.classList.remove('dragging');
+            dragged = null;
+            clearMarker();
+        });
+
+        tree.addEventListener('dragover', function(event) {
+            const row = event.target.closest('.chapter-row');
+            // a chapter can't go before, after or inside itself or its own subchapters
+            if (!dragged || !row || dragged.contains(row)) {
+                return;
+            }
+            event.preventDefault();
+            const box = row.getBoundingClientRect();
+            const offset = (event.clientY - box.top) / box.height;
+            clearMarker();
+            target = row;
+            position = offset < 0.25 ? 'before' : offset > 0.75 ? 'after' : 'inside';
+            row.classList.add('drop-' + position);
+        });
+
+        tree.addEventListener('drop', function(event) {
+            if (!target) {
+                return;
+            }
+            event.preventDefault();
+            const item = target.parentElement;
+            if (position === 'before') {
+                item.before(dragged);
+            } else if (position === 'after') {
+                item.after(dragged);
+            } else {
+                item.querySelector(':scope > ul').append(dragged);
+            }
+            clearMarker();
+        });
+    }
+
+    form.addEventListener('submit', function() {
+        const placements = [];
+        for (const item of tree ? tree.querySelectorAll('li[data-id]') : []) {
+            const parent = item.parentElement.closest('li[data-id]');
+            placements.push({
+                id: Number(item.dataset.id),
+                parent: parent ? Number(parent.dataset.id) : null,
+                order: Array.prototype.indexOf.call(item.parentElement.children, item),
+            });
+        }
+        form.elements.tree.value = JSON.stringify(placements);
+    });
+}
@@ -0,0 +1,244 @@
+"""
+Course title suggestions for the search box.
+
+Each worker keeps an in-memory index of the published courses: a sorted list of keys with a
+parallel array of course ids, one key per word of a title (the normalized title from that
+word on, cut to ``KEY_LENGTH`` characters), so "alg" finds "Linear Algebra". Titles are
+normalized like ``bn_slugify`` does (NFC), then casefolded with whitespace collapsed. A query
+is two ``bisect`` calls and a ranking of the matches by ``popularity_score``. Rankings of
+queries that match more than ``MEMO_MATCHES`` keys (short prefixes, common words) are memoized
+until a course under that prefix changes, since the same prefixes are typed over and over.
+
+Course saves and deletes bump a version counter in the shared cache and log the course id
+under the new version (``courses_changed``, after commit). Each worker compares versions at
+most every ``SUGGEST_SYNC_SECONDS`` and reloads just the logged courses, or rebuilds when it
+fell more than ``MAX_REPLAY`` changes behind. (Workers only see each other's changes through a
+shared cache, i.e. with ``REDIS_URL`` set.) Popularity moves without ``save``, so the index
+is also rebuilt every ``SUGGEST_REBUILD_SECONDS``, on a thread while the old one keeps serving.
+Searches and in-place updates of an index take its lock, so threads never see it half updated.
+"""
+import bisect
+import heapq
+import threading
+import time
+import unicodedata
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+
+from .models import Course
+
+KEY_LENGTH = 24
+MEMO_MATCHES = 500
+MEMO_SIZE = 10_000
+TOP_K = 20  # most suggestions a query can ask for
+SYNC_SECONDS = getattr(settings, "SUGGEST_SYNC_SECONDS", 1)
+REBUILD_SECONDS = getattr(settings, "SUGGEST_REBUILD_SECONDS", 600)
+MAX_REPLAY = 500
+CHANGELOG_SECONDS = 24 * 3600
+VERSION_KEY = "suggest:version"
+
+
+def normalize(text):
+    return " ".join(unicodedata.normalize("NFC", str(text)).casefold().split())
+
+
+def word_keys(normalized):
+    """The index keys of a normalized title: the title from each word on, cut to KEY_LENGTH."""
+    words = normalized.split(" ")
+    keys = set()
+    for start in range(len(words)):
+        key = " ".join(words[start:])[:KEY_LENGTH]
+        if key:
+            keys.add(key)
+    return keys
+
+
+class SuggestIndex:
+    def __init__(self, rows=()):
+        """``rows`` of ``(id, title, slug, popularity_score)``."""
+        self.courses = {}  # id -> (title, slug, score, normalized title)
+        entries = []
+        for course_id, title, slug, score in rows:
+            normalized = normalize(title)
+            self.courses[course_id] = (title, slug, score or 0.0, normalized)
+            entries.extend((key, course_id) for key in word_keys(normalized))
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.ids = array("q", (course_id for _, course_id in entries))
+        self._ranked = {}  # popular query -> its TOP_K ranked ids
+        # put/remove shift keys and ids in place; searches on other threads must not see them half done
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.courses)
+
+    def put(self, course_id, title, slug, score):
+        with self._lock:
+            self._remove(course_id)
+            self._put(course_id, title, slug, score)
+
+    def remove(self, course_id):
+        with self._lock:
+            self._remove(course_id)
+
+    def _put(self, course_id, title, slug, score):
+        normalized = normalize(title)
+        self.courses[course_id] = (title, slug, score or 0.0, normalized)
+        for key in word_keys(normalized):
+            position = bisect.bisect_right(self.keys, key)
+            self.keys.insert(position, key)
+            self.ids.insert(position, course_id)
+            self._forget(key)
+
+    def _remove(self, course_id):
+        course = self.courses.pop(course_id, None)
+        if course is None:
+            return
+        for key in word_keys(course[3]):
+            start, end = bisect.bisect_left(self.keys, key), bisect.bisect_right(self.keys, key)
+            for position in range(start, end):
+                if self.ids[position] == course_id:
+                    del self.keys[position]
+                    del self.ids[position]
+                    break
+            self._forget(key)
+
+    def _forget(self, key):
+        for length in range(1, len(key) + 1):
+            self._ranked.pop(key[:length], None)
+
+    def search(self, query, limit=10):
+        """``[{"id", "title", "slug"}]`` of the best courses with a word starting with ``query``."""
+        query = normalize(query)
+        limit = max(min(limit, TOP_K), 0)
+        if not query or not limit:
+            return []
+        with self._lock:
+            ranked = self._ranked.get(query)
+            if ranked is None:
+                ranked, matched = self._rank(query)
+                if matched > MEMO_MATCHES and len(query) <= KEY_LENGTH:
+                    if len(self._ranked) >= MEMO_SIZE:
+                        self._ranked.clear()
+                    self._ranked[query] = ranked
+            return [
+                {"id": course_id, "title": self.courses[course_id][0], "slug": self.courses[course_id][1]}
+                for course_id in ranked[:limit]
+            ]
+
+    def _rank(self, query):
+        """(the best TOP_K course ids for ``query``, how many keys matched)."""
+        prefix = query[:KEY_LENGTH]
+        start = bisect.bisect_left(self.keys, prefix)
+        end = bisect.bisect_left(self.keys, prefix + "\U0010ffff", start)
+        matches = set(self.ids[start:end])
+        if len(query) > KEY_LENGTH:  # the keys were cut; check the rest on the full title
+            matches = {
+                course_id for course_id in matches if f" {self.courses[course_id][3]}".find(f" {query}") >= 0
+            }
+        courses = self.courses
+        ranked = heapq.nsmallest(TOP_K, matches, key=lambda course_id: (-courses[course_id][2], course_id))
+        return ranked, end - start
+
+
+def _published(course_ids=None):
+    courses = Course.objects.filter(status="published")
+    if course_ids is not None:
+        courses = courses.filter(pk__in=list(course_ids))
+    return courses.values_list("pk", "title", "slug", "popularity_score").iterator(chunk_size=5000)
+
+
+# this worker's index: built on first use, then kept in step with the shared version
+_index = None
+_version = 0
+_built_at = 0.0
+_checked_at = 0.0
+_rebuilding = False
+_lock = threading.Lock()
+
+
+def _change_key(version):
+    return f"suggest:change:{version}"
+
+
+def get_index():
+    global _checked_at, _version, _rebuilding
+    with _lock:
+        now = time.monotonic()
+        if _index is None:
+            return _rebuild()
+        if now - _built_at > REBUILD_SECONDS and not _rebuilding:
+            _rebuilding = True
+            threading.Thread(target=_rebuild_in_background, daemon=True).start()
+        if now - _checked_at < SYNC_SECONDS:
+            return _index
+        _checked_at = now
+        latest = cache.get(VERSION_KEY, 0)
+        if latest == _version:
+            return _index
+        if not 0 < latest - _version <= MAX_REPLAY:  # far behind, or the cache was flushed
+            return _rebuild()
+        changes = cache.get_many([_change_key(version) for version in range(_version + 1, latest + 1)])
+        if len(changes) < latest - _version:
+            return _rebuild()
+        _reload(set(changes.values()))
+        _version = latest
+        return _index
+
+
+def _rebuild():
+    version = cache.get(VERSION_KEY, 0)  # read first: changes made while loading get replayed
+    return _swap(SuggestIndex(_published()), version)
+
+
+def _swap(index, version):
+    global _index, _version, _built_at, _checked_at
+    _index, _version = index, version
+    _built_at = time.monotonic()
+    _checked_at = 0.0  # replay what changed while it was being built
+    return _index
+
+
+def _rebuild_in_background():
+    global _rebuilding
+    try:
+        version = cache.get(VERSION_KEY, 0)
+        index = SuggestIndex(_published())
+        with _lock:
+            _swap(index, version)
+    finally:
+        _rebuilding = False
+        connections.close_all()
+
+
+def _reload(course_ids):
+    found = {row[0]: row for row in _published(course_ids)}
+    for course_id in course_ids:
+        if course_id in found:
+            _index.put(*found[course_id])
+        else:
+            _index.remove(course_id)
+
+
+def courses_changed(course_ids):
+    """Log courses whose title, slug, status or existence changed, once the transaction commits."""
+    course_ids = sorted(set(course_ids))
+    if course_ids:
+        transaction.on_commit(lambda: _log_changes(course_ids))
+
+
+def _log_changes(course_ids):
+    global _checked_at
+    for course_id in course_ids:
+        cache.add(VERSION_KEY, 0, None)
+        version = cache.incr(VERSION_KEY)
+        cache.set(_change_key(version), course_id, CHANGELOG_SECONDS)
+    with _lock:
+        _checked_at = 0.0  # this worker applies its own changes on the next query
+
+
+def suggest(query, limit=10):
+    return get_index().search(query, limit)
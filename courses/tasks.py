@@ -0,0 +1,76 @@
+import logging
+from datetime import timedelta
+
+from core.jobs import job
+from .activity import COMPACT_SECONDS, compact, prune
+from .analytics import update as update_analytics
+from .enrollments import bulk_enroll as enroll
+from .outline import build_outline
+from .popularity import recompute
+from .purge import purge_course as purge
+from .quizzes import InvalidQuiz, regrade
+from .rendering import render_contents
+from .snapshots import build_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+@job("courses.rebuild_snapshot", priority=5)
+def rebuild_snapshot(course_id):
+    build_snapshot(course_id)
+
+
+@job("courses.rebuild_outline", priority=5)
+def rebuild_outline(course_id):
+    build_outline(course_id)
+
+
+@job("courses.recompute_popularity", every=timedelta(days=1))
+def recompute_popularity():
+    # corrects drift from bulk writes and rating edits that bypass the signals
+    recompute()
+
+
+@job("courses.refresh_recommendations", every=timedelta(hours=1))
+def refresh_recommendations(full=False):
+    # imported here so web processes don't load NumPy/SciPy
+    from .recommendations import refresh
+    refresh(full=full)
+
+
+@job("courses.update_analytics", every=timedelta(minutes=5))
+def update_teacher_analytics():
+    update_analytics()
+
+
+@job("courses.regrade_quiz", priority=3)
+def regrade_quiz(content_id):
+    try:
+        regrade(content_id)
+    except InvalidQuiz as exc:  # retrying won't fix the quiz; the teacher has to
+        logger.warning("Not regrading quiz %s: %s", content_id, exc)
+
+
+@job("courses.render_content", priority=-1)
+def render_content(content_id):
+    render_contents([content_id])
+
+
+@job("courses.purge_course", priority=-5, max_attempts=5)
+def purge_course(course_id):
+    purge(course_id)
+
+
+@job("courses.bulk_enroll", priority=1)
+def bulk_enroll(student_ids, course_ids):
+    enroll(student_ids, course_ids)
+
+
+@job("courses.compact_activity", priority=2, every=timedelta(seconds=COMPACT_SECONDS))
+def compact_activity():
+    compact()
+
+
+@job("courses.prune_activity", priority=-5, every=timedelta(hours=1))
+def prune_activity():
+    prune()
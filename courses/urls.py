@@ -3,7 +3,9 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     DomainViewSet, DisciplineViewSet, TrackViewSet, LevelViewSet, CourseViewSet,
     ChapterViewSet, ContentViewSet, ReviewViewSet, FavouriteViewSet, CourseEnrollmentViewSet,
-  CourseProgressViewSet, CourseDetailBySlug, ContentDetailBySlug, my_courses
+  CourseProgressViewSet, CourseDetailBySlug, ContentDetailBySlug, my_courses,
+  session_bootstrap, course_recommendations, TeacherAnalyticsList, TeacherCourseAnalytics,
+  QuizAttemptView, LessonMediaView
 )
 
 router = DefaultRouter()
@@ -22,7 +24,14 @@ router.register(r'progress', CourseProgressViewSet)
 urlpatterns = [
      path('', include(router.urls)),
      path("courses/user/my-courses/", my_courses),
+     path("courses/user/bootstrap/", session_bootstrap, name='session-bootstrap'),
+    path("teacher/analytics/", TeacherAnalyticsList.as_view(), name='teacher-analytics'),
+    path("teacher/analytics/<int:course_id>/", TeacherCourseAnalytics.as_view(), name='teacher-course-analytics'),
+    path('courses/slug/<path:slug>/recommendations/', course_recommendations, name='course-recommendations'),
     path('courses/slug/<path:slug>/', CourseDetailBySlug.as_view(), name='course-detail-by-slug'),
+    path('contents/slug/<str:slug>/media/', LessonMediaView.as_view(), name='lesson-media-list'),
+    path('contents/slug/<str:slug>/media/<path:asset>', LessonMediaView.as_view(), name='lesson-media'),
+    path('contents/slug/<path:slug>/attempts/', QuizAttemptView.as_view(), name='quiz-attempts'),
     path('contents/slug/<path:slug>/', ContentDetailBySlug.as_view(), name='content-detail-by-slug'),
 
    
@@ -2,12 +2,14 @@ from rest_framework import viewsets, permissions
 from .models import (
     Domain, Discipline, Track, Level, Course, CourseEnrollment,
     Chapter, Content, Review, Favourite,
- CourseProgress
+ CourseProgress, CourseSnapshot, ContentSnapshot, CourseNeighbours,
+ CourseDailyStats, ChapterFunnel, QuizAttempt
 )
 from .serializers import (
     DomainSerializer, DisciplineSerializer, TrackSerializer, LevelSerializer, CourseSerializer,
     ChapterSerializer, CourseEnrollmentSerializer, ReviewSerializer, FavouriteSerializer,
- CourseProgressSerializer, CourseDetailSerializer, ContentDetailSerializer
+ CourseProgressSerializer, CourseDetailSerializer, ContentDetailSerializer, QuizAttemptSerializer,
+ ActivityEventSerializer
 )
 
 from rest_framework.generics import RetrieveAPIView
@@ -17,145 +19,634 @@ from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
 from rest_framework.authentication import TokenAuthentication
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, authentication_classes, permission_classes
+from rest_framework.utils import encoders
+from django.db.models import Count, Sum
+from django.http import Http404
+from django.urls import reverse
+from django.utils.dateparse import parse_date
+from django.utils.http import parse_etags, quote_etag
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from datetime import timedelta
+from users.models import Profile
+from core.dbrouter import ReplicaReadMixin
+from .fast_serializers import (
+    content_detail_row, serialize_content_detail, serialize_course_detail, serialize_courses,
+)
+from .popularity import explain as explain_popularity
+from .quizzes import InvalidQuiz, submit as submit_quiz
+from core.jobs import enqueue
+from .activity import MAX_EVENTS as ACTIVITY_MAX_EVENTS, record as record_activity
+from .entitlements import LOGIN_REQUIRED, access_denied
+from .enrollments import SYNC_LIMIT as BULK_ENROLL_SYNC_LIMIT, bulk_enroll
+from . import caches, media
+from .outline import NAVIGATION_COLUMNS, navigation, prefetch_link
+from .purge import delete_chapter_tree
+from .snapshots import snapshot_response
+from .suggest import suggest as suggest_courses
+from .pagination import CreatedAtPagination, EnrolledAtPagination, IdPagination, LastAccessedPagination
+import hashlib
+import json
+from urllib.parse import urlencode
+
+class SparseFieldsViewMixin:
+    """
+    ``?fields=`` and ``?expand=`` on read requests (see serializers.SparseFieldsMixin). The same
+    lists trim the queryset, so unused columns and joins are never fetched.
+    """
+
+    def sparse_options(self):
+        if self.request.method not in permissions.SAFE_METHODS:
+            return None, None
+        params = self.request.query_params
+        fields = [name for name in params.get("fields", "").split(",") if name] or None
+        expand = [name for name in params.get("expand", "").split(",") if name] if "expand" in params else None
+        return fields, expand
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"], context["expand"] = self.sparse_options()
+        return context
+
+    def get_queryset(self):
+        fields, expand = self.sparse_options()
+        # the paginator reads its ordering keys off each row
+        ordering = getattr(self.pagination_class, "ordering", ()) if self.pagination_class else ()
+        return self.get_serializer_class().optimize_queryset(
+            super().get_queryset(), fields, expand,
+            defer_unused=self.request.method in permissions.SAFE_METHODS,
+            always=[key.lstrip("-") for key in ordering],
+        )
+
 
-class DomainViewSet(viewsets.ModelViewSet):
+class DomainViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Domain.objects.all()
     serializer_class = DomainSerializer
     permission_classes = [permissions.AllowAny]
 
 
-class DisciplineViewSet(viewsets.ModelViewSet):
+class DisciplineViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Discipline.objects.all()
     serializer_class = DisciplineSerializer
     permission_classes = [permissions.AllowAny]
 
 
-class TrackViewSet(viewsets.ModelViewSet):
+class TrackViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Track.objects.all()
     serializer_class = TrackSerializer
     permission_classes = [permissions.AllowAny]
 
 
-class LevelViewSet(viewsets.ModelViewSet):
+class LevelViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Level.objects.all()
     serializer_class = LevelSerializer
     permission_classes = [permissions.AllowAny]
 
 
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(SparseFieldsViewMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
     permission_classes = [permissions.AllowAny]
 
-class CourseDetailBySlug(RetrieveAPIView): 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.query_params.get("ordering") == "trending":
+            queryset = queryset.order_by("-popularity_score", "-id")
+        return queryset
+
+    def perform_destroy(self, instance):
+        # hidden at once; rows are purged in the background (courses/purge.py)
+        instance.soft_delete()
+
+    @action(detail=True, methods=["get"], permission_classes=[permissions.IsAdminUser])
+    def popularity(self, request, pk=None):
+        # score and its components as of now, for checking the trending order
+        return Response(explain_popularity(self.get_object()))
+
+    @action(detail=False, methods=["get"], authentication_classes=[], permission_classes=[AllowAny])
+    def suggest(self, request):
+        """
+        ``?q=<typed text>&limit=10``: published courses with a title word starting with ``q``,
+        most popular first, from the in-memory index in courses/suggest.py.
+        """
+        try:
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            limit = 10
+        results = suggest_courses(request.query_params.get("q", ""), limit)
+        return Response(results, headers={"Cache-Control": "public, max-age=60"})
+
+    def list(self, request, *args, **kwargs):
+        fields, expand = self.sparse_options()
+        if fields or expand is not None or self.paginator is not None:
+            return super().list(request, *args, **kwargs)
+        # full catalog: compiled path straight from values_list() rows, shared by every worker
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(caches.catalog.get_or_set(
+            caches.request_key(request, request.query_params.get("ordering", "")),
+            lambda: serialize_courses(queryset, request),
+        ))
+
+class CourseDetailBySlug(ReplicaReadMixin, RetrieveAPIView): 
     queryset = Course.objects.all() 
     serializer_class = CourseDetailSerializer 
     lookup_field = 'slug'
     authentication_classes = [TokenAuthentication]
     permission_classes = [AllowAny]
 
+    def retrieve(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            snapshot = CourseSnapshot.objects.filter(slug=kwargs[self.lookup_field]).values_list(
+                "body", "body_gzip"
+            ).first()
+            if snapshot:
+                return snapshot_response(request, *snapshot)
+
+        queryset = self.filter_queryset(self.get_queryset()).filter(slug=kwargs[self.lookup_field])
+        data = serialize_course_detail(queryset, request)
+        if data is None:
+            raise Http404("No Course matches the given query.")
+        return Response(data)
+
 
 # class ChapterViewSet(viewsets.ModelViewSet):
 #     queryset = Chapter.objects.all()
 #     serializer_class = ChapterSerializer
 #     permission_classes = [permissions.AllowAny]
 
-class ChapterViewSet(viewsets.ModelViewSet):
-    queryset = Chapter.objects.all()
+class ChapterViewSet(SparseFieldsViewMixin, ReplicaReadMixin, viewsets.ModelViewSet):
+    queryset = Chapter.objects.filter(course__deleted_at__isnull=True)
     serializer_class = ChapterSerializer
     permission_classes = [permissions.AllowAny]
 
     def get_queryset(self):
-        queryset = Chapter.objects.all()
+        queryset = super().get_queryset()
         course_id = self.request.query_params.get("course_id")
         if course_id:
             queryset = queryset.filter(course_id=course_id)
         return queryset
 
+    def perform_destroy(self, instance):
+        if instance.is_root_node():
+            # whole tree by tree_id, contents in chunks, no per-node MPTT updates
+            delete_chapter_tree(instance)
+        else:
+            instance.delete()
 
 
-class ContentViewSet(viewsets.ModelViewSet):
-    queryset = Content.objects.all()
+
+class ContentViewSet(SparseFieldsViewMixin, ReplicaReadMixin, viewsets.ModelViewSet):
+    queryset = Content.objects.filter(chapter__course__deleted_at__isnull=True)
     serializer_class = ContentDetailSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = IdPagination
+
+    @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated])
+    def regrade(self, request, pk=None):
+        """Queue a regrade of every attempt of this quiz (course teacher or staff only)."""
+        quiz = self.get_queryset().filter(pk=pk, type="quiz").values("id", "chapter__course__teacher__user_id").first()
+        if quiz is None:
+            raise Http404("No quiz matches the given query.")
+        if not request.user.is_staff and quiz["chapter__course__teacher__user_id"] != request.user.id:
+            return Response({"detail": "Only the course teacher can regrade this quiz."}, status=403)
+        job = enqueue("courses.regrade_quiz", args=(quiz["id"],), unique_key=f"regrade:{quiz['id']}")
+        return Response({"job": job.id}, status=status.HTTP_202_ACCEPTED)
 
 
 class ContentDetailBySlug(RetrieveAPIView): 
-    queryset = Content.objects.all() 
+    queryset = Content.objects.filter(chapter__course__deleted_at__isnull=True)
     serializer_class = ContentDetailSerializer
     lookup_field = 'slug'
 
     def retrieve(self, request, *args, **kwargs):
-        content = self.get_object()
-        chapter = content.chapter
-        course = chapter.course
-        user = request.user
-
-        # 1️⃣ Free chapter → always allow
-        if chapter.is_free:
-            return super().retrieve(request, *args, **kwargs)
-
-        # 2️⃣ Not logged in → block
-        if not user.is_authenticated:
-            return Response(
-                {"detail": "Please login to view this content."},
-                status=403
-            )
+        if not request.user.is_authenticated:
+            snapshot = ContentSnapshot.objects.filter(slug=kwargs[self.lookup_field]).values_list(
+                "is_free", "body", "body_gzip", "next_slug"
+            ).first()
+            if snapshot and snapshot[0]:
+                return self.with_prefetch(snapshot_response(request, *snapshot[1:3]), snapshot[3])
+            if snapshot:
+                return Response({"detail": LOGIN_REQUIRED}, status=403)
+
+        row, chapter = content_detail_row(
+            self.get_queryset().filter(slug=kwargs[self.lookup_field]),
+            "chapter__is_free", "chapter__course_id", "chapter__course__teacher_id", *NAVIGATION_COLUMNS,
+        )
+        if row is None:
+            raise Http404("No Content matches the given query.")
+        # free chapter, or logged in and enrolled in the course
+        denied = access_denied(request.user, chapter["chapter__is_free"], chapter["chapter__course_id"])
+        if denied:
+            return Response({"detail": denied}, status=403)
+        return self.content_response(row, chapter, request)
+
+    def content_response(self, row, columns, request):
+        data = serialize_content_detail(row, request, columns["chapter__course__teacher_id"])
+        data["navigation"] = navigation(columns)
+        return self.with_prefetch(Response(data), columns["outline__next_slug"])
+
+    def with_prefetch(self, response, next_slug):
+        link = prefetch_link(next_slug)
+        if link:
+            response["Link"] = link
+        return response
+
+
+class LessonMediaView(APIView):
+    """
+    GET ``.../media/``: the content's asset URLs, each with a ``grant`` for token-less range
+    requests. GET ``.../media/<path>``: the file, with Range support. Access follows
+    ContentDetailBySlug; see courses.media.
+    """
+    permission_classes = [AllowAny]
 
-        profile = getattr(user, "profile", None)
+    def get(self, request, slug, asset=None):
+        gate = media.content_gate(slug)
+        if gate is None:
+            raise Http404("No Content matches the given query.")
+        if asset is None:
+            return self.assets(request, slug, gate)
+
+        path = media.asset_path(asset)
+        if path not in gate["assets"]:
+            raise Http404("No such media file.")
+        grant = request.query_params.get("grant")
+        if not (gate["is_free"] or grant and media.grant_allows(grant, gate["course_id"])):
+            denied = access_denied(request.user, gate["is_free"], gate["course_id"])
+            if denied:
+                return Response({"detail": denied}, status=403)
+        return media.serve(request, path)
+
+    def assets(self, request, slug, gate):
+        denied = access_denied(request.user, gate["is_free"], gate["course_id"])
+        if denied:
+            return Response({"detail": denied}, status=403)
+        grant = None
+        if not gate["is_free"]:
+            grant = media.make_grant(request.user.profile.pk, gate["course_id"])
+        return Response({
+            "grant": grant,
+            "expires_in": media.GRANT_SECONDS if grant else None,
+            "assets": {
+                path: request.build_absolute_uri(reverse("lesson-media", args=[slug, path]))
+                + (f"?{urlencode({'grant': grant})}" if grant else "")
+                for path in gate["assets"]
+            },
+        }, headers={"Cache-Control": "private, no-store"})
+
+
+class QuizAttemptView(APIView):
+    """
+    GET: the requesting student's attempts at a quiz, newest first.
+    POST ``{"answers": {question_id: answer}}``: grade a new attempt. Access follows
+    ContentDetailBySlug (free chapter, or enrolled in the course).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get_quiz(self, slug):
+        quiz = Content.objects.select_related("chapter").filter(
+            slug=slug, type="quiz", chapter__course__deleted_at__isnull=True
+        ).first()
+        if quiz is None:
+            raise Http404("No quiz matches the given query.")
+        return quiz
+
+    def get(self, request, slug):
+        profile = getattr(request.user, "profile", None)
+        quiz = self.get_quiz(slug)
+        attempts = QuizAttempt.objects.filter(content=quiz, student=profile).order_by("-submitted_at")
+        return Response(QuizAttemptSerializer(attempts, many=True).data)
+
+    def post(self, request, slug):
+        quiz = self.get_quiz(slug)
+        profile = getattr(request.user, "profile", None)
         if not profile:
-            return Response(
-                {"detail": "Profile not found."},
-                status=403
-            )
-
-        # 3️⃣ Check if user purchased this course
-        from .models import CourseEnrollment
-        is_enrolled = CourseEnrollment.objects.filter(
-            student=profile,
-            course=course
-        ).exists()
-
-        if not is_enrolled:
-            return Response(
-                {"detail": "Purchase required to access this content."},
-                status=403
-            )
-
-        # 4️⃣ enrolled → allow
-        return super().retrieve(request, *args, **kwargs)
-
-
-
-class ReviewViewSet(viewsets.ModelViewSet):
-    queryset = Review.objects.all()
+            return Response({"detail": "Profile not found."}, status=403)
+        denied = access_denied(request.user, quiz.chapter.is_free, quiz.chapter.course_id)
+        if denied:
+            return Response({"detail": denied}, status=403)
+
+        serializer = QuizAttemptSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            attempt = submit_quiz(quiz, profile, serializer.validated_data["answers"])
+        except InvalidQuiz as exc:
+            return Response({"detail": str(exc)}, status=400)
+        return Response(QuizAttemptSerializer(attempt).data, status=status.HTTP_201_CREATED)
+
+
+class ReviewViewSet(SparseFieldsViewMixin, ReplicaReadMixin, viewsets.ModelViewSet):
+    queryset = Review.objects.filter(course__deleted_at__isnull=True)
     serializer_class = ReviewSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = CreatedAtPagination
 
 
 class FavouriteViewSet(viewsets.ModelViewSet):
-    queryset = Favourite.objects.all()
+    queryset = Favourite.objects.filter(course__deleted_at__isnull=True).select_related("student__user")
     serializer_class = FavouriteSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = CreatedAtPagination
 
 class CourseEnrollmentViewSet(viewsets.ModelViewSet):
-    queryset = CourseEnrollment.objects.all()
+    queryset = CourseEnrollment.objects.filter(course__deleted_at__isnull=True).select_related("student__user", "course")
     serializer_class = CourseEnrollmentSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = EnrolledAtPagination
+
+    @action(detail=False, methods=["post"], permission_classes=[IsAuthenticated])
+    def bulk(self, request):
+        """
+        Enroll a cohort: ``{"students": [profile ids], "courses": [course ids]}``, or
+        ``"from_course": id`` instead of ``students`` for everyone enrolled in that course.
+        Staff, or the teacher of every listed course. Existing enrollments are skipped, so the
+        request is idempotent. Above BULK_ENROLL_SYNC_LIMIT pairs it is queued and answered 202.
+        """
+        course_ids = request.data.get("courses")
+        student_ids = request.data.get("students")
+        from_course = request.data.get("from_course")
+        if not isinstance(course_ids, list) or (from_course is None and not isinstance(student_ids, list)):
+            raise ValidationError("courses and students must be lists of ids; from_course an id.")
+        try:
+            course_ids = {int(pk) for pk in course_ids}
+            student_ids = {int(pk) for pk in student_ids} if from_course is None else set()
+            from_course = None if from_course is None else int(from_course)
+        except (TypeError, ValueError):
+            raise ValidationError("courses and students must be lists of ids; from_course an id.")
+        if not course_ids or (from_course is None and not student_ids):
+            raise ValidationError("Give at least one course and some students (or from_course).")
+
+        wanted = course_ids if from_course is None else course_ids | {from_course}
+        teachers = dict(Course.objects.filter(pk__in=wanted).values_list("pk", "teacher__user_id"))
+        missing = wanted - set(teachers)
+        if missing:
+            raise ValidationError({"courses": f"Unknown courses: {sorted(missing)}"})
+        if not request.user.is_staff and any(teacher != request.user.id for teacher in teachers.values()):
+            return Response({"detail": "Only the courses' teacher can enroll students in bulk."}, status=403)
+
+        if from_course is not None:
+            student_ids = set(CourseEnrollment.objects.filter(course_id=from_course).values_list("student_id", flat=True))
+        if len(student_ids) * len(course_ids) > BULK_ENROLL_SYNC_LIMIT:
+            job = enqueue("courses.bulk_enroll", args=(sorted(student_ids), sorted(course_ids)))
+            data = {"job": job.id, "students": len(student_ids), "courses": len(course_ids)}
+            return Response(data, status=status.HTTP_202_ACCEPTED)
+        result = bulk_enroll(student_ids, course_ids)
+        return Response(result, status=status.HTTP_201_CREATED if result["created"] else status.HTTP_200_OK)
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def my_courses(request):
     profile = request.user.profile
     
-    enrollments = CourseEnrollment.objects.filter(student=profile)
+    enrollments = CourseEnrollment.objects.filter(student=profile, course__deleted_at__isnull=True)
     courses = [enrollment.course for enrollment in enrollments]
     
     serializer = CourseSerializer(courses, many=True)
     return Response(serializer.data)
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def session_bootstrap(request):
+    """
+    Everything the client needs on app start in one response, built with a fixed number of
+    queries regardless of how many courses the user has. Supports If-None-Match.
+    """
+    user = request.user
+    profile = Profile.objects.filter(user=user).only("id", "role", "bio").first()
+    if not profile:
+        return Response({"detail": "Profile not found."}, status=403)
+
+    enrolled_ids = list(
+        CourseEnrollment.objects.filter(student=profile, course__deleted_at__isnull=True).order_by("enrolled_at", "id").values_list("course_id", flat=True)
+    )
+    favourite_ids = list(
+        Favourite.objects.filter(student=profile, course__deleted_at__isnull=True).order_by("created_at", "id").values_list("course_id", flat=True)
+    )
+    progress_rows = (
+        CourseProgress.objects.filter(student=profile, course__deleted_at__isnull=True)
+        .order_by("-last_accessed", "-id")
+        .values(
+            "course_id", "chapter_id", "content_id", "content__slug", "content__outline__sequence",
+            "completed", "last_accessed",
+        )
+    )
+
+    # newest row per course is the resume point; completed rows are summed per course
+    progress = {}
+    for row in progress_rows:
+        entry = progress.get(row["course_id"])
+        if entry is None:
+            entry = progress[row["course_id"]] = {
+                "course": row["course_id"],
+                "completed": 0,
+                "total": 0,
+                "last_accessed": row["last_accessed"],
+                "resume": {
+                    "chapter": row["chapter_id"],
+                    "content": row["content_id"],
+                    "content_slug": row["content__slug"],
+                    # 1-based place in the course's reading order (courses/outline.py)
+                    "position": None if row["content__outline__sequence"] is None else row["content__outline__sequence"] + 1,
+                },
+            }
+        if row["completed"]:
+            entry["completed"] += 1
+
+    course_ids = set(enrolled_ids) | set(progress)
+    totals = (
+        Content.objects.filter(chapter__course_id__in=course_ids)
+        .values("chapter__course_id")
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+    for row in totals:
+        entry = progress.get(row["chapter__course_id"])
+        if entry:
+            entry["total"] = row["total"]
+    for entry in progress.values():
+        entry["percent"] = round(100 * entry["completed"] / entry["total"]) if entry["total"] else 0
+
+    payload = {
+        "user": {"id": user.id, "username": user.username, "email": user.email, "bio": profile.bio},
+        "profile": {"id": profile.id, "role": profile.role, "bio": profile.bio},
+        "enrolled_course_ids": enrolled_ids,
+        "favourite_course_ids": favourite_ids,
+        "progress": sorted(progress.values(), key=lambda entry: entry["course"]),
+    }
+
+    etag = quote_etag(hashlib.md5(
+        json.dumps(payload, sort_keys=True, cls=encoders.JSONEncoder).encode()
+    ).hexdigest())
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(payload, headers=headers)
+
+
+@api_view(["GET"])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def course_recommendations(request, slug):
+    """
+    "Students who enrolled in this also enrolled in…": published neighbours of a course from
+    the precomputed CourseNeighbours table, most similar first, as catalog entries.
+    """
+    try:
+        limit = max(int(request.query_params.get("limit", 10)), 0)
+    except ValueError:
+        limit = 10
+    courses = _recommended_courses(slug, request)
+    if courses is None:
+        raise Http404("No Course matches the given query.")
+    return Response(courses[:limit], headers={"Cache-Control": "public, max-age=300"})
+
+
+@caches.recommendations.cached(key=lambda slug, request: caches.request_key(request, slug))
+def _recommended_courses(slug, request):
+    found = (
+        CourseNeighbours.objects.filter(course__slug=slug, course__deleted_at__isnull=True)
+        .values_list("neighbours", flat=True).first()
+    )
+    if found is None:
+        if not Course.objects.filter(slug=slug).exists():
+            return None
+        found = []
+
+    similarity = dict(found)
+    rank = {course_id: position for position, (course_id, _) in enumerate(found)}
+    courses = serialize_courses(
+        Course.objects.filter(pk__in=list(similarity), status="published"), request
+    )
+    courses.sort(key=lambda course: rank[course["id"]])
+    for course in courses:
+        course["similarity"] = similarity[course["id"]]
+    return courses
+
+
 class CourseProgressViewSet(viewsets.ModelViewSet):
-    queryset = CourseProgress.objects.all()
+    queryset = CourseProgress.objects.filter(course__deleted_at__isnull=True).select_related("student__user", "course")
     serializer_class = CourseProgressSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = LastAccessedPagination
+
+    @action(detail=False, methods=["post"], permission_classes=[IsAuthenticated])
+    def events(self, request):
+        """
+        POST ``{"events": [{"content": id, "type": "open" | "complete"}]}``: record lesson activity
+        of the requesting student. Their progress rows follow within seconds (courses/activity.py).
+        """
+        events = request.data.get("events") if isinstance(request.data, dict) else None
+        if not isinstance(events, list) or not 0 < len(events) <= ACTIVITY_MAX_EVENTS:
+            raise ValidationError({"events": f"Give a list of 1 to {ACTIVITY_MAX_EVENTS} events."})
+        serializer = ActivityEventSerializer(data=events, many=True)
+        serializer.is_valid(raise_exception=True)
+        accepted, rejected = record_activity(request.user, serializer.validated_data)
+        return Response({"accepted": accepted, "rejected": rejected}, status=status.HTTP_202_ACCEPTED)
+
+
+# -------------------------------
+# TEACHER ANALYTICS (reads the rollups in courses/analytics.py only)
+# -------------------------------
+
+def _rollup_totals(stats):
+    totals = stats.aggregate(
+        enrollments=Sum("enrollments"), reviews=Sum("reviews"), rating_total=Sum("rating_total"),
+        completions=Sum("completions"),
+    )
+    return {name: value or 0 for name, value in totals.items()}
+
+
+def _average_rating(rating_total, reviews):
+    return round(rating_total / reviews, 2) if reviews else None
+
+
+class TeacherAnalyticsList(ReplicaReadMixin, APIView):
+    """The requesting teacher's courses with all-time totals."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        courses = Course.objects.filter(teacher__user=request.user).order_by("id").values("id", "title", "slug", "status")
+        totals = {
+            row["course_id"]: row
+            for row in CourseDailyStats.objects.filter(course__teacher__user=request.user).values("course_id").annotate(
+                enrollments=Sum("enrollments"), reviews=Sum("reviews"), rating_total=Sum("rating_total"),
+                completions=Sum("completions"),
+            )
+        }
+        data = []
+        for course in courses:
+            row = totals.get(course["id"], {})
+            reviews, rating_total = row.get("reviews", 0), row.get("rating_total", 0)
+            data.append({
+                **course,
+                "enrollments": row.get("enrollments", 0),
+                "reviews": reviews,
+                "average_rating": _average_rating(rating_total, reviews),
+                "completions": row.get("completions", 0),
+            })
+        return Response(data)
+
+
+class TeacherCourseAnalytics(ReplicaReadMixin, APIView):
+    """
+    One course's dashboard: daily enrollments/reviews/completions between ``?from=`` and ``?to=``
+    (ISO dates, default the last 30 days) and the per-chapter completion funnel.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, course_id):
+        course = Course.objects.filter(pk=course_id, teacher__user=request.user).values("id", "title", "slug").first()
+        if course is None:
+            raise Http404("No Course matches the given query.")
+
+        today = timezone.localdate()
+        day_from = self._date("from", today - timedelta(days=29))
+        day_to = self._date("to", today)
+        if day_from > day_to:
+            raise ValidationError({"from": "Must not be after 'to'."})
+
+        stats = CourseDailyStats.objects.filter(course_id=course_id, day__range=(day_from, day_to)).order_by("day")
+        daily = [
+            {
+                "day": row["day"], "enrollments": row["enrollments"], "reviews": row["reviews"],
+                "average_rating": _average_rating(row["rating_total"], row["reviews"]),
+                "completions": row["completions"],
+            }
+            for row in stats.values("day", "enrollments", "reviews", "rating_total", "completions")
+        ]
+        totals = _rollup_totals(stats)
+        chapters = [
+            {
+                "chapter": row["chapter_id"], "title": row["chapter__title"], "parent": row["chapter__parent_id"],
+                "students_started": row["students_started"], "students_completed": row["students_completed"],
+            }
+            for row in ChapterFunnel.objects.filter(course_id=course_id).order_by(
+                "chapter__tree_id", "chapter__lft"
+            ).values("chapter_id", "chapter__title", "chapter__parent_id", "students_started", "students_completed")
+        ]
+        return Response({
+            "course": course,
+            "from": day_from,
+            "to": day_to,
+            "totals": {
+                "enrollments": totals["enrollments"], "reviews": totals["reviews"],
+                "average_rating": _average_rating(totals["rating_total"], totals["reviews"]),
+                "completions": totals["completions"],
+            },
+            "daily": daily,
+            "chapters": chapters,
+        })
+
+    def _date(self, param, default):
+        value = self.request.query_params.get(param)
+        if not value:
+            return default
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({param: "Use YYYY-MM-DD."})
+        return parsed
+
@@ -1,5 +1,25 @@
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.contrib.auth.models import User
+
+from core.admin_utils import EstimatedCountPaginator, LargeTableAdmin
 from .models import Profile
 # Register your models here.
 
-admin.site.register(Profile)
\ No newline at end of file
+
+@admin.register(Profile)
+class ProfileAdmin(LargeTableAdmin):
+    list_display = ('user', 'role')
+    list_filter = ('role',)
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
+    search_fields = ('user__username', 'user__email')
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class UserAdmin(BaseUserAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,208 @@
+"""
+Bulk onboarding of users with their profiles and, optionally, course enrollments.
+
+Creating users one by one runs ``users.signals.create_profile`` for every row; a plain
+``User.objects.bulk_create`` skips it and leaves users without a ``Profile``. ``import_users``
+validates rows a batch at a time and writes each batch with three ``bulk_create`` calls
+(users, profiles, enrollments) in one transaction. The signals are bypassed on purpose, so
+the profile rows are written here and ``courses.enrollments.enrollments_changed`` refreshes
+what derives from enrollments.
+
+A row is ``{"username", "email", "first_name", "last_name", "role", "bio", "password" |
+"password_hash", "courses"}``; only ``username`` is required. ``password_hash`` is an
+already-encoded Django hash (from another Django site, or any algorithm in
+``PASSWORD_HASHERS``) and is stored as is, which costs nothing; plain ``password`` values are
+hashed on a thread pool, since PBKDF2 releases the GIL. Rows without either get an unusable
+password. ``courses`` is a list of course slugs to enroll a student in.
+
+Invalid rows are skipped and reported with their row number; they never fail the batch.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.contrib.auth.models import User
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import DataError, IntegrityError, transaction
+
+from .models import Profile
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = getattr(settings, "USER_IMPORT_BATCH_SIZE", 1000)
+HASH_WORKERS = getattr(settings, "USER_IMPORT_HASH_WORKERS", 4)
+ROLES = {role for role, _ in Profile.USER_ROLES}
+USER_FIELDS = ("email", "first_name", "last_name")
+
+username_validator = UnicodeUsernameValidator()
+
+
+def _text(row, field):
+    value = row.get(field)
+    return "" if value is None else str(value).strip()
+
+
+def _courses(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.replace(";", " ").replace(",", " ").split()
+    return [str(slug).strip() for slug in value if str(slug).strip()]
+
+
+def validate_row(row, course_ids):
+    """(cleaned row, errors) of one input row; ``course_ids`` maps known course slugs to ids."""
+    if not isinstance(row, dict):
+        return None, ["Row must be an object"]
+    errors = []
+    cleaned = {field: _text(row, field) for field in ("username", *USER_FIELDS, "bio")}
+    cleaned["role"] = _text(row, "role").lower() or "student"
+
+    try:
+        username_validator(cleaned["username"])
+        if not cleaned["username"] or len(cleaned["username"]) > 150:
+            raise ValidationError("Username must be 1 to 150 characters")
+    except ValidationError as exc:
+        errors.extend(exc.messages)
+    if cleaned["email"]:
+        try:
+            validate_email(cleaned["email"])
+        except ValidationError as exc:
+            errors.extend(exc.messages)
+    for field in USER_FIELDS:
+        max_length = User._meta.get_field(field).max_length
+        if len(cleaned[field]) > max_length:
+            errors.append(f"{field} must be at most {max_length} characters")
+    if cleaned["role"] not in ROLES:
+        errors.append(f"Unknown role {cleaned['role']!r}")
+
+    cleaned["password"] = row.get("password") or None
+    cleaned["password_hash"] = _text(row, "password_hash") or None
+    if cleaned["password"] is not None and not isinstance(cleaned["password"], str):
+        errors.append("password must be a string")
+    elif cleaned["password"] and cleaned["password_hash"]:
+        errors.append("Give either password or password_hash, not both")
+    elif cleaned["password_hash"]:
+        try:
+            identify_hasher(cleaned["password_hash"])
+        except ValueError:
+            errors.append("password_hash is not in a format any of PASSWORD_HASHERS understands")
+
+    slugs = _courses(row.get("courses"))
+    unknown = [slug for slug in slugs if slug not in course_ids]
+    if unknown:
+        errors.append(f"Unknown courses: {', '.join(unknown)}")
+    if slugs and cleaned["role"] != "student":
+        errors.append("Only students can be enrolled in courses")
+    cleaned["course_ids"] = sorted({course_ids[slug] for slug in slugs if slug in course_ids})
+    return cleaned, errors
+
+
+def import_users(rows, batch_size=BATCH_SIZE, hash_workers=HASH_WORKERS, dry_run=False, progress=None):
+    """
+    Create users, profiles and enrollments from ``rows`` (an iterable of dicts). Returns a
+    report: counts, ``errors`` as ``[{"row", "username", "errors"}]`` (rows numbered from 1),
+    elapsed seconds and rows per second. ``progress(report)`` is called after every batch.
+    """
+    from courses.models import Course  # courses depends on this app, not the other way round
+
+    started = time.perf_counter()
+    rows = list(rows)
+    slugs = {slug for row in rows if isinstance(row, dict) for slug in _courses(row.get("courses"))}
+    course_ids = dict(Course.objects.filter(slug__in=slugs).values_list("slug", "pk")) if slugs else {}
+
+    report = {"rows": len(rows), "processed": 0, "created": 0, "enrollments": 0, "failed": 0, "errors": []}
+    seen = set()
+    enrolled_courses = set()
+    with ThreadPoolExecutor(max_workers=max(hash_workers, 1)) as pool:
+        for start in range(0, len(rows), batch_size):
+            batch = []
+            for number, row in enumerate(rows[start:start + batch_size], start=start + 1):
+                cleaned, errors = validate_row(row, course_ids)
+                if cleaned and cleaned["username"] in seen:
+                    errors.append("Duplicate username in this import")
+                if errors:
+                    _fail(report, number, cleaned, errors)
+                    continue
+                seen.add(cleaned["username"])
+                batch.append((number, cleaned))
+
+            existing = set(User.objects.filter(username__in=[cleaned["username"] for _, cleaned in batch])
+                           .values_list("username", flat=True))
+            for number, cleaned in batch:
+                if cleaned["username"] in existing:
+                    _fail(report, number, cleaned, ["A user with that username already exists"])
+            batch = [(number, cleaned) for number, cleaned in batch if cleaned["username"] not in existing]
+
+            if batch and not dry_run:
+                passwords = pool.map(_encode_password, [cleaned for _, cleaned in batch])
+                created, enrollments = _write_batch(batch, list(passwords), report)
+                enrolled_courses.update(enrollments)
+                report["created"] += created
+                report["enrollments"] += sum(enrollments.values())
+            elif dry_run:
+                report["created"] += len(batch)
+            report["processed"] = min(start + batch_size, len(rows))
+            _timing(report, started)
+            if progress:
+                progress(report)
+
+    if enrolled_courses:
+        from courses.enrollments import enrollments_changed  # bulk_create skipped the enrollment signals
+        enrollments_changed(enrolled_courses)
+    report["errors"].sort(key=lambda error: error["row"])
+    _timing(report, started)
+    logger.info("Imported %s of %s users in %.1fs", report["created"], report["rows"], report["seconds"])
+    return report
+
+
+def _encode_password(cleaned):
+    if cleaned["password_hash"]:
+        return cleaned["password_hash"]
+    return make_password(cleaned["password"])  # an unusable password when None
+
+
+def _write_batch(batch, passwords, report):
+    """Insert one validated batch; returns (users created, {course_id: enrollments created})."""
+    from courses.models import CourseEnrollment
+
+    users = [
+        User(username=cleaned["username"], password=password, **{field: cleaned[field] for field in USER_FIELDS})
+        for (_, cleaned), password in zip(batch, passwords)
+    ]
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            profiles = Profile.objects.bulk_create([
+                Profile(user=user, role=cleaned["role"], bio=cleaned["bio"]) for user, (_, cleaned) in zip(users, batch)
+            ])
+            enrollments = CourseEnrollment.objects.bulk_create([
+                CourseEnrollment(student=profile, course_id=course_id)
+                for profile, (_, cleaned) in zip(profiles, batch)
+                for course_id in cleaned["course_ids"]
+            ])
+    except (IntegrityError, DataError) as exc:
+        # a username taken by someone else since the check, or a value validate_row missed;
+        # fail the batch's rows, not the import
+        for number, cleaned in batch:
+            _fail(report, number, cleaned, [f"Not imported: {exc}"])
+        return 0, {}
+
+    per_course = {}
+    for enrollment in enrollments:
+        per_course[enrollment.course_id] = per_course.get(enrollment.course_id, 0) + 1
+    return len(users), per_course
+
+
+def _fail(report, number, cleaned, errors):
+    report["failed"] += 1
+    report["errors"].append({"row": number, "username": (cleaned or {}).get("username", ""), "errors": errors})
+
+
+def _timing(report, started):
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    report["rows_per_second"] = round(report["processed"] / report["seconds"], 1) if report["seconds"] else None
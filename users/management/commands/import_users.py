@@ -0,0 +1,69 @@
+import csv
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.bulk_import import BATCH_SIZE, HASH_WORKERS, import_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users with their profiles (and optional course enrollments) from a CSV, JSON or JSON Lines file. "
+        "Columns: username, email, first_name, last_name, role, bio, password or password_hash, courses "
+        "(course slugs separated by spaces or semicolons)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - for stdin.")
+        parser.add_argument("--format", choices=["csv", "json", "jsonl"], help="Default: from the file extension.")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--hash-workers", type=int, default=HASH_WORKERS, help="Threads hashing plain passwords.")
+        parser.add_argument("--dry-run", action="store_true", help="Validate every row without writing anything.")
+        parser.add_argument("--errors", help="Write rejected rows to this CSV file.")
+
+    def handle(self, *args, **options):
+        rows = self.read(options["path"], options["format"] or options["path"].rsplit(".", 1)[-1].lower())
+
+        def progress(report):
+            self.stdout.write(
+                f"  {report['processed']}/{report['rows']} rows  {report['created']} created  "
+                f"{report['failed']} failed  {report['rows_per_second']} rows/s"
+            )
+
+        report = import_users(
+            rows, batch_size=options["batch_size"], hash_workers=options["hash_workers"],
+            dry_run=options["dry_run"], progress=progress,
+        )
+        for error in report["errors"][:20]:
+            self.stderr.write(f"  row {error['row']} ({error['username'] or '?'}): {'; '.join(error['errors'])}")
+        if len(report["errors"]) > 20:
+            self.stderr.write(f"  … and {len(report['errors']) - 20} more")
+        if options["errors"] and report["errors"]:
+            with open(options["errors"], "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["row", "username", "errors"])
+                writer.writerows([error["row"], error["username"], "; ".join(error["errors"])] for error in report["errors"])
+
+        verb = "Validated" if options["dry_run"] else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {verb} {report['created']} of {report['rows']} users ({report['enrollments']} enrollments, "
+            f"{report['failed']} rejected) in {report['seconds']:.2f}s, {report['rows_per_second']} rows/s"
+        ))
+
+    def read(self, path, fmt):
+        f = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8-sig")
+        try:
+            if fmt == "csv":
+                return list(csv.DictReader(f))
+            if fmt == "json":
+                rows = json.load(f)
+                return rows["users"] if isinstance(rows, dict) else rows
+            if fmt == "jsonl":
+                return [json.loads(line) for line in f if line.strip()]
+        except (ValueError, KeyError) as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+        finally:
+            if f is not sys.stdin:
+                f.close()
+        raise CommandError("Pass --format csv, json or jsonl")
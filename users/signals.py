@@ -6,6 +6,9 @@ import requests
 from django.core.files import File
 from django.core.files.base import ContentFile
 from django.contrib.auth.models import User
+import logging
+
+logger = logging.getLogger(__name__)
 
 @receiver(post_save, sender=User)
 def create_profile(sender, instance, created, **kwargs):
@@ -15,8 +18,9 @@ def create_profile(sender, instance, created, **kwargs):
             Profile.objects.create(
                 user=instance
             )
-        except Exception as e:
-            print(e)
+        except Exception:
+            # users.bulk_import creates profiles itself; this covers one-off creates
+            logger.exception("Could not create a profile for user %s", instance.pk)
 
 @receiver(post_save, sender=SocialAccount)
 def create_profile_avatar(sender, instance, created, **kwargs):
@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import GoogleLogin,UserMe
+from .views import GoogleLogin,UserMe,UserImport
 
 urlpatterns = [
     path('google/login/', GoogleLogin.as_view(), name='google_login'),
-    path('users/me/', UserMe.as_view(), name='user_detail')
+    path('users/me/', UserMe.as_view(), name='user_detail'),
+    path('users/import/', UserImport.as_view(), name='user_import'),
 ]
\ No newline at end of file
@@ -2,11 +2,17 @@ import os
 from allauth.socialaccount.providers.google.views import GoogleOAuth2Adapter
 from allauth.socialaccount.providers.oauth2.client import OAuth2Client
 from dj_rest_auth.registration.views import SocialLoginView
+from django.conf import settings
 from rest_framework.views import APIView
-from rest_framework import permissions
+from rest_framework import permissions, status
+from .bulk_import import import_users
 from .serializers import UserSerializer
 from rest_framework.response import Response
 
+IMPORT_MAX_ROWS = getattr(settings, "USER_IMPORT_API_MAX_ROWS", 5000)
+# plain passwords are hashed inside the request (~0.5s of PBKDF2 each, on HASH_WORKERS threads)
+IMPORT_MAX_PASSWORDS = getattr(settings, "USER_IMPORT_API_MAX_PASSWORDS", 100)
+
 class GoogleLogin(SocialLoginView):
     adapter_class = GoogleOAuth2Adapter
     callback_url = os.getenv("GOOGLE_REDIRECT_URL")
@@ -17,4 +23,37 @@ class UserMe(APIView):
     
     def get(self, request):
         serializer = UserSerializer(request.user)
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+
+class UserImport(APIView):
+    """
+    Staff-only bulk onboarding: POST {"users": [...], "dry_run": false}; rows as described in
+    users/bulk_import.py. Responds with the import report, including per-row errors.
+    At most IMPORT_MAX_PASSWORDS rows may carry a plain ``password`` (send ``password_hash``
+    instead); bigger files go through ``manage.py import_users``.
+    """
+    permission_classes = (permissions.IsAdminUser,)
+
+    def post(self, request):
+        rows = request.data.get("users") if isinstance(request.data, dict) else None
+        if not isinstance(rows, list):
+            return Response({"detail": "users must be a list of objects."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > IMPORT_MAX_ROWS:
+            return Response(
+                {"detail": f"At most {IMPORT_MAX_ROWS} users per request; use manage.py import_users for more."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        passwords = sum(1 for row in rows if isinstance(row, dict) and row.get("password"))
+        if passwords > IMPORT_MAX_PASSWORDS:
+            return Response(
+                {"detail": (
+                    f"At most {IMPORT_MAX_PASSWORDS} rows with a plain password per request; send password_hash "
+                    "instead, or use manage.py import_users."
+                )},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        dry_run = bool(request.data.get("dry_run"))
+        report = import_users(rows, dry_run=dry_run)
+        created = report["created"] and not dry_run
+        return Response(report, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)